@@ -3,3 +3,15 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig): 
     default_auto_field = 'django.db.models.BigAutoField' 
     name = 'api' 
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import db_pool, jobs, metrics, middleware, response_cache
+        db_pool.install_fork_guard()
+        # Requêtes SQL comptées par requête HTTP, quel que soit le thread qui les exécute
+        connection_created.connect(middleware.install_query_counter)
+        metrics.register_collector(db_pool.metric_samples)
+        metrics.register_collector(response_cache.metric_samples)
+        # Tâches d'arrière-plan déclarées par les applications (tasks.py)
+        jobs.autodiscover()
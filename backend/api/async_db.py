@@ -0,0 +1,75 @@
+"""
+Exécution concurrente de requêtes SQL indépendantes depuis une vue asynchrone.
+
+L'ORM asynchrone de Django exécute les requêtes d'une même requête HTTP l'une
+après l'autre, sur un seul thread et une seule connexion : asyncio.gather sur
+des appels aaggregate()/afirst() ne les parallélise pas. parallel() exécute
+chaque fonction sur un pool de threads dédié (ASYNC_DB_WORKERS), chaque
+thread ayant sa propre connexion, conservée selon CONN_MAX_AGE.
+
+Dans une transaction (tests, ATOMIC_REQUESTS), une autre connexion ne verrait
+pas les écritures non validées : les fonctions s'exécutent alors l'une après
+l'autre sur la connexion courante.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import db_routing
+from .middleware import collect_queries, current_collector
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_DB_WORKERS', 4),
+                thread_name_prefix='async-db',
+            )
+        return _executor
+
+
+def _in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+
+
+def _isolated(func, routing_state, collector):
+    def run():
+        try:
+            # Même choix de base (principale ou réplica) que la requête, et
+            # requêtes comptées avec les siennes (budget, Server-Timing, métriques)
+            with db_routing.routing(routing_state):
+                if collector is None:
+                    return func()
+                with collect_queries(collector):
+                    return func()
+        finally:
+            # Comme en fin de requête HTTP : fermeture si périmée ou inutilisable
+            for connection in connections.all(initialized_only=True):
+                connection.close_if_unusable_or_obsolete()
+    return run
+
+
+async def parallel(*funcs):
+    """
+    Résultats des fonctions synchrones `funcs` (requêtes ORM), dans l'ordre
+    """
+    if await sync_to_async(_in_transaction)():
+        return [await sync_to_async(func)() for func in funcs]
+    # run_in_executor ne propage pas le contexte : chaque thread du pool
+    # utilise ses propres connexions, distinctes de celle de la requête,
+    # et reçoit explicitement l'état de routage et le collecteur de requêtes
+    loop = asyncio.get_running_loop()
+    routing_state = db_routing.current()
+    collector = current_collector()
+    return await asyncio.gather(*(
+        loop.run_in_executor(get_executor(), _isolated(func, routing_state, collector)) for func in funcs
+    ))
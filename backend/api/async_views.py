@@ -0,0 +1,70 @@
+"""
+Socle des vues de lecture asynchrones (déploiement ASGI, réglage ASYNC_READ_VIEWS).
+
+DRF n'exécute pas de vues asynchrones : read_view() reprend ce qu'apporte
+@api_view pour une vue GET (authentification, permission IsAuthenticated,
+erreurs au format DRF) autour d'une vue Django `async def`. La vue reçoit
+une rest_framework.request.Request (query_params, user) et retourne une
+DataResponse, compatible avec api.response_cache et api.conditional.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+
+from . import renderers
+
+
+class DataResponse(HttpResponse):
+    """
+    Réponse JSON qui garde ses données (comme rest_framework.response.Response)
+    """
+    def __init__(self, data, status=200, headers=None):
+        # Même rendu que les vues DRF (api.renderers)
+        super().__init__(
+            renderers.dumps(data), content_type=renderers.ORJSONRenderer.media_type,
+            status=status, headers=headers,
+        )
+        self.data = data
+
+
+def error_response(exc):
+    """
+    Réponse d'erreur d'une APIException, au format du gestionnaire DRF
+    """
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    response = DataResponse(detail, status=exc.status_code)
+    wait = getattr(exc, 'wait', None)
+    if wait:
+        response['Retry-After'] = str(wait)
+    return response
+
+
+def read_view(authentication_class=None):
+    """
+    Vue GET asynchrone ; avec `authentication_class`, l'utilisateur doit être
+    authentifié (401 sinon)
+    """
+    def decorator(view):
+        @require_safe
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if authentication_class is None:
+                drf_request = Request(request)
+                drf_request.user = AnonymousUser()
+            else:
+                drf_request = Request(request, authenticators=[authentication_class()])
+                try:
+                    # La vérification de révocation peut lire la base
+                    user = await sync_to_async(lambda: drf_request.user)()
+                    if not user.is_authenticated:
+                        raise NotAuthenticated()
+                except APIException as e:
+                    return error_response(e)
+            return await view(drf_request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,127 @@
+"""
+Compression des réponses (brotli ou gzip selon Accept-Encoding).
+
+Seules les réponses aux requêtes sûres (GET, HEAD) sont compressées, et
+seulement au-delà de COMPRESSION_MIN_SIZE octets : les petites réponses et
+les réponses d'authentification (POST, porteuses de tokens, exposées à
+BREACH) restent en clair. Brotli est utilisé si le module est installé et
+accepté par le client ; gzip ajoute un bourrage aléatoire comme
+django.middleware.gzip.GZipMiddleware. Les réponses en flux (exports) sont
+compressées à la volée.
+"""
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # compression gzip uniquement
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+SAFE_METHODS = ('GET', 'HEAD')
+
+_coding_re = re.compile(r'\s*([a-z0-9*-]+)\s*(?:;\s*q=([0-9.]+))?', re.IGNORECASE)
+
+
+def accepted_encodings(header):
+    """
+    Encodages acceptés par le client (q=0 exclut un encodage)
+    """
+    accepted = set()
+    for part in header.split(','):
+        match = _coding_re.match(part)
+        if not match:
+            continue
+        try:
+            if match.group(2) is not None and float(match.group(2)) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(match.group(1).lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=getattr(settings, 'BROTLI_STREAM_QUALITY', 4))
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresse les réponses volumineuses selon l'encodage négocié (voir le module)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        # La réponse dépend de l'en-tête, même pour un client qui ne compresse pas
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                # Flux asynchrone : laissé tel quel (rare ici)
+                return response
+            if encoding == 'br':
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            response.headers.pop('Content-Length', None)
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(
+                    response.content, quality=getattr(settings, 'BROTLI_QUALITY', 5)
+                )
+            else:
+                compressed = compress_string(response.content, max_random_bytes=100)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Le contenu compressé n'est plus identique octet pour octet
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
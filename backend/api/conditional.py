@@ -0,0 +1,89 @@
+"""
+Requêtes GET conditionnelles (ETag / If-None-Match).
+
+L'ETag d'une réponse est calculé sans exécuter la vue ni sérialiser le corps :
+condensat de la vue, de l'URL (paramètres compris), de l'utilisateur et des
+versions des entités dont dépend la réponse (api.response_cache), que les
+écritures font changer. Si le client présente cet ETag, la vue n'est pas
+exécutée et la réponse est un 304 vide.
+"""
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .response_cache import ROOT_SCOPE, versions
+
+
+def compute_etag(name, request, scopes):
+    """
+    ETag fort de la réponse (aucune requête SQL : versions lues dans le cache)
+    """
+    parts = [name, request.get_full_path(), str(request.user.id)]
+    parts += [str(version) for version in versions([ROOT_SCOPE, *scopes])]
+    return quote_etag(hashlib.md5('\n'.join(parts).encode()).hexdigest())
+
+
+def _matches(etag, if_none_match):
+    # Comparaison faible (RFC 9110 §13.1.2) : le préfixe W/ est ignoré
+    etags = parse_etags(if_none_match)
+    return '*' in etags or any(tag.removeprefix('W/') == etag for tag in etags)
+
+
+def _not_modified(response_class, request, etag):
+    response = response_class(status=status.HTTP_304_NOT_MODIFIED)
+    return _finalize(response, request, etag)
+
+
+def _finalize(response, request, etag):
+    response['ETag'] = etag
+    # Le navigateur garde la réponse mais la revalide à chaque affichage
+    patch_cache_control(response, no_cache=True, private=request.user.is_authenticated)
+    return response
+
+
+def conditional_get(scopes):
+    """
+    Ajoute un ETag aux réponses 200 d'une vue GET et répond 304 si le client
+    possède déjà la version courante.
+
+    `scopes(request, *args, **kwargs)` retourne les entités dont dépend la
+    réponse. À placer sous @api_view / @permission_classes, via
+    method_decorator, ou sous api.async_views.read_view : l'utilisateur est
+    authentifié et autorisé avant tout 304.
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                etag = await sync_to_async(compute_etag)(name, request, scopes(request, *args, **kwargs))
+                if_none_match = request.headers.get('If-None-Match')
+                if if_none_match and _matches(etag, if_none_match):
+                    return _not_modified(HttpResponseNotModified, request, etag)
+                response = await view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                return _finalize(response, request, etag)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag = compute_etag(name, request, scopes(request, *args, **kwargs))
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match and _matches(etag, if_none_match):
+                return _not_modified(Response, request, etag)
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            return _finalize(response, request, etag)
+        return wrapper
+    return decorator
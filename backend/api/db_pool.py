@@ -0,0 +1,124 @@
+"""
+Connexions à la base de données.
+
+Deux modes, choisis par DB_POOL ou par `?pool=1` dans DATABASE_URL :
+- pool psycopg 3 intégré à Django (PostgreSQL) : connexions ouvertes entre
+  min_size et max_size, vérifiées à leur sortie du pool, fermées après
+  max_idle secondes d'inactivité ; une requête attend au plus `timeout`
+  secondes une connexion libre ;
+- sinon connexions persistantes (CONN_MAX_AGE) vérifiées avant réutilisation
+  (CONN_HEALTH_CHECKS), seul mode disponible sous SQLite.
+
+Les options du pool peuvent aussi être passées dans l'URL :
+`postgres://...?pool=1&pool_max_size=20&pool_timeout=5`.
+
+Un processus fils (workers gunicorn avec --preload) n'utilise jamais le pool
+hérité du parent : il en crée un nouveau à sa première requête.
+"""
+import os
+
+POOL_OPTION_PREFIX = 'pool_'
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# Pools hérités lors d'un fork : leurs sockets appartiennent au processus
+# parent, les fermer couperait ses connexions. Gardés référencés, jamais utilisés.
+_inherited_pools = []
+
+
+def _enabled(value):
+    return str(value).lower() in TRUE_VALUES
+
+
+def configure(database, pool=False, pool_options=None, conn_max_age=60):
+    """
+    Complète la configuration d'une base (dictionnaire de DATABASES)
+    """
+    options = database.setdefault('OPTIONS', {})
+    pool_options = dict(pool_options or {})
+    if 'pool' in options and not isinstance(options['pool'], dict):
+        pool = _enabled(options.pop('pool'))
+    for name in [name for name in options if name.startswith(POOL_OPTION_PREFIX)]:
+        pool_options[name[len(POOL_OPTION_PREFIX):]] = options.pop(name)
+
+    database['CONN_HEALTH_CHECKS'] = True
+    if pool and database.get('ENGINE') == 'django.db.backends.postgresql':
+        from psycopg_pool import ConnectionPool
+
+        # Connexion vérifiée (SELECT 1) à chaque sortie du pool
+        options['pool'] = {'check': ConnectionPool.check_connection, **pool_options}
+        # Le pool remplace les connexions persistantes (incompatibles)
+        database['CONN_MAX_AGE'] = 0
+    else:
+        database['CONN_MAX_AGE'] = conn_max_age
+    return database
+
+
+def _forget_inherited_pools(wrapper_class):
+    _inherited_pools.extend(wrapper_class._connection_pools.values())
+    wrapper_class._connection_pools.clear()
+
+
+def install_fork_guard():
+    """
+    Après un fork, le processus fils abandonne les pools hérités
+    """
+    from django.conf import settings
+
+    if not any(isinstance(db.get('OPTIONS', {}).get('pool'), dict) for db in settings.DATABASES.values()):
+        return
+    from django.db.backends.postgresql.base import DatabaseWrapper
+
+    os.register_at_fork(after_in_child=lambda: _forget_inherited_pools(DatabaseWrapper))
+
+
+def stats():
+    """
+    État des connexions de chaque base : pool (connexions utilisées,
+    disponibles, requêtes en attente, temps d'attente) ou connexions persistantes
+    """
+    from django.db import connections
+
+    result = {}
+    for connection in connections.all():
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            result[connection.alias] = {
+                'pooled': False,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            }
+            continue
+        raw = pool.get_stats()
+        queued = raw.get('requests_queued', 0)
+        wait_ms = raw.get('requests_wait_ms', 0)
+        result[connection.alias] = {
+            'pooled': True,
+            'min_size': raw['pool_min'],
+            'max_size': raw['pool_max'],
+            'size': raw['pool_size'],
+            'in_use': raw['pool_size'] - raw['pool_available'],
+            'available': raw['pool_available'],
+            'waiting': raw.get('requests_waiting', 0),
+            'requests': raw.get('requests_num', 0),
+            'wait_ms_total': wait_ms,
+            'avg_wait_ms': round(wait_ms / queued, 2) if queued else 0.0,
+            'errors': raw.get('requests_errors', 0),
+            'connections_lost': raw.get('connections_lost', 0),
+        }
+    return result
+
+
+def metric_samples():
+    """
+    Occupation des pools de connexions (saturation : in_use proche de max_size, waiting > 0)
+    """
+    from .metrics import COUNTER, GAUGE
+
+    for alias, pool in stats().items():
+        if not pool['pooled']:
+            continue
+        labels = {'alias': alias}
+        yield 'db_pool_connections_in_use', GAUGE, "Connexions du pool utilisées", labels, pool['in_use']
+        yield 'db_pool_connections_max', GAUGE, "Taille maximale du pool", labels, pool['max_size']
+        yield 'db_pool_requests_waiting', GAUGE, "Requêtes en attente d'une connexion", labels, pool['waiting']
+        yield ('db_pool_wait_seconds_total', COUNTER, "Temps d'attente cumulé d'une connexion", labels,
+               pool['wait_ms_total'] / 1000)
@@ -0,0 +1,258 @@
+"""
+Lectures sur les réplicas PostgreSQL (REPLICA_DATABASES).
+
+ReplicaRoutingMiddleware marque les requêtes HTTP sûres (GET, HEAD, OPTIONS) ;
+pendant ces requêtes, ReplicaRouter envoie les lectures sur un réplica sain.
+Tout le reste lit et écrit sur la base principale :
+- requêtes d'écriture, commandes de gestion, tâches hors requête ;
+- lectures faites dans une transaction ou après une écriture de la même requête ;
+- lecture de vos écritures : pendant READ_YOUR_WRITES_WINDOW secondes après
+  une requête d'écriture, les requêtes de la même adresse ou du même
+  utilisateur lisent sur la base principale. L'adresse est celle du client
+  (X-Forwarded-For selon NUM_PROXIES), pas celle du proxy. L'utilisateur est
+  celui du token JWT de la requête d'écriture et celui des tokens que sa
+  réponse délivre (inscription, connexion, rafraîchissement) : la requête
+  suivante, faite avec le nouveau token ou depuis une autre adresse, voit
+  l'écriture ;
+- réplica en panne ou en retard de plus de REPLICA_MAX_LAG secondes : écarté
+  jusqu'à la vérification suivante (au plus toutes les REPLICA_CHECK_INTERVAL
+  secondes par processus).
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .throttling import client_ip
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class _State:
+    """
+    Routage de la requête en cours
+    """
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def current():
+    return _state.get()
+
+
+@contextmanager
+def routing(state):
+    """
+    Applique un état de routage (ex. dans un thread qui exécute une partie de la requête)
+    """
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+class _ReplicaHealth:
+    """
+    Réplicas utilisables, vérifiés (connexion et retard) au plus toutes les
+    REPLICA_CHECK_INTERVAL secondes
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.healthy = []
+        self.checked_at = None
+
+    def reset(self):
+        with self.lock:
+            self.healthy = []
+            self.checked_at = None
+
+    def available(self):
+        now = time.monotonic()
+        interval = getattr(settings, 'REPLICA_CHECK_INTERVAL', 5.0)
+        with self.lock:
+            if self.checked_at is not None and now - self.checked_at < interval:
+                return self.healthy
+            # Un seul thread vérifie ; les autres gardent le résultat précédent
+            self.checked_at = now
+        healthy = [alias for alias in getattr(settings, 'REPLICA_DATABASES', []) if check_replica(alias)]
+        with self.lock:
+            self.healthy = healthy
+        return healthy
+
+
+_health = _ReplicaHealth()
+
+
+def replication_lag(alias):
+    """
+    Retard du réplica en secondes (0 hors PostgreSQL)
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        connection.ensure_connection()
+        return 0.0
+    with connection.cursor() as cursor:
+        # NULL si rien n'a encore été rejoué (ou si la base n'est pas un réplica)
+        cursor.execute(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def check_replica(alias):
+    try:
+        lag = replication_lag(alias)
+    except DatabaseError:
+        logger.warning("Réplica %s indisponible, lectures sur la base principale", alias, exc_info=True)
+        return False
+    if lag > getattr(settings, 'REPLICA_MAX_LAG', 2.0):
+        logger.warning("Réplica %s en retard de %.1f s, lectures sur la base principale", alias, lag)
+        return False
+    return True
+
+
+class ReplicaRouter:
+    """
+    Lectures des requêtes sûres sur un réplica, tout le reste sur la base principale
+    """
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        replicas = _health.available()
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas contiennent les mêmes données que la base principale
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def _pin_key(client):
+    return 'db-routing:pin:' + hashlib.md5(client.encode()).hexdigest()
+
+
+def _token_user(token):
+    # Signature vérifiée, sans accès à la base
+    try:
+        return AccessToken(token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+def _pin_keys(request):
+    """
+    Clés du client pour la lecture de ses écritures : son adresse et
+    l'utilisateur du token JWT qu'il présente
+    """
+    keys = [_pin_key(f'addr:{client_ip(request)}')]
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        user_id = _token_user(header[7:])
+        if user_id is not None:
+            keys.append(_pin_key(f'user:{user_id}'))
+    return keys
+
+
+def _issued_pin_keys(response):
+    """
+    Clés des utilisateurs des tokens délivrés par la réponse
+    ({'tokens': {'access': ...}} ou {'access': ...})
+    """
+    if response is None or response.status_code >= 400:
+        return []
+    data = getattr(response, 'data', None)
+    if data is None:
+        if response.streaming or not response.get('Content-Type', '').startswith('application/json'):
+            return []
+        try:
+            data = json.loads(response.content)
+        except ValueError:
+            return []
+    if not isinstance(data, dict):
+        return []
+    tokens = data.get('tokens', data)
+    access = tokens.get('access') if isinstance(tokens, dict) else None
+    user_id = _token_user(access) if isinstance(access, str) else None
+    return [] if user_id is None else [_pin_key(f'user:{user_id}')]
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Choisit la base des lectures de chaque requête (voir le module)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def enabled(self):
+        return bool(getattr(settings, 'REPLICA_DATABASES', None))
+
+    def start(self, request):
+        keys = _pin_keys(request)
+        use_replica = request.method in SAFE_METHODS and not any(cache.get_many(keys).values())
+        return keys, _state.set(_State(use_replica))
+
+    def finish(self, request, response, keys, token):
+        _state.reset(token)
+        if request.method not in SAFE_METHODS:
+            keys = keys + _issued_pin_keys(response)
+            cache.set_many(dict.fromkeys(keys, True), getattr(settings, 'READ_YOUR_WRITES_WINDOW', 5))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled():
+            return self.get_response(request)
+        keys, token = self.start(request)
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self.finish(request, response, keys, token)
+
+    async def __acall__(self, request):
+        if not self.enabled():
+            return await self.get_response(request)
+        keys, token = self.start(request)
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self.finish(request, response, keys, token)
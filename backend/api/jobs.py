@@ -0,0 +1,320 @@
+"""
+File de tâches d'arrière-plan stockée dans la base du projet (modèle api.Job).
+
+Aucun broker externe : les tâches sont des lignes de la table api_job,
+prises en charge par la commande run_jobs (un ou plusieurs processus,
+chacun avec --concurrency threads).
+
+- Déclaration : @register('app.tache') dans le module tasks.py d'une
+  application (chargé au démarrage par autodiscover()) ; la fonction reçoit
+  les arguments de la tâche (JSON) en paramètres nommés.
+- Ajout : enqueue() enregistre la tâche dans la transaction en cours ; elle
+  n'est visible des workers qu'à la validation et disparaît avec un
+  rollback. enqueue_on_commit() ne l'ajoute qu'après la validation (pour un
+  appel fait hors de la transaction qui écrit les données).
+- Priorité : les tâches prêtes sont exécutées par priorité décroissante,
+  puis dans l'ordre d'échéance.
+- Déduplication : une seule tâche en attente par dedup_key (contrainte
+  unique partielle) ; un ajout en double est ignoré. Une tâche à reprendre
+  (échec, worker arrêté) alors qu'une autre de même clé attend déjà est
+  supprimée au profit de celle-ci.
+- Échecs : nouvelle tentative après un délai exponentiel
+  (JOB_RETRY_BACKOFF * 2^(n-1), plafonné à JOB_RETRY_BACKOFF_MAX), puis
+  état 'failed' après max_attempts tentatives. Une tâche réussie est
+  supprimée.
+- Worker arrêté en cours d'exécution : chaque worker prolonge la réservation
+  de ses tâches en cours toutes les JOB_LOCK_TIMEOUT / 3 secondes, si bien
+  qu'une tâche longue n'est jamais reprise pendant qu'elle s'exécute. Une
+  tâche 'running' dont la réservation a plus de JOB_LOCK_TIMEOUT secondes
+  (worker tué, ex. mémoire épuisée) est remise en attente, ou passe en
+  'failed' si elle a épuisé ses tentatives : une tâche qui fait tomber son
+  worker n'est pas reprise indéfiniment.
+- Tâches périodiques : @register(..., every=timedelta(...)) ; chaque worker
+  garantit qu'une occurrence est planifiée.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobType:
+    """
+    Tâche déclarée : fonction et options par défaut
+    """
+    def __init__(self, name, func, priority, max_attempts, every):
+        self.name = name
+        self.func = func
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.every = every
+
+
+registry = {}
+
+
+def register(name, priority=0, max_attempts=5, every=None):
+    def decorator(func):
+        if name in registry and registry[name].func is not func:
+            raise ValueError(f"Tâche déjà déclarée : {name}")
+        registry[name] = JobType(name, func, priority, max_attempts, every)
+        return func
+    return decorator
+
+
+def autodiscover():
+    autodiscover_modules('tasks')
+
+
+def enqueue(name, payload=None, priority=None, dedup_key=None, delay=None):
+    """
+    Ajoute une tâche (dans la transaction en cours) ; ignorée si une tâche
+    de même dedup_key est déjà en attente
+    """
+    job_type = registry[name]
+    Job.objects.bulk_create([Job(
+        name=name,
+        payload=payload or {},
+        priority=job_type.priority if priority is None else priority,
+        dedup_key=dedup_key,
+        max_attempts=job_type.max_attempts,
+        run_at=timezone.now() + (delay or timedelta()),
+    )], ignore_conflicts=dedup_key is not None)
+
+
+def enqueue_on_commit(name, payload=None, **options):
+    """
+    Ajoute la tâche après la validation de la transaction en cours
+    """
+    if name not in registry:
+        # Erreur dans l'appelant plutôt qu'à la validation
+        raise KeyError(name)
+    transaction.on_commit(lambda: enqueue(name, payload, **options))
+
+
+def backoff(attempts):
+    base = getattr(settings, 'JOB_RETRY_BACKOFF', 5)
+    delay = min(base * 2 ** (attempts - 1), getattr(settings, 'JOB_RETRY_BACKOFF_MAX', 3600))
+    # Étalement pour que des échecs simultanés ne réessaient pas ensemble
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def requeue(job_id, **fields):
+    """
+    Remet une tâche en attente ; si une tâche de même dedup_key a été ajoutée
+    pendant son exécution (contrainte unique), celle-ci la remplace et la
+    tâche est supprimée. False dans ce cas.
+    """
+    try:
+        # Point de sauvegarde : sous PostgreSQL, l'erreur annulerait la transaction englobante
+        with transaction.atomic():
+            Job.objects.filter(pk=job_id).update(status=Job.QUEUED, locked_by='', locked_at=None, **fields)
+    except IntegrityError:
+        Job.objects.filter(pk=job_id).delete()
+        return False
+    return True
+
+
+def lock_timeout():
+    return timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT', 600))
+
+
+def heartbeat(worker_id):
+    """
+    Prolonge la réservation des tâches en cours du worker
+    """
+    return Job.objects.filter(status=Job.RUNNING, locked_by=worker_id).update(locked_at=timezone.now())
+
+
+def requeue_stale():
+    """
+    Remet en attente les tâches d'un worker arrêté en cours d'exécution ;
+    celles qui ont épuisé leurs tentatives sont abandonnées
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - lock_timeout())
+    exhausted = stale.filter(attempts__gte=F('max_attempts'))
+    for job_id, name, attempts in exhausted.values_list('id', 'name', 'attempts'):
+        logger.error("Tâche %s #%s abandonnée après %s tentatives (worker arrêté pendant l'exécution)",
+                     name, job_id, attempts)
+        Job.objects.filter(pk=job_id).update(
+            status=Job.FAILED, locked_at=None,
+            last_error="Worker arrêté pendant l'exécution (réservation expirée)",
+        )
+    return sum(requeue(job_id) for job_id in stale.values_list('id', flat=True))
+
+
+def schedule_periodic():
+    """
+    Planifie une occurrence de chaque tâche périodique qui n'en a pas
+    """
+    for job_type in registry.values():
+        if job_type.every is not None and not Job.objects.filter(
+            name=job_type.name, status__in=[Job.QUEUED, Job.RUNNING]
+        ).exists():
+            enqueue(job_type.name, dedup_key=f'periodic:{job_type.name}')
+
+
+def claim(worker_id, limit):
+    """
+    Réserve au plus `limit` tâches prêtes pour ce worker
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by(
+        '-priority', 'run_at', 'id'
+    ).values_list('id', flat=True)[:limit * 2]
+    claimed = []
+    for job_id in candidates:
+        # Mise à jour conditionnelle : un autre worker a pu réserver la tâche entre-temps
+        if Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        ):
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    return list(Job.objects.filter(id__in=claimed).order_by('-priority', 'run_at', 'id'))
+
+
+def execute(job):
+    """
+    Exécute une tâche réservée, puis la supprime ou planifie une nouvelle tentative
+    """
+    job_type = registry.get(job.name)
+    try:
+        if job_type is None:
+            raise LookupError(f"Tâche inconnue : {job.name}")
+        job_type.func(**job.payload)
+    except Exception:
+        error = traceback.format_exc(limit=10)
+        if job_type is not None and job.attempts < job.max_attempts:
+            logger.warning("Tâche %s #%s en échec (tentative %s/%s)", job.name, job.pk, job.attempts,
+                           job.max_attempts, exc_info=True)
+            if not requeue(job.pk, run_at=timezone.now() + backoff(job.attempts), last_error=error):
+                logger.info("Tâche %s #%s remplacée par une tâche de même clé %s", job.name, job.pk,
+                            job.dedup_key)
+            return False
+        logger.error("Tâche %s #%s abandonnée après %s tentatives", job.name, job.pk, job.attempts,
+                     exc_info=True)
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, locked_at=None, last_error=error)
+        succeeded = False
+    else:
+        Job.objects.filter(pk=job.pk).delete()
+        succeeded = True
+
+    if job_type is not None and job_type.every is not None:
+        # Occurrence suivante, même après un abandon
+        enqueue(job.name, dedup_key=f'periodic:{job.name}', delay=job_type.every)
+    return succeeded
+
+
+class Worker:
+    """
+    Boucle de traitement : réserve des tâches et les exécute sur `concurrency` threads
+    """
+    def __init__(self, concurrency=1, poll_interval=1.0):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        self.stopping.set()
+
+    def run_job(self, job):
+        try:
+            return execute(job)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                # Comme en fin de requête HTTP : fermeture si périmée ou inutilisable
+                for connection in connections.all(initialized_only=True):
+                    connection.close_if_unusable_or_obsolete()
+
+    def beat(self, done):
+        """
+        Thread de prolongation des réservations, jusqu'à la fin de run()
+        """
+        interval = lock_timeout().total_seconds() / 3
+        try:
+            while not done.wait(interval):
+                try:
+                    heartbeat(self.worker_id)
+                except DatabaseError:
+                    logger.warning("Prolongation des réservations impossible", exc_info=True)
+        finally:
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+    def record(self, succeeded):
+        if succeeded:
+            self.processed += 1
+        else:
+            self.failed += 1
+
+    def idle(self, burst):
+        """
+        Aucune tâche prête ni en cours : True pour arrêter la boucle
+        """
+        if burst:
+            return True
+        self.stopping.wait(self.poll_interval)
+        requeue_stale()
+        return False
+
+    def run(self, burst=False):
+        """
+        Traite les tâches jusqu'à stop() ; avec `burst`, s'arrête quand plus
+        aucune tâche n'est prête
+        """
+        done = threading.Event()
+        beat = threading.Thread(target=self.beat, args=(done,), name='job-heartbeat', daemon=True)
+        beat.start()
+        try:
+            self.process(burst)
+        finally:
+            done.set()
+            beat.join()
+
+    def process(self, burst):
+        requeue_stale()
+        schedule_periodic()
+        if self.concurrency == 1:
+            # Dans le thread courant (et sa connexion, ex. dans les tests)
+            while not self.stopping.is_set():
+                jobs = claim(self.worker_id, 1)
+                if not jobs and self.idle(burst):
+                    break
+                for job in jobs:
+                    self.record(self.run_job(job))
+            return
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job') as executor:
+            running = set()
+            while not self.stopping.is_set():
+                # Chaque place libérée est aussitôt réattribuée
+                free = self.concurrency - len(running)
+                jobs = claim(self.worker_id, free) if free else []
+                running.update(executor.submit(self.run_job, job) for job in jobs)
+                if not running:
+                    if self.idle(burst):
+                        break
+                    continue
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.record(future.result())
+            for future in running:
+                self.record(future.result())
@@ -0,0 +1,263 @@
+import io
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.middleware import QueryCollector
+from reviews import urls as review_urls
+from reviews.models import MovieStats, Review
+from users import authentication, urls as user_urls
+
+User = get_user_model()
+
+PASSWORD = 'benchmark'
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure chaque URL de reviews.urls et users.urls sur plusieurs volumes de "
+        "données (latence p50/p95/p99, requêtes SQL, CPU, octets, pic mémoire) dans une base jetable"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000',
+                            help="Nombres de critiques à générer, séparés par des virgules")
+        parser.add_argument('--requests', type=int, default=50,
+                            help="Nombre de requêtes mesurées par scénario")
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--baseline', help="Fichier JSON de référence à comparer")
+        parser.add_argument('--max-regression', type=float, default=None,
+                            help="Échec si un p95 se dégrade de plus de ce pourcentage")
+        parser.add_argument('--accept-encoding', default='',
+                            help="En-tête Accept-Encoding envoyé (ex. 'br, gzip') ; vide = sans compression")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        perf_logger = logging.getLogger('api.performance')
+        previous_level = perf_logger.level
+        perf_logger.setLevel(logging.WARNING)
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = {}
+            for size in sizes:
+                self.stdout.write(f"== {size} critiques ==")
+                call_command('flush', interactive=False, verbosity=0)
+                # Les identifiants sont réutilisés après flush : repartir de caches vides
+                cache.clear()
+                authentication.clear()
+                call_command('generate_data', reviews=size, users=max(10, size // 10),
+                             password=PASSWORD, stdout=io.StringIO())
+                results[str(size)] = self.run_scenarios(options['requests'], options['accept_encoding'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            perf_logger.setLevel(previous_level)
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'requests_per_scenario': options['requests'],
+                'accept_encoding': options['accept_encoding'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['max_regression'])
+
+    # --- Scénarios -------------------------------------------------------
+
+    def scenarios(self, context):
+        """
+        Une requête représentative par URL nommée (et par méthode pour les vues
+        d'écriture) : (méthode, chemin, données, authentifiée ou jeton à utiliser)
+        """
+        user = context['user']
+
+        def logout(refresh):
+            return 'post', '/api/logout/', {'refresh': str(refresh)}, str(refresh.access_token)
+
+        return {
+            'review-list-create GET': lambda i: ('get', '/api/reviews/', None, True),
+            'review-list-create POST': lambda i: ('post', '/api/reviews/', {
+                'title': context['movie_title'], 'content': 'Critique de benchmark', 'rating': 4,
+            }, True),
+            'review-detail GET': lambda i: ('get', f"/api/reviews/{context['review_id']}/", None, True),
+            'review-detail PATCH': lambda i: ('patch', f"/api/reviews/{context['review_id']}/", {
+                'rating': 1 + i % 5,
+            }, True),
+            'movie-reviews GET': lambda i: ('get', f"/api/reviews/movie/{context['movie_title']}/", None, False),
+            'my-reviews GET': lambda i: ('get', '/api/reviews/my-reviews/', None, True),
+            'review-stats GET': lambda i: ('get', '/api/reviews/stats/', None, False),
+            'review-search GET': lambda i: ('get', '/api/reviews/search/?q=scenario', None, True),
+            'title-suggest GET': lambda i: ('get', f"/api/reviews/titles/suggest/?q={context['movie_title'][:4]}", None, False),
+            'review-export GET': lambda i: ('get', '/api/reviews/export/', None, True),
+            'register POST': lambda i: ('post', '/api/register/', {
+                'username': f'bench{i}', 'email': f'bench{i}@example.com',
+                'password': 'Benchmark-2024!', 'password2': 'Benchmark-2024!',
+            }, False),
+            'login POST': lambda i: ('post', '/api/login/', {'email': user.email, 'password': PASSWORD}, False),
+            # Jetons propres au scénario : la déconnexion révoque le jeton d'accès utilisé
+            'logout POST': lambda i: logout(RefreshToken.for_user(user)),
+            'password-hashing-stats GET': lambda i: ('get', '/api/auth/hashing-stats/', None, True),
+            'profile GET': lambda i: ('get', '/api/profile/', None, True),
+            'change-password POST': lambda i: ('post', '/api/profile/change-password/', {
+                'current_password': PASSWORD, 'new_password': PASSWORD,
+            }, True),
+            'user-list GET': lambda i: ('get', '/api/users/', None, True),
+            'user-detail GET': lambda i: ('get', f"/api/users/{context['other_user_id']}/", None, False),
+        }
+
+    def build_context(self):
+        # L'utilisateur le plus actif rend "mes critiques" représentatif du pire cas
+        user = User.objects.annotate(n=Count('reviews')).order_by('-n').first()
+        movie = MovieStats.objects.order_by('-review_count').first()
+        return {
+            'user': user,
+            'token': str(RefreshToken.for_user(user).access_token),
+            'review_id': Review.objects.filter(author=user).values_list('id', flat=True).first(),
+            'movie_title': movie.title if movie else 'Inception',
+            'other_user_id': User.objects.exclude(pk=user.pk).values_list('id', flat=True).first(),
+        }
+
+    def check_coverage(self, scenarios):
+        names = {
+            pattern.name
+            for module in (review_urls, user_urls)
+            for pattern in module.urlpatterns
+            if pattern.name
+        }
+        covered = {name.split(' ')[0] for name in scenarios}
+        missing = names - covered
+        if missing:
+            raise CommandError(f"URLs sans scénario de benchmark : {', '.join(sorted(missing))}")
+
+    def run_scenarios(self, count, accept_encoding=''):
+        context = self.build_context()
+        scenarios = self.scenarios(context)
+        self.check_coverage(scenarios)
+        client = Client(HTTP_HOST='localhost')
+        results = {}
+        iteration = 0
+
+        def send(build):
+            nonlocal iteration
+            iteration += 1
+            method, path, data, authenticated = build(iteration)
+            token = authenticated if isinstance(authenticated, str) else context['token']
+            headers = {'HTTP_AUTHORIZATION': f"Bearer {token}"} if authenticated else {}
+            if accept_encoding:
+                headers['HTTP_ACCEPT_ENCODING'] = accept_encoding
+            if data is None:
+                response = getattr(client, method)(path, **headers)
+            else:
+                response = getattr(client, method)(path, json.dumps(data), content_type='application/json', **headers)
+            if response.streaming:
+                # Les réponses en flux ne sont produites qu'à la lecture
+                response.size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                response.size = len(response.content)
+            return response
+
+        for name, build in scenarios.items():
+            # Préchauffage
+            for _ in range(2):
+                send(build)
+
+            timings = []
+            collector = QueryCollector()
+            statuses = set()
+            sizes = []
+            cpu_start = time.process_time()
+            for _ in range(count):
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(collector))
+                    start = time.perf_counter()
+                    response = send(build)
+                    timings.append((time.perf_counter() - start) * 1000)
+                statuses.add(response.status_code)
+                sizes.append(response.size)
+            cpu = time.process_time() - cpu_start
+
+            # Pic mémoire mesuré à part (tracemalloc fausserait les latences)
+            tracemalloc.start()
+            send(build)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[name] = {
+                'p50_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'queries_per_request': round(collector.count / count, 2),
+                # Octets envoyés (après compression éventuelle) et temps CPU du processus
+                'bytes_per_response': round(statistics.mean(sizes)),
+                'cpu_ms_per_request': round(cpu * 1000 / count, 3),
+                'peak_memory_kb': round(peak / 1024, 1),
+                'status_codes': sorted(statuses),
+            }
+            self.stdout.write(
+                f"  {name:<26} p50={results[name]['p50_ms']:>8.2f}ms "
+                f"p95={results[name]['p95_ms']:>8.2f}ms p99={results[name]['p99_ms']:>8.2f}ms "
+                f"requêtes={results[name]['queries_per_request']:>6} "
+                f"cpu={results[name]['cpu_ms_per_request']:>7.2f}ms "
+                f"octets={results[name]['bytes_per_response']:>8} "
+                f"mémoire={results[name]['peak_memory_kb']:>8}Ko"
+            )
+        return results
+
+    # --- Comparaison avec une référence ----------------------------------
+
+    def compare(self, report, baseline_path, max_regression):
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+        regressions = []
+        for size, scenarios in report['results'].items():
+            for name, current in scenarios.items():
+                reference = baseline.get(size, {}).get(name)
+                if reference is None:
+                    continue
+                delta = (current['p95_ms'] - reference['p95_ms']) / reference['p95_ms'] * 100 if reference['p95_ms'] else 0
+                queries = current['queries_per_request'] - reference['queries_per_request']
+                line = f"  [{size}] {name:<26} p95 {delta:+7.1f}%  requêtes {queries:+.2f}"
+                # Références antérieures à la mesure des octets et du CPU
+                if 'bytes_per_response' in reference:
+                    line += (
+                        f"  octets {current['bytes_per_response'] - reference['bytes_per_response']:+d}"
+                        f"  cpu {current['cpu_ms_per_request'] - reference['cpu_ms_per_request']:+.2f}ms"
+                    )
+                self.stdout.write(line)
+                if queries > 0:
+                    regressions.append(f"[{size}] {name}: +{queries:.2f} requêtes SQL")
+                if max_regression is not None and delta > max_regression:
+                    regressions.append(f"[{size}] {name}: p95 {delta:+.1f}%")
+        if regressions:
+            raise CommandError("Régressions détectées :\n" + "\n".join(regressions))
@@ -0,0 +1,70 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import setup_databases, teardown_databases
+
+from api import renderers
+from reviews.models import Review
+from reviews.serializers import ReviewListSerializer, ReviewListValuesSerializer
+from users.serializers import UserListSerializer, UserListValuesSerializer
+from users.views import user_list_queryset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit (lignes/s) des ModelSerializer de liste et de leurs "
+        "variantes values_list(), requête SQL et rendu JSON compris, dans une base jetable"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help="Lignes par liste sérialisée")
+        parser.add_argument('--repeat', type=int, default=20, help="Nombre de mesures par variante")
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            call_command('generate_data', reviews=rows, users=rows + 1, stdout=io.StringIO())
+            context = {'request': RequestFactory(HTTP_HOST='localhost').get('/api/users/')}
+            reviews = Review.objects.order_by('-created_at', '-id')[:rows]
+            users = user_list_queryset(None)[:rows]
+            cases = {
+                'reviews': (
+                    lambda: ReviewListSerializer(reviews.select_related('author'), many=True).data,
+                    lambda: self.values(ReviewListValuesSerializer(), reviews),
+                ),
+                'users': (
+                    lambda: UserListSerializer(users, many=True, context=context).data,
+                    lambda: self.values(UserListValuesSerializer(context), users),
+                ),
+            }
+            for name, (model_path, values_path) in cases.items():
+                before = self.measure(model_path, repeat)
+                after = self.measure(values_path, repeat)
+                self.stdout.write(
+                    f"  {name:<8} ModelSerializer={before:>10,.0f} lignes/s  "
+                    f"values_list={after:>10,.0f} lignes/s  (x{after / before:.1f})"
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+    @staticmethod
+    def values(serializer, queryset):
+        return serializer.serialize(serializer.values(queryset))
+
+    @staticmethod
+    def measure(serialize, repeat):
+        # Préchauffage, puis meilleur temps (le moins perturbé par le reste du système)
+        count = len(serialize())
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderers.dumps(serialize())
+            timings.append(time.perf_counter() - start)
+        return count / min(timings)
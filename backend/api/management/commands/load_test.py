@@ -0,0 +1,231 @@
+"""
+Test de charge des vues de lecture : le même scénario est servi par gunicorn
+en workers synchrones (WSGI, déploiement actuel), puis par gunicorn avec des
+workers uvicorn et ASYNC_READ_VIEWS (ASGI), au même nombre de processus, à
+N clients simultanés. Le rapport donne pour chaque mode et chaque N le débit,
+les latences p50/p95/p99 et les erreurs.
+
+Les serveurs sont lancés sur la base configurée (DATABASE_URL), qui doit être
+jetable : --reviews y ajoute des données de synthèse. Le cache des réponses
+est désactivé par défaut (RESPONSE_CACHE_TIMEOUT=0) pour mesurer l'attente
+de la base plutôt que le cache. Les clients sont des threads du processus de
+la commande, sur la même machine que le serveur.
+"""
+import http.client
+import json
+import os
+import platform
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import MovieStats
+
+from .benchmark_api import percentile
+
+User = get_user_model()
+
+# Mode -> (arguments de gunicorn, variables d'environnement)
+MODES = {
+    'wsgi': (['config.wsgi:application'], {'ASYNC_READ_VIEWS': '0'}),
+    'asgi': (['config.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'], {'ASYNC_READ_VIEWS': '1'}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare gunicorn (workers synchrones) et uvicorn avec ASYNC_READ_VIEWS sur les vues "
+        "de lecture à N clients simultanés (débit, latences, erreurs)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default='wsgi,asgi', help="Modes comparés, parmi wsgi et asgi")
+        parser.add_argument('--clients', default='10,50,200',
+                            help="Nombres de clients simultanés, séparés par des virgules")
+        parser.add_argument('--duration', type=float, default=15, help="Durée de chaque mesure en secondes")
+        parser.add_argument('--workers', type=int, default=1, help="Processus gunicorn par serveur")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--reviews', type=int, default=0,
+                            help="Critiques de synthèse à ajouter avant la mesure (generate_data)")
+        parser.add_argument('--response-cache', action='store_true',
+                            help="Garder le cache des réponses (désactivé par défaut)")
+        parser.add_argument('--output', default='load_test.json')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - MODES.keys()
+        if unknown:
+            raise CommandError(f"Modes inconnus : {', '.join(sorted(unknown))}")
+        clients = [int(n) for n in options['clients'].split(',') if n.strip()]
+        if options['reviews']:
+            call_command('generate_data', reviews=options['reviews'], users=max(10, options['reviews'] // 10),
+                         stdout=self.stdout)
+        requests = self.build_requests()
+
+        results = {}
+        for mode in modes:
+            self.stdout.write(f"== {mode} ({options['workers']} processus) ==")
+            server = self.start_server(mode, options)
+            try:
+                self.wait_ready(options['port'], server)
+                results[mode] = {}
+                for n in clients:
+                    result = self.run_load(options['port'], requests, n, options['duration'])
+                    results[mode][str(n)] = result
+                    self.stdout.write(
+                        f"  {n:>4} clients  {result['requests_per_second']:>8.1f} req/s  "
+                        f"p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+                        f"p99={result['p99_ms']:>8.2f}ms erreurs={result['errors']}"
+                    )
+            finally:
+                self.stop_server(server)
+
+        if {'wsgi', 'asgi'} <= results.keys():
+            self.stdout.write("== asgi / wsgi ==")
+            for n in clients:
+                wsgi, asgi = results['wsgi'][str(n)], results['asgi'][str(n)]
+                ratio = asgi['requests_per_second'] / wsgi['requests_per_second'] if wsgi['requests_per_second'] else 0
+                self.stdout.write(f"  {n:>4} clients  débit x{ratio:.2f}  p95 {asgi['p95_ms'] - wsgi['p95_ms']:+.2f}ms")
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'workers': options['workers'],
+                'duration': options['duration'],
+                'response_cache': options['response_cache'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+    # --- Scénario --------------------------------------------------------
+
+    def build_requests(self):
+        """
+        Requêtes de lecture servies par les vues asynchrones : (chemin, en-têtes)
+        """
+        users = list(User.objects.annotate(n=Count('reviews')).filter(n__gt=0).order_by('-n')[:20])
+        titles = list(MovieStats.objects.order_by('-review_count').values_list('title', flat=True)[:50])
+        if not users or not titles:
+            raise CommandError("Base sans critiques : relancer avec --reviews")
+        auth = [{'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'} for user in users]
+        requests = [('/api/reviews/stats/', {})]
+        requests += [(f'/api/reviews/movie/{quote(title)}/', {}) for title in titles]
+        requests += [('/api/reviews/my-reviews/', headers) for headers in auth]
+        requests += [('/api/users/', headers) for headers in auth]
+        requests += [(f'/api/users/{user.pk}/', {}) for user in users]
+        return requests
+
+    # --- Serveur ---------------------------------------------------------
+
+    def start_server(self, mode, options):
+        args, env = MODES[mode]
+        # Une ligne de log par requête fausserait la mesure
+        env = {**os.environ, 'PERFORMANCE_LOG_LEVEL': 'WARNING', **env}
+        if not options['response_cache']:
+            env['RESPONSE_CACHE_TIMEOUT'] = '0'
+        command = [
+            sys.executable, '-m', 'gunicorn', *args,
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--backlog', '2048',
+            '--log-level', 'warning',
+        ]
+        return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+
+    def wait_ready(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"Le serveur s'est arrêté (code {server.returncode})")
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', '/api/reviews/stats/')
+                connection.getresponse().read()
+                connection.close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError("Le serveur ne répond pas")
+
+    def stop_server(self, server):
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    # --- Charge ----------------------------------------------------------
+
+    def run_load(self, port, requests, clients, duration):
+        """
+        `clients` connexions persistantes enchaînant des requêtes pendant `duration` secondes
+        """
+        timings = []
+        errors = []
+        lock = threading.Lock()
+        start_barrier = threading.Barrier(clients + 1)
+        deadline = None
+
+        def client(seed):
+            rng = random.Random(seed)
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            local_timings, local_errors = [], 0
+            start_barrier.wait()
+            while time.monotonic() < deadline:
+                path, headers = rng.choice(requests)
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException):
+                    local_errors += 1
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                    continue
+                local_timings.append((time.perf_counter() - start) * 1000)
+                if response.status >= 400:
+                    local_errors += 1
+            connection.close()
+            with lock:
+                timings.extend(local_timings)
+                errors.append(local_errors)
+
+        threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + duration
+        start_barrier.wait()
+        for thread in threads:
+            thread.join()
+
+        if not timings:
+            return {'requests': 0, 'requests_per_second': 0, 'p50_ms': 0, 'p95_ms': 0, 'p99_ms': 0,
+                    'errors': sum(errors)}
+        return {
+            'requests': len(timings),
+            'requests_per_second': round(len(timings) / duration, 1),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,35 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute les tâches d'arrière-plan de la file api.jobs (service worker, "
+        "ou --burst depuis une tâche planifiée)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int,
+                            default=getattr(settings, 'JOB_WORKER_CONCURRENCY', 2),
+                            help="Tâches exécutées en parallèle (threads)")
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'JOB_POLL_INTERVAL', 1.0),
+                            help="Attente en secondes quand aucune tâche n'est prête")
+        parser.add_argument('--burst', action='store_true',
+                            help="S'arrêter dès qu'aucune tâche n'est prête")
+
+    def handle(self, *args, **options):
+        worker = jobs.Worker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+        # Arrêt propre : les tâches en cours se terminent
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(f"Worker {worker.worker_id} : {worker.concurrency} thread(s), "
+                          f"{len(jobs.registry)} tâche(s) déclarée(s)")
+        worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{worker.processed} tâches exécutées, {worker.failed} en échec"
+        ))
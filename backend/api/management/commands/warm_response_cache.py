@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from reviews.models import MovieStats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Préchauffe le cache des réponses publiques (statistiques, pages des films "
+        "et fiches des auteurs les plus consultés), par exemple après un déploiement"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movies', type=int, default=50, help="Nombre de films les plus critiqués")
+        parser.add_argument('--users', type=int, default=50, help="Nombre d'auteurs les plus actifs")
+        parser.add_argument('--host', default='localhost',
+                            help="Hôte public de l'API (fait partie de la clé de cache et des liens de pagination)")
+        parser.add_argument('--https', action='store_true', help="Requêtes en HTTPS")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'], secure=options['https'])
+        # Un titre contenant « / » ne correspond à aucune URL de film
+        titles = MovieStats.objects.filter(review_count__gt=0).exclude(title__contains='/').order_by('-review_count').values_list(
+            'title', flat=True
+        )[:options['movies']]
+        user_ids = User.objects.annotate(n=Count('reviews')).filter(n__gt=0).order_by('-n').values_list(
+            'id', flat=True
+        )[:options['users']]
+        urls = [reverse('review-stats')]
+        urls += [reverse('movie-reviews', args=[title]) for title in titles]
+        urls += [reverse('user-detail', args=[user_id]) for user_id in user_ids]
+
+        warmed = 0
+        for url in urls:
+            response = client.get(url)
+            if response.status_code == 200:
+                warmed += 1
+            else:
+                self.stderr.write(f"{url} : {response.status_code}")
+        self.stdout.write(self.style.SUCCESS(f"{warmed}/{len(urls)} réponses mises en cache"))
@@ -0,0 +1,346 @@
+"""
+Métriques au format d'exposition Prometheus (vue /metrics).
+
+Chaque processus tient ses compteurs, jauges et histogrammes en mémoire :
+enregistrer une requête ne coûte que quelques mises à jour de dictionnaires
+sous verrou (quelques microsecondes), sans écriture ni appel réseau.
+
+Avec plusieurs workers gunicorn, chaque processus recopie son état toutes
+les METRICS_FLUSH_INTERVAL secondes dans un fichier de METRICS_DIR
+(<pid>-<démarrage>.json, remplacé atomiquement) ; /metrics, servi par
+n'importe quel worker, additionne les fichiers de tous les processus :
+- compteurs et histogrammes : tous les processus, y compris ceux qui se
+  sont arrêtés, pour que les totaux ne reculent pas au recyclage d'un worker ;
+- jauges (requêtes en cours, hachages en attente, connexions utilisées) :
+  processus encore vivants seulement.
+METRICS_DIR doit être local au serveur et vidé à chaque déploiement (ex.
+répertoire temporaire du conteneur). Sans METRICS_DIR (un seul processus,
+développement et tests), /metrics expose l'état du processus courant.
+
+Les valeurs déjà suivies ailleurs (pool de hachage, cache des réponses,
+pool de connexions) sont lues au moment de la recopie par des collecteurs
+(register_collector) plutôt que comptées deux fois.
+"""
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTER, GAUGE, HISTOGRAM = 'counter', 'gauge', 'histogram'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Secondes (seaux par défaut des clients Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+registry = {}
+collectors = []
+
+
+class Metric:
+    """
+    Famille de métriques du processus : valeurs par combinaison d'étiquettes
+    """
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=(), buckets=()):
+        if name in registry:
+            raise ValueError(f"Métrique déjà déclarée : {name}")
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.values = {}
+        registry[name] = self
+
+    def samples(self):
+        with self.lock:
+            return [
+                [list(zip(self.labelnames, labels)), list(value) if isinstance(value, list) else value]
+                for labels, value in self.values.items()
+            ]
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Counter(Metric):
+    kind = COUNTER
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = GAUGE
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Valeur : effectif de chaque seau (non cumulé, +Inf en dernier) puis somme
+    """
+    kind = HISTOGRAM
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+
+def register_collector(collect):
+    """
+    Ajoute une fonction lue à chaque recopie : itérable de
+    (nom, type, aide, étiquettes, valeur) pour des compteurs ou des jauges
+    """
+    if collect not in collectors:
+        collectors.append(collect)
+    return collect
+
+
+requests_total = Counter(
+    'http_requests_total', "Requêtes HTTP traitées", ['view', 'method', 'status'])
+request_duration = Histogram(
+    'http_request_duration_seconds', "Durée des requêtes HTTP", ['view', 'method'], LATENCY_BUCKETS)
+requests_in_progress = Gauge(
+    'http_requests_in_progress', "Requêtes HTTP en cours de traitement")
+db_queries_total = Counter(
+    'db_queries_total', "Requêtes SQL exécutées par les requêtes HTTP", ['view'])
+db_duration = Histogram(
+    'http_request_db_duration_seconds', "Temps passé en base par requête HTTP", ['view'], LATENCY_BUCKETS)
+
+
+def request_started():
+    if not _started:
+        start()
+    requests_in_progress.inc()
+
+
+def request_finished():
+    requests_in_progress.dec()
+
+
+def record_request(view, method, status, duration, queries, db_seconds):
+    """
+    Enregistre une requête terminée (RequestTimingMiddleware)
+    """
+    view = view or 'unmatched'
+    method = method if method in METHODS else 'other'
+    requests_total.inc(view, method, str(status))
+    request_duration.observe(duration, view, method)
+    if queries:
+        db_queries_total.inc(view, amount=queries)
+    db_duration.observe(db_seconds, view)
+
+
+def snapshot():
+    """
+    État du processus : {nom: {'kind', 'help', 'buckets', 'samples': [[étiquettes, valeur], ...]}}
+    """
+    families = {
+        metric.name: {
+            'kind': metric.kind, 'help': metric.help, 'buckets': list(metric.buckets),
+            'samples': metric.samples(),
+        }
+        for metric in registry.values()
+    }
+    families['app_processes'] = {
+        'kind': GAUGE, 'help': "Processus servant l'application", 'buckets': [], 'samples': [[[], 1]],
+    }
+    for collect in collectors:
+        try:
+            for name, kind, help_text, labels, value in collect():
+                family = families.setdefault(name, {'kind': kind, 'help': help_text, 'buckets': [], 'samples': []})
+                family['samples'].append([list(labels.items()), value])
+        except Exception:
+            logger.exception("Collecteur de métriques en échec : %s", collect)
+    return families
+
+
+def merge(snapshots):
+    """
+    Somme des états [(familles, processus vivant), ...] ; les jauges des
+    processus arrêtés sont ignorées
+    """
+    merged = {}
+    for families, alive in snapshots:
+        for name, family in families.items():
+            if family['kind'] == GAUGE and not alive:
+                continue
+            target = merged.setdefault(name, {
+                'kind': family['kind'], 'help': family['help'], 'buckets': family['buckets'], 'samples': {},
+            })
+            for labels, value in family['samples']:
+                key = tuple(tuple(pair) for pair in labels)
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target['samples'][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target['samples'][key] = current + value
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(merged):
+    """
+    Format d'exposition texte de Prometheus
+    """
+    lines = []
+    for name in sorted(merged):
+        family = merged[name]
+        lines.append(f'# HELP {name} {family["help"]}')
+        lines.append(f'# TYPE {name} {family["kind"]}')
+        for labels, value in sorted(family['samples'].items()):
+            if family['kind'] != HISTOGRAM:
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*family['buckets'], float('inf')], value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels([*labels, ("le", _number(float(bound)))])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+# Recopie périodique (mode multiprocessus)
+
+_process_id = f'{os.getpid()}-{time.time_ns()}'
+_started = False
+_start_lock = threading.Lock()
+
+
+def _directory():
+    return getattr(settings, 'METRICS_DIR', '') or None
+
+
+def flush():
+    """
+    Recopie l'état du processus dans METRICS_DIR
+    """
+    directory = _directory()
+    if directory is None:
+        return
+    path = os.path.join(directory, f'{_process_id}.json')
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(snapshot(), file)
+    os.replace(f'{path}.tmp', path)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(getattr(settings, 'METRICS_FLUSH_INTERVAL', 5))
+        try:
+            flush()
+        except Exception:
+            logger.exception("Recopie des métriques impossible")
+
+
+def start():
+    """
+    Démarre la recopie périodique (une fois par processus, à sa première requête)
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        directory = _directory()
+        if directory is None:
+            return
+        os.makedirs(directory, exist_ok=True)
+        threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """
+    État agrégé de tous les processus (ou du seul processus courant sans METRICS_DIR)
+    """
+    directory = _directory()
+    if directory is None:
+        return merge([(snapshot(), True)])
+    os.makedirs(directory, exist_ok=True)
+    flush()
+    snapshots = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            pid = int(entry.name.split('-', 1)[0])
+            with open(entry.path) as file:
+                families = json.load(file)
+        except (OSError, ValueError):
+            # Nom inattendu ou fichier supprimé entre-temps
+            continue
+        snapshots.append((families, _alive(pid)))
+    return merge(snapshots)
+
+
+def _after_fork():
+    # Un worker forké (gunicorn --preload) repart de zéro avec sa propre recopie
+    global _process_id, _started, _start_lock
+    _process_id = f'{os.getpid()}-{time.time_ns()}'
+    _started = False
+    _start_lock = threading.Lock()
+    for metric in registry.values():
+        metric.lock = threading.Lock()
+        metric.values.clear()
+
+
+def _flush_at_exit():
+    # Derniers compteurs d'un worker arrêté proprement
+    if _started:
+        try:
+            flush()
+        except Exception:
+            logger.exception("Recopie des métriques impossible")
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_flush_at_exit)
@@ -0,0 +1,208 @@
+"""
+Instrumentation des requêtes : nombre de requêtes SQL, temps base de données,
+temps de la vue et temps de sérialisation (rendu JSON), repris dans les
+métriques Prometheus (api.metrics)
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import tracing
+from .metrics import record_request, request_finished, request_started
+
+logger = logging.getLogger('api.performance')
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Levée (en test) quand une vue dépasse son budget de requêtes SQL
+    """
+
+
+def query_budget(max_queries):
+    """
+    Déclare le nombre maximal de requêtes SQL autorisées pour une vue.
+
+    S'applique aussi bien à une vue fonction (@api_view) qu'à une classe de vue.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class QueryCollector:
+    """
+    Wrapper d'exécution qui compte les requêtes et cumule leur durée
+    (y compris depuis les threads de api.async_db)
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.duration += elapsed
+                self.count += 1
+
+
+# Collecteur de la requête HTTP en cours. Les threads de sync_to_async (ORM
+# asynchrone) héritent du contexte ; ceux de api.async_db le reçoivent
+# explicitement. Chaque thread ayant ses propres connexions, le comptage se
+# fait par un wrapper installé sur toutes les connexions (count_queries).
+_collector = contextvars.ContextVar('query_collector', default=None)
+
+
+def current_collector():
+    return _collector.get()
+
+
+def count_queries(execute, sql, params, many, context):
+    """
+    Wrapper d'exécution de chaque connexion : compte la requête dans le
+    collecteur du contexte courant
+    """
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    return collector(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    # Signal connection_created (ApiConfig.ready)
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+@contextmanager
+def collect_queries(collector):
+    """
+    Compte dans `collector` les requêtes exécutées dans le contexte courant
+    """
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+class RequestTimingMiddleware:
+    """
+    Mesure chaque requête et expose les temps via l'en-tête Server-Timing
+    et une ligne de log structurée (JSON)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        collector = QueryCollector()
+        request._timing = {'start': time.perf_counter()}
+        request_id, trace_tokens = tracing.start(request)
+        request_started()
+        try:
+            with collect_queries(collector):
+                response = self.get_response(request)
+        finally:
+            request_finished()
+            tracing.finish(trace_tokens)
+        return self.finish(request, response, collector, request_id)
+
+    async def __acall__(self, request):
+        # Sous ASGI : la chaîne reste asynchrone jusqu'aux vues async
+        collector = QueryCollector()
+        request._timing = {'start': time.perf_counter()}
+        request_id, trace_tokens = tracing.start(request)
+        request_started()
+        try:
+            with collect_queries(collector):
+                response = await self.get_response(request)
+        finally:
+            request_finished()
+            tracing.finish(trace_tokens)
+        return self.finish(request, response, collector, request_id)
+
+    def finish(self, request, response, collector, request_id):
+        timing = request._timing
+        end = time.perf_counter()
+
+        view_start = timing.get('view_start')
+        render_start = timing.get('render_start')
+        metrics = {
+            'db': collector.duration,
+            'view': ((render_start or end) - view_start) if view_start else 0.0,
+            'serialize': (end - render_start) if render_start else 0.0,
+            'total': end - timing['start'],
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={value * 1000:.2f}' for name, value in metrics.items()
+        ) + f', queries;desc="{collector.count}"'
+        response['X-Request-ID'] = request_id
+        record_request(timing.get('view_name'), request.method, response.status_code, metrics['total'],
+                       collector.count, collector.duration)
+
+        logger.info('%s', LazyJSON({
+            'request_id': request_id,
+            'method': request.method,
+            'path': request.path,
+            'view': timing.get('view_name'),
+            'status': response.status_code,
+            'queries': collector.count,
+            **{f'{name}_ms': round(value * 1000, 2) for name, value in metrics.items()},
+        }))
+
+        budget = timing.get('budget')
+        if budget is not None and collector.count > budget:
+            self.budget_exceeded(timing.get('view_name'), collector.count, budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = request._timing
+        timing['view_start'] = time.perf_counter()
+        timing['view_name'] = getattr(request.resolver_match, 'view_name', None)
+        view_class = getattr(view_func, 'view_class', None)
+        timing['budget'] = getattr(
+            view_func, 'query_budget', getattr(view_class, 'query_budget', None)
+        )
+        return None
+
+    def process_template_response(self, request, response):
+        # Appelé juste avant le rendu JSON de la réponse DRF
+        request._timing['render_start'] = time.perf_counter()
+        return response
+
+    def budget_exceeded(self, view_name, count, budget):
+        message = f"Budget de requêtes dépassé pour {view_name}: {count} > {budget}"
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class LazyJSON:
+    """
+    Sérialise le contenu en JSON uniquement si la ligne de log est émise
+    """
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, ensure_ascii=False)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title_key', models.CharField(max_length=200, unique=True, verbose_name='Titre normalisé')),
+                ('title', models.CharField(max_length=200, verbose_name='Titre recherché')),
+                ('found', models.BooleanField(default=False, verbose_name='Trouvé sur TMDB')),
+                ('tmdb_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Identifiant TMDB')),
+                ('poster_path', models.CharField(blank=True, max_length=255, verbose_name="Chemin de l'affiche")),
+                ('year', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Année de sortie')),
+                ('fetched_at', models.DateTimeField(verbose_name='Date de récupération')),
+            ],
+            options={
+                'verbose_name': 'Métadonnées de film',
+                'verbose_name_plural': 'Métadonnées de films',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_moviemetadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Tâche')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Arguments')),
+                ('status', models.CharField(choices=[('queued', 'En attente'), ('running', 'En cours'), ('failed', 'Échouée')], default='queued', max_length=10, verbose_name='État')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Priorité')),
+                ('dedup_key', models.CharField(blank=True, max_length=200, null=True, verbose_name='Clé de déduplication')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='Tentatives maximum')),
+                ('run_at', models.DateTimeField(verbose_name='Exécution à partir de')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Prise en charge')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+            ],
+            options={
+                'verbose_name': "Tâche d'arrière-plan",
+                'verbose_name_plural': "Tâches d'arrière-plan",
+                'indexes': [models.Index(fields=['status', '-priority', 'run_at', 'id'], name='job_ready_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'queued')), fields=('dedup_key',), name='job_queued_dedup_key_unique')],
+            },
+        ),
+    ]
@@ -1,3 +1,74 @@
 from django.db import models
 
-# Create your models here.
+
+class MovieMetadata(models.Model):
+    """
+    Cache persistant des métadonnées TMDB d'un titre de film
+    """
+    title_key = models.CharField(max_length=200, unique=True, verbose_name="Titre normalisé")
+    title = models.CharField(max_length=200, verbose_name="Titre recherché")
+    found = models.BooleanField(default=False, verbose_name="Trouvé sur TMDB")
+    tmdb_id = models.PositiveIntegerField(null=True, blank=True, verbose_name="Identifiant TMDB")
+    poster_path = models.CharField(max_length=255, blank=True, verbose_name="Chemin de l'affiche")
+    year = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Année de sortie")
+    fetched_at = models.DateTimeField(verbose_name="Date de récupération")
+
+    class Meta:
+        verbose_name = "Métadonnées de film"
+        verbose_name_plural = "Métadonnées de films"
+
+    def __str__(self):
+        return f"{self.title} ({self.tmdb_id or 'inconnu'})"
+
+    def as_dict(self):
+        return {
+            'tmdb_id': self.tmdb_id,
+            'poster_path': self.poster_path or None,
+            'year': self.year,
+        }
+
+
+class Job(models.Model):
+    """
+    Tâche d'arrière-plan en attente ou en cours (api.jobs)
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, "En attente"),
+        (RUNNING, "En cours"),
+        (FAILED, "Échouée"),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name="Tâche")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Arguments")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name="État")
+    priority = models.SmallIntegerField(default=0, verbose_name="Priorité")
+    dedup_key = models.CharField(max_length=200, null=True, blank=True, verbose_name="Clé de déduplication")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Tentatives")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="Tentatives maximum")
+    run_at = models.DateTimeField(verbose_name="Exécution à partir de")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Prise en charge")
+    last_error = models.TextField(blank=True, verbose_name="Dernière erreur")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
+
+    class Meta:
+        verbose_name = "Tâche d'arrière-plan"
+        verbose_name_plural = "Tâches d'arrière-plan"
+        indexes = [
+            # Sélection des tâches prêtes par priorité puis ancienneté
+            models.Index(fields=['status', '-priority', 'run_at', 'id'], name='job_ready_idx'),
+        ]
+        constraints = [
+            # Une seule tâche en attente par clé ; une tâche en cours n'empêche pas d'en ajouter une
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status='queued'),
+                name='job_queued_dedup_key_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
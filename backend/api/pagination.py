@@ -0,0 +1,135 @@
+"""
+Pagination par curseur (keyset) pour les listes de critiques et d'utilisateurs
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination keyset sur un tuple de colonnes (ex. created_at, id).
+
+    Chaque page est obtenue par un filtre `WHERE (a, b) < (x, y)` sur un index,
+    ce qui rend les pages profondes aussi rapides que la première (contrairement
+    à OFFSET). Le corps de la réponse reste une liste, le lien vers la page
+    suivante est transmis dans l'en-tête `Link`.
+    """
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'PAGINATION_PAGE_SIZE', 100)
+        self.max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if requested <= 0:
+            return self.page_size
+        return min(requested, self.max_page_size)
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8')
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            opts = queryset.model._meta
+            return [
+                opts.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        values = []
+        for name in self.ordering:
+            value = getattr(instance, name.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def keyset_filter(self, position):
+        """
+        Construit (a > x) OR (a = x AND b > y) selon le sens de chaque colonne
+        """
+        condition = None
+        for index in reversed(range(len(self.ordering))):
+            name = self.ordering[index]
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            strict = Q(**{f'{field}__{lookup}': position[index]})
+            if condition is None:
+                condition = strict
+            else:
+                condition = strict | (Q(**{field: position[index]}) & condition)
+        return condition
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size_value
+        self.page = results[:self.page_size_value]
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Variante pour les vues asynchrones (ORM asynchrone)
+        """
+        return self.set_page([obj async for obj in self.page_queryset(queryset, request)])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+        return url
+
+    def get_headers(self):
+        headers = {}
+        next_link = self.get_next_link()
+        if next_link:
+            headers['Link'] = f'<{next_link}>; rel="next"'
+        return headers
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=self.get_headers())
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+
+class ReviewCursorPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class UserCursorPagination(KeysetPagination):
+    ordering = ('username', 'id')
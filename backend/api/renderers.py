@@ -0,0 +1,91 @@
+"""
+Rendu et lecture JSON avec orjson (implémentation C).
+
+orjson encode nativement datetime, date, time et UUID ; les autres types
+produits par DRF (Decimal, chaînes traduites, QuerySet...) passent par
+_default, qui reprend les conversions de rest_framework.utils.encoders.JSONEncoder.
+La sortie est la même que celle du JSONRenderer de DRF (UTF-8, compacte).
+"""
+import datetime
+import decimal
+import logging
+import uuid
+
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Remplace une réponse d'erreur impossible à encoder
+UNSERIALIZABLE_ERROR = {
+    'error': 'Erreur de format de réponse',
+    'detail': 'Les données ne peuvent pas être sérialisées en JSON'
+}
+
+
+def _default(obj):
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Comme DRF (COERCE_DECIMAL_TO_STRING concerne les champs des sérialiseurs)
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__') and hasattr(obj, 'keys'):
+        return dict(obj)
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f"Type non sérialisable en JSON : {type(obj).__name__}")
+
+
+def dumps(data, indent=False):
+    return orjson.dumps(data, default=_default, option=OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        # ex. Accept: application/json; indent=2
+        indent = 'indent=' in (accepted_media_type or '')
+        try:
+            return dumps(data, indent)
+        except TypeError:
+            # Réponse d'erreur (gestionnaire d'exceptions) : validée ici, en un seul encodage
+            response = renderer_context.get('response')
+            if response is None or not getattr(response, 'exception', False):
+                raise
+            logger.error("Données non-JSON-serialisables dans une réponse d'erreur : %r", data)
+            return dumps(UNSERIALIZABLE_ERROR, indent)
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
@@ -0,0 +1,174 @@
+"""
+Cache des réponses des endpoints publics en lecture.
+
+Chaque réponse est mise en cache sous une clé formée de la vue, de l'URL
+complète (paramètres compris) et des versions des entités dont elle dépend
+(ex. 'reviews', 'movie:<clé>', 'user:<id>'). Une écriture change la version
+des entités touchées (bump) : les anciennes entrées ne sont plus jamais lues
+et expirent d'elles-mêmes. Seules les opérations get/set/add du cache sont
+utilisées, ce qui convient aux backends mémoire locale, fichier et base.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .async_views import DataResponse
+from .metrics import COUNTER
+
+# Version commune à toutes les entrées (invalidation globale après un import en masse)
+ROOT_SCOPE = 'root'
+
+# En-têtes de réponse conservés avec les données (pagination)
+CACHED_HEADERS = ('Link',)
+
+
+def _version_key(scope):
+    # Condensat : les titres de films contiennent espaces et caractères accentués
+    return f'response-cache:version:{hashlib.md5(scope.encode()).hexdigest()}'
+
+
+def versions(scopes):
+    """
+    Versions courantes des entités (initialisées si absentes du cache)
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """
+    Change la version des entités : maintenant, puis à la validation de la
+    transaction (une lecture concurrente a pu remettre en cache l'ancien état)
+    """
+    def set_versions():
+        version = time.time_ns()
+        cache.set_many({_version_key(scope): version for scope in scopes}, timeout=None)
+
+    set_versions()
+    transaction.on_commit(set_versions)
+
+
+def clear():
+    """
+    Invalide toutes les réponses en cache
+    """
+    bump(ROOT_SCOPE)
+
+
+class _Counters:
+    """
+    Compteurs de succès/échecs du cache par vue (propres au processus)
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, view, hit):
+        with self.lock:
+            self.counts[view]['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {view: dict(counts) for view, counts in self.counts.items()}
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+
+counters = _Counters()
+
+
+def stats():
+    return counters.snapshot()
+
+
+def metric_samples():
+    for view, counts in counters.snapshot().items():
+        for result, count in (('hit', counts['hits']), ('miss', counts['misses'])):
+            yield ('response_cache_requests_total', COUNTER, "Lectures du cache des réponses",
+                   {'view': view, 'result': result}, count)
+
+
+def _cache_key(name, request, entity_scopes):
+    url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    version_tag = '.'.join(str(version) for version in versions([ROOT_SCOPE, *entity_scopes]))
+    return f'response-cache:{name}:{url_hash}:{version_tag}'
+
+
+def _cached_response(response_class, cached):
+    data, status_code, headers = cached
+    response = response_class(data, status=status_code, headers=headers)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def _entry(response):
+    """
+    Données à mettre en cache (réponses 200 portant leurs données uniquement)
+    """
+    if response.status_code != 200 or not hasattr(response, 'data'):
+        return None
+    headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+    return response.data, response.status_code, headers
+
+
+def cache_response(scopes, timeout=None):
+    """
+    Met en cache les réponses 200 d'une vue GET.
+
+    `scopes(request, *args, **kwargs)` retourne les entités dont dépend la
+    réponse. S'applique à une vue fonction (sous @api_view), via
+    method_decorator à une méthode de classe de vue, ou à une vue asynchrone
+    (api.async_views.read_view).
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        def get_timeout():
+            return timeout if timeout is not None else getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key = await sync_to_async(_cache_key)(name, request, scopes(request, *args, **kwargs))
+                cached = await cache.aget(key)
+                counters.record(name, hit=cached is not None)
+                if cached is not None:
+                    return _cached_response(DataResponse, cached)
+                response = await view(request, *args, **kwargs)
+                entry = _entry(response)
+                if entry is not None:
+                    await cache.aset(key, entry, get_timeout())
+                response['X-Cache'] = 'MISS'
+                return response
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = _cache_key(name, request, scopes(request, *args, **kwargs))
+            cached = cache.get(key)
+            counters.record(name, hit=cached is not None)
+            if cached is not None:
+                return _cached_response(Response, cached)
+            response = view(request, *args, **kwargs)
+            entry = _entry(response)
+            if entry is not None:
+                cache.set(key, entry, get_timeout())
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
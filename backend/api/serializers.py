@@ -0,0 +1,113 @@
+"""
+Sérialisation en lecture seule à partir de values_list(), pour les listes.
+
+Un ModelSerializer instancie un modèle par ligne puis parcourt ses champs
+(get_attribute, to_representation) : c'est l'essentiel du temps CPU d'une
+liste de quelques centaines d'éléments. ValuesSerializer lit les mêmes
+colonnes en tuples et les convertit avec des fonctions résolues une fois
+par réponse à partir des champs du sérialiseur de référence, dont il produit
+exactement la même sortie (mêmes clés, même ordre, mêmes valeurs).
+"""
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import FileField
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Champs dont to_representation() ne change pas une valeur lue en base
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField)
+
+
+class ValuesSerializer:
+    """
+    Variante values_list() d'un ModelSerializer en lecture seule (serializer_class).
+
+    Les SerializerMethodField n'ont pas d'équivalent en colonne : method_fields
+    associe chacune à une colonne ou annotation du queryset.
+    """
+    serializer_class = None
+    method_fields = {}
+
+    def __init__(self, context=None):
+        # Champs liés au contexte (ex. request pour les URL absolues des images)
+        fields = self.serializer_class(context=context or {}).fields
+        model = self.serializer_class.Meta.model
+        self.names = []
+        columns = []
+        self.converters = []
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+            columns.append(self.column(name, field))
+            convert = self.converter(model, field)
+            if convert is not None:
+                self.converters.append((name, convert))
+        # Une colonne lue une fois même si plusieurs champs l'utilisent
+        self.columns = list(dict.fromkeys(columns))
+        indexes = [self.columns.index(column) for column in columns]
+        self.select = None if indexes == list(range(len(indexes))) else itemgetter(*indexes)
+
+    def column(self, name, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in self.method_fields:
+                raise ImproperlyConfigured(f"{type(self).__name__}.method_fields : colonne manquante pour '{name}'")
+            return self.method_fields[name]
+        if field.source == '*':
+            raise ImproperlyConfigured(f"{type(self).__name__} : source='*' non prise en charge ('{name}')")
+        return '__'.join(field.source_attrs)
+
+    def converter(self, model, field):
+        """
+        Conversion d'une valeur non nulle, None si la valeur est déjà la bonne
+        """
+        if isinstance(field, serializers.SerializerMethodField) or type(field) in PASSTHROUGH_FIELDS:
+            return None
+        if type(field) is serializers.DateTimeField:
+            return self.datetime_converter(field)
+        if isinstance(field, serializers.FileField):
+            # values_list() donne le nom du fichier : le champ DRF attend un FieldFile
+            model_field = model._meta.get_field(field.source)
+            if not isinstance(model_field, FileField):
+                raise ImproperlyConfigured(f"{type(self).__name__} : '{field.source}' n'est pas un FileField")
+            # Fichier vide : None, comme FileField.to_representation()
+            return lambda name: (
+                field.to_representation(model_field.attr_class(None, model_field, name)) if name else None
+            )
+        return field.to_representation
+
+    @staticmethod
+    def datetime_converter(field):
+        """
+        DateTimeField.to_representation() avec le fuseau résolu une fois par
+        réponse (et non à chaque ligne) pour le format ISO 8601
+        """
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    def values(self, queryset):
+        """
+        Lignes du queryset ; nommées pour que la pagination lise les colonnes du curseur
+        """
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, row):
+        data = dict(zip(self.names, row if self.select is None else self.select(row)))
+        for name, convert in self.converters:
+            value = data[name]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
@@ -0,0 +1,199 @@
+"""
+Client TMDB et cache persistant des métadonnées de films (affiche, id TMDB, année).
+
+Le client est interchangeable via le réglage TMDB_CLIENT, ce qui permet de
+faire tourner les tests contre un client local sans réseau.
+"""
+import json
+import logging
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api.models import MovieMetadata
+from reviews.text import normalize_title
+
+logger = logging.getLogger(__name__)
+
+
+class TMDBError(Exception):
+    """
+    Erreur de communication avec l'API TMDB
+    """
+
+
+class HttpTMDBClient:
+    """
+    Client HTTP minimal pour l'endpoint search/movie de TMDB
+    """
+    base_url = 'https://api.themoviedb.org/3'
+
+    def __init__(self, api_key=None, language=None, timeout=None):
+        self.api_key = api_key or getattr(settings, 'TMDB_API_KEY', '')
+        self.language = language or getattr(settings, 'TMDB_LANGUAGE', 'fr-FR')
+        self.timeout = timeout or getattr(settings, 'TMDB_TIMEOUT', 5)
+
+    def search_movie(self, title):
+        """
+        Retourne le premier résultat TMDB pour un titre, ou None
+        """
+        if not self.api_key:
+            raise TMDBError("Aucune clé TMDB configurée (TMDB_API_KEY)")
+        query = urllib.parse.urlencode({
+            'api_key': self.api_key,
+            'language': self.language,
+            'query': title,
+            'page': 1,
+        })
+        try:
+            with urllib.request.urlopen(f'{self.base_url}/search/movie?{query}', timeout=self.timeout) as response:
+                data = json.load(response)
+        except (OSError, ValueError) as e:
+            raise TMDBError(str(e)) from e
+        results = data.get('results') or []
+        return results[0] if results else None
+
+
+class StaticTMDBClient:
+    """
+    Client local pour les tests : répond à partir d'un dictionnaire {titre: film}
+    """
+    def __init__(self, movies=None):
+        self.movies = {title_key(title): movie for title, movie in (movies or {}).items()}
+        self.calls = []
+
+    def search_movie(self, title):
+        self.calls.append(title)
+        return self.movies.get(title_key(title))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Client TMDB configuré par le réglage TMDB_CLIENT (chemin pointé)
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            path = getattr(settings, 'TMDB_CLIENT', 'api.services.tmdb.HttpTMDBClient')
+            _client = import_string(path)()
+        return _client
+
+
+def set_client(client):
+    """
+    Remplace le client TMDB (tests) ; None revient au client configuré
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def title_key(title):
+    return normalize_title(title)
+
+
+class _Coalescer:
+    """
+    Regroupe les recherches concurrentes d'un même titre : un seul appel
+    TMDB par clé manquante, les autres threads reçoivent le même résultat
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def run(self, key, func):
+        with self.lock:
+            future = self.pending.get(key)
+            leader = future is None
+            if leader:
+                future = self.pending[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self.lock:
+                del self.pending[key]
+        return future.result()
+
+
+_coalescer = _Coalescer()
+
+
+_FAILED = object()
+
+
+def _search(key, title):
+    """
+    Recherche TMDB (sans accès à la base), regroupée par clé de titre
+    """
+    try:
+        return _coalescer.run(key, lambda: get_client().search_movie(title))
+    except TMDBError as e:
+        logger.warning("Échec de la recherche TMDB pour %r: %s", title, e)
+        return _FAILED
+
+
+def _store(key, title, movie):
+    """
+    Enregistre le résultat TMDB d'un titre (y compris l'absence de résultat)
+    """
+    release_date = (movie or {}).get('release_date') or ''
+    row, _ = MovieMetadata.objects.update_or_create(
+        title_key=key,
+        defaults={
+            'title': title,
+            'found': movie is not None,
+            'tmdb_id': (movie or {}).get('id'),
+            'poster_path': (movie or {}).get('poster_path') or '',
+            'year': int(release_date[:4]) if release_date[:4].isdigit() else None,
+            'fetched_at': timezone.now(),
+        },
+    )
+    return row
+
+
+def enrich_titles(titles):
+    """
+    Métadonnées pour une liste de titres, en un aller-retour.
+
+    Les titres absents du cache ou expirés (TMDB_CACHE_TTL) sont recherchés
+    en parallèle sur TMDB puis enregistrés ; retourne {titre: métadonnées ou None}.
+    """
+    keys = {}
+    for title in titles:
+        key = title_key(title)
+        if key:
+            keys.setdefault(key, title)
+
+    ttl = timedelta(seconds=getattr(settings, 'TMDB_CACHE_TTL', 7 * 24 * 3600))
+    fresh_after = timezone.now() - ttl
+    cached = {row.title_key: row for row in MovieMetadata.objects.filter(title_key__in=list(keys))}
+    missing = [key for key in keys if key not in cached or cached[key].fetched_at < fresh_after]
+
+    if missing:
+        workers = min(len(missing), getattr(settings, 'TMDB_MAX_CONCURRENCY', 8))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            found = list(executor.map(lambda key: _search(key, keys[key]), missing))
+        for key, movie in zip(missing, found):
+            # En cas d'échec TMDB, conserver l'entrée expirée éventuelle
+            if movie is not _FAILED:
+                cached[key] = _store(key, keys[key], movie)
+
+    results = {}
+    for title in titles:
+        row = cached.get(title_key(title))
+        results[title] = row.as_dict() if row is not None and row.found else None
+    return results
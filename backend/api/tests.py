@@ -1,3 +1,513 @@
-from django.test import TestCase
+import gzip
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+import dj_database_url
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.http import HttpResponse, JsonResponse
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import OperationalError, router, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from unittest import skipUnless
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import compression, db_pool, db_routing, jobs, metrics, renderers, throttling, tracing
+from .middleware import QueryBudgetExceeded, RequestTimingMiddleware, query_budget
+from .models import Job, MovieMetadata
+from .services import tmdb
+
+User = get_user_model()
+
+
+@query_budget(1)
+def two_queries_view(request):
+    User.objects.count()
+    User.objects.exists()
+    return HttpResponse()
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    def run_view(self, view):
+        request = RequestFactory().get('/')
+        middleware = RequestTimingMiddleware(lambda req: middleware.process_view(req, view, (), {}) or view(req))
+        return middleware(request)
+
+    def test_server_timing_header(self):
+        response = APIClient(HTTP_HOST='localhost').get('/api/reviews/stats/')
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'view;dur=', 'serialize;dur=', 'total;dur=', 'queries;desc="3"'):
+            self.assertIn(metric, timing)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_budget_exceeded_raises_in_tests(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.run_view(two_queries_view)
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_budget_exceeded_logs_in_production(self):
+        with self.assertLogs('api.performance', level='WARNING'):
+            response = self.run_view(two_queries_view)
+        self.assertEqual(response.status_code, 200)
+
+
+class MovieEnrichTests(TestCase):
+    def setUp(self):
+        self.stub = tmdb.StaticTMDBClient({
+            'Inception': {'id': 27205, 'poster_path': '/inception.jpg', 'release_date': '2010-07-15'},
+        })
+        tmdb.set_client(self.stub)
+        self.addCleanup(tmdb.set_client, None)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(User.objects.create(username='auteur', email='auteur@example.com'))
+
+    def enrich(self, titles):
+        return self.client.post('/api/movies/enrich/', {'titles': titles}, format='json').json()['results']
+
+    def test_batch_enrichment_is_cached(self):
+        expected = {'tmdb_id': 27205, 'poster_path': '/inception.jpg', 'year': 2010}
+        results = self.enrich(['Inception', 'inception ', 'Film inconnu'])
+        self.assertEqual(results, {'Inception': expected, 'inception ': expected, 'Film inconnu': None})
+        self.assertEqual(len(self.stub.calls), 2)
+
+        self.enrich(['Inception', 'Film inconnu'])
+        self.assertEqual(len(self.stub.calls), 2)
+
+    @override_settings(TMDB_CACHE_TTL=60)
+    def test_expired_entries_are_refreshed(self):
+        self.enrich(['Inception'])
+        MovieMetadata.objects.update(fetched_at=timezone.now() - timedelta(minutes=5))
+        self.enrich(['Inception'])
+        self.assertEqual(self.stub.calls, ['Inception', 'Inception'])
+
+
+class TracingTests(TestCase):
+    def setUp(self):
+        # Seaux de throttling laissés par les tests précédents
+        cache.clear()
+        self.client = APIClient(HTTP_HOST='localhost')
+        User.objects.create_user(username='moi', email='moi@example.com', password='secret-123')
+
+    def login(self):
+        return self.client.post('/api/login/', {'email': 'moi@example.com', 'password': 'secret-123'}, format='json')
+
+    def test_request_id_header(self):
+        response = self.client.get('/api/reviews/stats/', HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual(response['X-Request-ID'], 'abc-123')
+        generated = self.client.get('/api/reviews/stats/', HTTP_X_REQUEST_ID='<invalide>')['X-Request-ID']
+        self.assertRegex(generated, r'^[0-9a-f]{32}$')
+
+    def test_login_checks_password_once(self):
+        with patch.object(hashers, 'verify_password', wraps=hashers.verify_password) as check:
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check.call_count, 1)
+
+    @override_settings(TRACE_SAMPLE_RATE=1.0)
+    def test_sampled_events_are_redacted(self):
+        with self.assertLogs('api.trace', level='DEBUG') as logs:
+            self.login()
+        output = '\n'.join(logs.output)
+        self.assertIn('"event": "login.received"', output)
+        self.assertIn('"email": "moi@example.com"', output)
+        self.assertNotIn('secret-123', output)
+
+    @override_settings(TRACE_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_formatted(self):
+        with patch.object(tracing._Event, '__str__') as formatted:
+            self.login()
+        formatted.assert_not_called()
+        self.assertEqual(tracing.redact({'refresh': 'x', 'nested': [{'password2': 'y', 'bio': 'z'}]}), {
+            'refresh': tracing.REDACTED, 'nested': [{'password2': tracing.REDACTED, 'bio': 'z'}],
+        })
+
+
+class DatabasePoolTests(TestCase):
+    def test_persistent_connections_without_pool(self):
+        database = db_pool.configure(
+            dj_database_url.parse('postgres://u:p@db:5432/cine?pool=0&pool_max_size=20&sslmode=require'),
+            pool=True, conn_max_age=60,
+        )
+        self.assertEqual(database['OPTIONS'], {'sslmode': 'require'})
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (60, True))
+
+        # SQLite n'a pas de pool : connexions persistantes
+        database = db_pool.configure(dj_database_url.parse('sqlite:////tmp/cine.sqlite3?pool=1'), conn_max_age=30)
+        self.assertEqual((database['OPTIONS'], database['CONN_MAX_AGE']), ({}, 30))
+
+    @skipUnless(importlib.util.find_spec('psycopg_pool'), "psycopg_pool non installé")
+    def test_pool_options_from_url(self):
+        database = db_pool.configure(
+            dj_database_url.parse('postgres://u:p@db:5432/cine?pool=1&pool_max_size=20'),
+            pool_options={'min_size': 2, 'max_size': 10},
+        )
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['min_size'], 2)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 20)
+        self.assertIn('check', database['OPTIONS']['pool'])
+
+    def test_stats_require_admin(self):
+        client = APIClient(HTTP_HOST='localhost')
+        user = User.objects.create(username='admin', email='admin@example.com')
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/db/pool-stats/').status_code, 403)
+        user.is_staff = True
+        self.assertFalse(client.get('/api/db/pool-stats/').json()['default']['pooled'])
+
+
+@override_settings(REPLICA_DATABASES=['replica_1'])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        db_routing._health.reset()
+        self.addCleanup(db_routing._health.reset)
+        self.real_check_replica = db_routing.check_replica
+        patcher = patch.object(db_routing, 'check_replica', return_value=True)
+        self.check_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.middleware = db_routing.ReplicaRoutingMiddleware(self.view)
+        self.write = False
+        self.issued = None
+
+    def view(self, request):
+        if self.write:
+            router.db_for_write(MovieMetadata)
+        self.used = router.db_for_read(MovieMetadata)
+        if self.issued:
+            return JsonResponse({'tokens': {'access': str(AccessToken.for_user(User(id=self.issued)))}})
+        return HttpResponse()
+
+    def read_db(self, method='get', user_id=None, addr='127.0.0.1', proxy=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(User(id=user_id))}'} if user_id else {}
+        if proxy:
+            # Client derrière le proxy : adresse du proxy, client dans X-Forwarded-For
+            headers.update(REMOTE_ADDR=proxy, HTTP_X_FORWARDED_FOR=addr)
+        else:
+            headers['REMOTE_ADDR'] = addr
+        self.middleware(getattr(self.factory, method)('/api/reviews/', **headers))
+        return self.used
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.read_db(), 'replica_1')
+        self.assertEqual(self.read_db('post'), 'default')
+        self.assertEqual(router.db_for_read(MovieMetadata), 'default')
+        # Après une écriture, la suite de la requête lit sur la base principale
+        self.write = True
+        self.assertEqual(self.read_db(), 'default')
+
+    def test_read_your_writes(self):
+        self.read_db('post', user_id=1)
+        self.assertEqual(self.read_db(user_id=1), 'default')
+        self.assertEqual(self.read_db(user_id=2, addr='10.0.0.2'), 'replica_1')
+
+    def test_read_your_writes_by_address_and_user(self):
+        # Écriture authentifiée : le même client sans token, ou depuis une autre adresse
+        self.read_db('post', user_id=1)
+        self.assertEqual(self.read_db(), 'default')
+        self.assertEqual(self.read_db(user_id=1, addr='10.0.0.2'), 'default')
+        self.assertEqual(self.read_db(user_id=2, addr='10.0.0.3'), 'replica_1')
+
+        # Connexion : la requête suivante porte le token délivré par la réponse
+        self.issued = 3
+        self.read_db('post', addr='10.0.0.4')
+        self.issued = None
+        self.assertEqual(self.read_db(user_id=3, addr='10.0.0.5'), 'default')
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_clients_behind_proxy_are_pinned_separately(self):
+        self.read_db('post', addr='203.0.113.1', proxy='10.0.0.1')
+        self.assertEqual(self.read_db(addr='203.0.113.1', proxy='10.0.0.1'), 'default')
+        self.assertEqual(self.read_db(addr='203.0.113.2', proxy='10.0.0.1'), 'replica_1')
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        self.check_replica.return_value = False
+        self.assertEqual(self.read_db(), 'default')
+
+    def test_replica_check(self):
+        with patch.object(db_routing, 'replication_lag', return_value=0.5):
+            self.assertTrue(self.real_check_replica('replica_1'))
+        with patch.object(db_routing, 'replication_lag', return_value=30.0), self.assertLogs('api.db_routing'):
+            self.assertFalse(self.real_check_replica('replica_1'))
+        with patch.object(db_routing, 'replication_lag', side_effect=OperationalError), \
+                self.assertLogs('api.db_routing'):
+            self.assertFalse(self.real_check_replica('replica_1'))
+
+
+class JSONPipelineTests(TestCase):
+    def test_renderer_matches_drf(self):
+        data = {
+            'title': 'Amélie',
+            'created_at': timezone.now(),
+            'rating': Decimal('4.5'),
+            'tags': ('a', 'b'),
+            'nested': [{'id': 1, 'empty': None}],
+        }
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_unserializable_error_response(self):
+        response = Response({'detail': object()}, status=400, exception=True)
+        content = renderers.ORJSONRenderer().render(response.data, renderer_context={'response': response})
+        self.assertEqual(json.loads(content), renderers.UNSERIALIZABLE_ERROR)
+        with self.assertRaises(TypeError):
+            renderers.ORJSONRenderer().render({'detail': object()}, renderer_context={'response': Response()})
+
+    def test_compression_negotiation(self):
+        factory = RequestFactory()
+        body = json.dumps([{'title': 'Critique', 'rating': n} for n in range(200)])
+
+        def respond(request, size=len(body)):
+            middleware = compression.CompressionMiddleware(
+                lambda request: HttpResponse(body[:size], content_type='application/json')
+            )
+            return middleware(request)
+
+        response = respond(factory.get('/api/reviews/', HTTP_ACCEPT_ENCODING='gzip;q=1.0, br;q=0'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        # Petites réponses et requêtes d'écriture : non compressées
+        self.assertFalse(respond(factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), size=100).has_header('Content-Encoding'))
+        self.assertFalse(respond(factory.post('/', HTTP_ACCEPT_ENCODING='gzip')).has_header('Content-Encoding'))
+        self.assertFalse(respond(factory.get('/', HTTP_ACCEPT_ENCODING='identity')).has_header('Content-Encoding'))
+
+        if compression.brotli is not None:
+            response = respond(factory.get('/', HTTP_ACCEPT_ENCODING='gzip, br'))
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(compression.brotli.decompress(response.content).decode(), body)
+
+
+# Tâches de test : exécutions enregistrées dans `executed`
+executed = []
+
+
+@jobs.register('tests.record')
+def record_job(value):
+    executed.append((value, threading.current_thread().name))
+
+
+@jobs.register('tests.flaky', max_attempts=2)
+def flaky_job(fail=True):
+    if fail:
+        raise RuntimeError("échec simulé")
+
+
+@jobs.register('tests.periodic', every=timedelta(minutes=5))
+def periodic_job():
+    executed.append(('periodic', threading.current_thread().name))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        clock = patch.object(throttling.time, 'time', return_value=1000.0)
+        self.now = clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_burst_then_refill(self):
+        # 3 jetons, 6 par minute : un toutes les 10 secondes
+        self.assertEqual([throttling.consume('seau', 3, 6) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(throttling.consume('seau', 3, 6), 10)
+        self.now.return_value = 1004.0
+        self.assertAlmostEqual(throttling.consume('seau', 3, 6), 6)
+        self.now.return_value = 1010.0
+        self.assertEqual(throttling.consume('seau', 3, 6), 0)
+        # Jamais plus que la capacité, même après une longue inactivité
+        self.now.return_value = 5000.0
+        self.assertEqual([throttling.consume('seau', 3, 6) for _ in range(3)], [0, 0, 0])
+        self.assertGreater(throttling.consume('seau', 3, 6), 0)
+
+    @override_settings(AUTH_THROTTLE_RATES={'login': {'ip': (5, 1), 'account': (1, 1)}})
+    def test_check_stops_at_first_empty_bucket(self):
+        self.assertEqual(throttling.check('login', {'ip': '1.2.3.4', 'account': 'moi'}), 0)
+        self.assertAlmostEqual(throttling.check('login', {'ip': '1.2.3.4', 'account': 'moi'}), 60)
+        # Compte inconnu (None) : seul le seau de l'adresse est consommé
+        self.assertEqual(throttling.check('login', {'ip': '1.2.3.4', 'account': None}), 0)
+        self.assertEqual(throttling.check('login', {'ip': '5.6.7.8', 'account': 'autre'}), 0)
+        self.assertEqual(throttling.check('register', {'ip': '1.2.3.4'}), 0)
+
+
+@override_settings(METRICS_TOKEN='jeton-metriques')
+class MetricsTests(TestCase):
+    def setUp(self):
+        for metric in metrics.registry.values():
+            metric.reset()
+        # Réponses mises en cache par ces tests
+        self.addCleanup(cache.clear)
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer jeton-metriques')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_request_metrics(self):
+        self.client.get('/api/reviews/stats/')
+        self.client.get('/api/reviews/stats/')
+        self.client.get('/introuvable/')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer faux').status_code, 403)
+
+        output = self.scrape()
+        self.assertIn('http_requests_total{view="review-stats",method="GET",status="200"} 2', output)
+        self.assertIn('http_requests_total{view="unmatched",method="GET",status="404"} 1', output)
+        self.assertIn('http_request_duration_seconds_count{view="review-stats",method="GET"} 2', output)
+        self.assertIn('http_request_duration_seconds_bucket{view="review-stats",method="GET",le="+Inf"} 2',
+                      output)
+        self.assertIn('db_queries_total{view="review-stats"}', output)
+        # La requête de collecte est elle-même en cours
+        self.assertIn('http_requests_in_progress 1', output)
+        self.assertIn('# TYPE password_hashing_in_flight gauge', output)
+
+    def test_workers_are_aggregated(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        metrics.record_request('review-list', 'GET', 200, 0.02, 3, 0.004)
+        # État recopié par un worker arrêté depuis
+        stopped = subprocess.Popen([sys.executable, '-c', ''])
+        stopped.wait()
+        with open(os.path.join(directory, f'{stopped.pid}-1.json'), 'w') as file:
+            json.dump(metrics.snapshot(), file)
+
+        with override_settings(METRICS_DIR=directory):
+            output = metrics.render(metrics.collect())
+        self.assertIn('http_requests_total{view="review-list",method="GET",status="200"} 2', output)
+        self.assertIn('db_queries_total{view="review-list"} 6', output)
+        self.assertIn('http_request_duration_seconds_bucket{view="review-list",method="GET",le="0.025"} 2', output)
+        # Jauges des seuls processus vivants
+        self.assertIn('app_processes 1\n', output)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        executed.clear()
+        # Tâches de test uniquement, la périodique n'étant ajoutée que par son test
+        self.periodic = jobs.registry['tests.periodic']
+        patcher = patch.dict(jobs.registry, {
+            name: job_type for name, job_type in jobs.registry.items()
+            if name.startswith('tests.') and job_type.every is None
+        }, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self):
+        worker = jobs.Worker()
+        worker.run(burst=True)
+        return worker
+
+    def test_priority_and_dedup(self):
+        jobs.enqueue('tests.record', {'value': 'lente'}, priority=-1)
+        jobs.enqueue('tests.record', {'value': 'normale'}, dedup_key='normale')
+        jobs.enqueue('tests.record', {'value': 'doublon'}, dedup_key='normale')
+        jobs.enqueue('tests.record', {'value': 'urgente'}, priority=5)
+        jobs.enqueue('tests.record', {'value': 'différée'}, delay=timedelta(hours=1))
+        worker = self.run_worker()
+        self.assertEqual([value for value, _ in executed], ['urgente', 'normale', 'lente'])
+        self.assertEqual(worker.processed, 3)
+        self.assertEqual(Job.objects.get().payload, {'value': 'différée'})
+
+    def test_enqueue_follows_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            jobs.enqueue_on_commit('tests.record', {'value': 'après'})
+        self.assertFalse(Job.objects.exists())
+        callbacks[0]()
+        self.assertEqual(Job.objects.count(), 1)
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            jobs.enqueue('tests.record', {'value': 'annulée'})
+            raise ValueError
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_retries_with_backoff(self):
+        jobs.enqueue('tests.flaky')
+        self.assertEqual(self.run_worker().failed, 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('échec simulé', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=3))
+
+        Job.objects.update(run_at=timezone.now())
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_retry_yields_to_job_queued_meanwhile(self):
+        jobs.enqueue('tests.flaky', dedup_key='avatar:1')
+        (running,) = jobs.claim('test', 1)
+        # Nouvel envoi pendant l'exécution : une autre tâche de même clé attend
+        jobs.enqueue('tests.flaky', {'fail': False}, dedup_key='avatar:1')
+        self.assertFalse(jobs.execute(running))
+        self.assertEqual(list(Job.objects.values_list('status', 'payload')), [(Job.QUEUED, {'fail': False})])
+
+        (running,) = jobs.claim('test', 1)
+        jobs.enqueue('tests.flaky', dedup_key='avatar:1')
+        Job.objects.filter(pk=running.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 0)
+        self.assertEqual(list(Job.objects.values_list('status', 'payload')), [(Job.QUEUED, {})])
+
+        jobs.enqueue('tests.flaky', {'fail': False})
+        self.assertEqual(self.run_worker().processed, 1)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_stale_job_that_exhausted_its_attempts_fails(self):
+        jobs.enqueue('tests.flaky')
+        # Le worker meurt à chaque tentative (ex. mémoire épuisée)
+        jobs.claim('test', 1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        jobs.claim('test', 1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        with self.assertLogs('api.jobs', 'ERROR'):
+            self.assertEqual(jobs.requeue_stale(), 0)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(jobs.claim('test', 1), [])
+
+    def test_heartbeat_keeps_long_jobs_reserved(self):
+        jobs.enqueue('tests.record', {'value': 'longue'})
+        jobs.claim('test', 1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.heartbeat('test'), 1)
+        self.assertEqual(jobs.requeue_stale(), 0)
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+
+    def test_stale_and_periodic(self):
+        jobs.registry['tests.periodic'] = self.periodic
+        jobs.enqueue('tests.record', {'value': 'reprise'})
+        Job.objects.update(status=Job.RUNNING, locked_at=timezone.now() - timedelta(hours=1))
+        self.run_worker()
+        self.assertEqual(executed[0][0], 'reprise')
+        self.assertIn(('periodic', threading.current_thread().name), executed)
+        # Occurrence suivante planifiée, une seule malgré plusieurs workers
+        self.run_worker()
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'tests.periodic')
+        self.assertGreater(job.run_at, timezone.now() + timedelta(minutes=4))
+
+
+class JobWorkerConcurrencyTests(TransactionTestCase):
+    def test_threads(self):
+        executed.clear()
+        for i in range(6):
+            jobs.enqueue('tests.record', {'value': i})
+        worker = jobs.Worker(concurrency=3)
+        with patch.dict(jobs.registry, {'tests.record': jobs.registry['tests.record']}, clear=True):
+            worker.run(burst=True)
+        self.assertEqual(sorted(value for value, _ in executed), list(range(6)))
+        self.assertTrue(all(name.startswith('job') for _, name in executed))
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,163 @@
+"""
+Limitation des tentatives d'authentification par seaux de jetons.
+
+Chaque seau a une capacité (rafale autorisée) et se recharge en continu
+(jetons par minute, AUTH_THROTTLE_RATES) ; une tentative consomme un jeton,
+et un seau vide fait refuser la requête en 429 avec Retry-After (délai avant
+le prochain jeton). Une requête passe par un seau par adresse IP et, quand
+il est connu, un seau par compte : une attaque répartie sur de nombreuses
+adresses reste limitée sur chaque compte visé.
+
+Les seaux sont stockés dans le cache partagé. Avec Redis (REDIS_URL), la
+recharge et la consommation forment un script Lua exécuté atomiquement par
+le serveur, à son horloge : les limites valent pour tous les workers. Les
+autres backends (mémoire locale en développement et dans les tests) sont
+protégés par un verrou du processus.
+
+Les seaux sont vérifiés avant l'authentification et le hachage : un refus
+ne coûte ni requête SQL ni calcul PBKDF2.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# KEYS[1] : seau ; ARGV : capacité, jetons par seconde, durée de conservation.
+# Retourne {1, "0"} si un jeton est consommé, sinon {0, "<attente en secondes>"}
+# (chaîne : Redis tronque les nombres Lua en entiers)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {allowed, tostring(wait)}
+"""
+
+_lock = threading.Lock()
+_script = None
+
+
+def _consume_redis(backend, key, capacity, rate, timeout):
+    global _script
+    key = backend.make_and_validate_key(key)
+    client = backend._cache.get_client(key, write=True)
+    if _script is None:
+        _script = client.register_script(TOKEN_BUCKET_SCRIPT)
+    allowed, wait = _script(keys=[key], args=[capacity, rate, timeout], client=client)
+    return 0.0 if int(allowed) else float(wait)
+
+
+def _consume_local(backend, key, capacity, rate, timeout):
+    with _lock:
+        now = time.time()
+        tokens, updated = backend.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        if tokens >= 1:
+            backend.set(key, (tokens - 1, now), timeout)
+            return 0.0
+        backend.set(key, (tokens, now), timeout)
+        return (1 - tokens) / rate
+
+
+def consume(key, capacity, per_minute):
+    """
+    Consomme un jeton du seau ; 0 si accepté, sinon secondes avant le prochain jeton
+    """
+    rate = per_minute / 60
+    # Au-delà, le seau est plein : inutile de le conserver
+    timeout = math.ceil(capacity / rate) + 1
+    backend = caches['default']
+    if isinstance(backend, RedisCache):
+        return _consume_redis(backend, key, capacity, rate, timeout)
+    return _consume_local(backend, key, capacity, rate, timeout)
+
+
+def check(scope, identities):
+    """
+    Passe la requête dans les seaux de `scope` ({'ip': ..., 'account': ...}) ;
+    0 si acceptée, sinon l'attente en secondes du premier seau vide
+    """
+    rates = getattr(settings, 'AUTH_THROTTLE_RATES', {}).get(scope, {})
+    for kind, ident in identities.items():
+        if kind not in rates or not ident:
+            continue
+        capacity, per_minute = rates[kind]
+        digest = hashlib.md5(str(ident).encode()).hexdigest()
+        wait = consume(f'throttle:{scope}:{kind}:{digest}', capacity, per_minute)
+        if wait:
+            return wait
+    return 0
+
+
+def client_ip(request):
+    """
+    Adresse du client (X-Forwarded-For selon NUM_PROXIES, comme les throttles DRF)
+    """
+    return BaseThrottle().get_ident(request)
+
+
+def token_user_id(request):
+    """
+    Utilisateur du token JWT de la requête (signature vérifiée, sans accès à la base)
+    """
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return AccessToken(header[7:])[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Seaux de la portée `throttle_scope` de la vue, identités données par
+    sa méthode get_throttle_identities(request)
+    """
+    def allow_request(self, request, view):
+        self.delay = check(view.throttle_scope, view.get_throttle_identities(request))
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class ThrottleBeforeAuthenticationMixin:
+    """
+    Vue DRF dont les seaux sont vérifiés avant l'authentification (JWT, base)
+    """
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = None
+
+    def get_throttle_identities(self, request):
+        return {'ip': client_ip(request)}
+
+    def perform_authentication(self, request):
+        super().check_throttles(request)
+        super().perform_authentication(request)
+
+    def check_throttles(self, request):
+        # Déjà fait par perform_authentication
+        pass
@@ -0,0 +1,102 @@
+"""
+Traçage des requêtes : identifiant de corrélation (X-Request-ID), échantillonnage
+et journalisation paresseuse des événements de débogage, avec masquage des secrets.
+
+Les événements ne sont formatés que si la requête est échantillonnée
+(TRACE_SAMPLE_RATE) et que le logger 'api.trace' accepte le niveau DEBUG.
+"""
+import json
+import logging
+import random
+import re
+import uuid
+from collections.abc import Mapping
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger('api.trace')
+
+REQUEST_ID_RE = re.compile(r'^[\w\-.]{1,64}$')
+SECRET_RE = re.compile(r'pass|token|secret|refresh|access|authorization|api_key', re.IGNORECASE)
+REDACTED = '[masqué]'
+
+_request_id = ContextVar('request_id', default=None)
+_sampled = ContextVar('trace_sampled', default=False)
+
+
+def start(request):
+    """
+    Ouvre le contexte de traçage d'une requête : retourne son identifiant
+    et les jetons à passer à finish()
+    """
+    request_id = request.headers.get('X-Request-ID', '')
+    if not REQUEST_ID_RE.match(request_id):
+        request_id = uuid.uuid4().hex
+    rate = getattr(settings, 'TRACE_SAMPLE_RATE', 0.0)
+    sampled = rate >= 1 or (rate > 0 and random.random() < rate)
+    return request_id, (_request_id.set(request_id), _sampled.set(sampled))
+
+
+def finish(tokens):
+    request_token, sampled_token = tokens
+    _request_id.reset(request_token)
+    _sampled.reset(sampled_token)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def redact(value):
+    """
+    Copie de la valeur où les champs sensibles (mots de passe, tokens) sont masqués
+    """
+    if isinstance(value, Mapping):
+        return {
+            key: REDACTED if SECRET_RE.search(str(key)) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class _Event:
+    """
+    Événement formaté en JSON uniquement à l'émission de la ligne de log ;
+    les valeurs appelables ne sont évaluées qu'à ce moment
+    """
+    def __init__(self, event, fields):
+        self.event = event
+        self.request_id = current_request_id()
+        self.fields = fields
+
+    def __str__(self):
+        fields = {key: value() if callable(value) else value for key, value in self.fields.items()}
+        return json.dumps(
+            {'event': self.event, 'request_id': self.request_id, **redact(fields)},
+            ensure_ascii=False,
+            default=str,
+        )
+
+
+def is_enabled():
+    return _sampled.get() and logger.isEnabledFor(logging.DEBUG)
+
+
+def trace(event, **fields):
+    """
+    Journalise un événement de débogage si la requête courante est échantillonnée
+    """
+    if is_enabled():
+        logger.debug('%s', _Event(event, fields))
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Ajoute l'identifiant de la requête courante à chaque ligne de log
+    """
+    def filter(self, record):
+        record.request_id = current_request_id() or '-'
+        return True
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import movie_enrich_view
+
+urlpatterns = [
+    # Métadonnées TMDB (cache du backend)
+    path('enrich/', movie_enrich_view, name='movie-enrich'),
+]
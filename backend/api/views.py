@@ -1,6 +1,13 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+
+from . import db_pool, metrics
+from .services import tmdb
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -16,3 +23,50 @@ def api_home(request):
         },
         'documentation': 'Pour plus d\'informations, consultez la documentation de l\'API.'
     })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def movie_enrich_view(request):
+    """
+    Vue pour enrichir une liste de titres avec les métadonnées TMDB (affiche,
+    identifiant, année) en un seul aller-retour, via le cache du backend
+    """
+    titles = request.data.get('titles')
+    if not isinstance(titles, list) or not all(isinstance(title, str) for title in titles):
+        return Response(
+            {'error': 'Le champ titles doit être une liste de titres.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    max_titles = getattr(settings, 'TMDB_MAX_BATCH', 200)
+    if len(titles) > max_titles:
+        return Response(
+            {'error': f'Au plus {max_titles} titres par requête.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response({'results': tmdb.enrich_titles(titles)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats_view(request):
+    """
+    Vue des métriques des connexions à la base (pool : utilisées, en attente,
+    temps d'attente)
+    """
+    return Response(db_pool.stats())
+
+
+def metrics_view(request):
+    """
+    Métriques de tous les workers au format Prometheus ; token METRICS_TOKEN
+    exigé (en-tête Authorization: Bearer), accès libre seulement en DEBUG sans token
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(metrics.collect()), content_type=metrics.CONTENT_TYPE)
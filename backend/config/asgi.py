@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Déploiement ASGI (vues asynchrones de lecture et d'authentification) :
+
+    ASYNC_READ_VIEWS=1 ASYNC_AUTH_VIEWS=1 \
+        gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -1,6 +1,9 @@
 from pathlib import Path
 import os
+import sys
 BASE_DIR = Path(__file__).resolve().parent.parent 
+# Exécution de la suite de tests (manage.py test)
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
 SECRET_KEY = 'dev-key-change-later' 
 DEBUG = False 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'cinecritiqueprojet.onrender.com', 'cinecritique-projet-nu.vercel.app'] 
@@ -20,6 +23,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
+    'api.compression.CompressionMiddleware',
+    'api.db_routing.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -36,22 +42,44 @@ LOGGING = {
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
+            'format': '{levelname} {asctime} {module} {process:d} {thread:d} [{request_id}] {message}',
             'style': '{',
         },
     },
+    'filters': {
+        'request_id': {
+            '()': 'api.tracing.RequestIdFilter',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
+            'filters': ['request_id'],
         },
     },
     'root': {
         'handlers': ['console'],
         'level': 'INFO',
     },
+    'loggers': {
+        # Temps et nombre de requêtes SQL par requête HTTP (api.middleware)
+        'api.performance': {
+            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'WARNING' if TESTING else 'INFO'),
+        },
+        # Événements de débogage des requêtes échantillonnées (api.tracing)
+        'api.trace': {
+            'level': os.environ.get('TRACE_LOG_LEVEL', 'DEBUG'),
+        },
+    },
 }
 
+# Part des requêtes dont les événements de débogage sont journalisés (0 à 1)
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.0))
+
+# Dépassement d'un budget de requêtes SQL : exception en test, avertissement sinon
+QUERY_BUDGET_RAISE = TESTING
+
 # Configuration CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # URL du frontend Vite
@@ -66,6 +94,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Exposer l'en-tête Link (page suivante), l'identifiant de requête et l'ETag au frontend
+CORS_EXPOSE_HEADERS = ['ETag', 'Link', 'X-Request-ID']
+
 # Autoriser les en-têtes personnalisés
 CORS_ALLOW_HEADERS = [
     'accept',
@@ -73,10 +104,12 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-request-id',
 ]
 
 # Autoriser les méthodes HTTP
@@ -92,17 +125,47 @@ CORS_ALLOW_METHODS = [
 # Configuration des gestionnaires d'exceptions personnalisés
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON via orjson (api.renderers)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'EXCEPTION_HANDLER': 'users.exceptions.custom_exception_handler',
+    # Proxys devant l'application (répartiteur de Render) : l'adresse du client
+    # est lue à cette position de X-Forwarded-For, pas à la première (falsifiable)
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
 }
+# API navigable de DRF : développement uniquement
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
+# Métriques Prometheus (api.metrics, vue /metrics) : répertoire où chaque
+# worker recopie son état toutes les METRICS_FLUSH_INTERVAL secondes (local
+# au serveur, vide au démarrage ; sans lui, métriques du seul processus qui
+# répond) et token attendu dans l'en-tête Authorization
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Compression des réponses GET (api.compression) : taille minimale en octets
+# et niveaux brotli (réponses complètes / exports en flux)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+BROTLI_QUALITY = 5
+BROTLI_STREAM_QUALITY = 4
+
+# Pagination par curseur (voir api.pagination) : taille par défaut et
+# taille maximale acceptée via ?page_size=
+PAGINATION_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
 
 # Configuration JWT
 from datetime import timedelta
@@ -138,6 +201,89 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
+# Cache partagé : Redis si REDIS_URL est défini (nécessaire avec plusieurs
+# processus pour que l'invalidation des utilisateurs en cache soit commune)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Cache des réponses publiques en lecture (api.response_cache), invalidé par version
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))  # secondes
+
+# Résolution des utilisateurs authentifiés (users.authentication)
+AUTH_USER_CACHE_SIZE = 1024  # entrées du cache LRU local à chaque processus
+AUTH_USER_CACHE_TTL = 300  # secondes dans le cache partagé
+
+# Révocation des tokens (users.revocation) : filtre de Bloom en mémoire
+# (2^22 bits = 512 Ko, ~1 % de faux positifs pour 400 000 tokens révoqués)
+# resynchronisé depuis le cache partagé au plus toutes les N secondes
+REVOCATION_FILTER_BITS = 1 << 22
+REVOCATION_FILTER_HASHES = 7
+REVOCATION_SYNC_INTERVAL = 1.0
+
+# Hachage des mots de passe (users.hashing) : threads dédiés et places
+# d'attente au-delà desquelles les connexions échouent en 503
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16))
+
+# Vues asynchrones de connexion/inscription (déploiement ASGI)
+ASYNC_AUTH_VIEWS = os.environ.get('ASYNC_AUTH_VIEWS', '').lower() in ('1', 'true', 'yes')
+# Vues de lecture asynchrones (statistiques, critiques d'un film, mes critiques,
+# utilisateurs) et threads exécutant en parallèle leurs requêtes indépendantes
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
+ASYNC_DB_WORKERS = int(os.environ.get('ASYNC_DB_WORKERS', 4))
+
+# Tentatives de connexion, d'inscription et de changement de mot de passe
+# (api.throttling) : seaux de jetons par adresse IP et par compte, au format
+# "capacité/jetons rechargés par minute" (rafale, puis débit soutenu)
+def _throttle_rate(name, default):
+    capacity, per_minute = os.environ.get(name, default).split('/')
+    return int(capacity), float(per_minute)
+
+
+AUTH_THROTTLE_RATES = {
+    'login': {
+        'ip': _throttle_rate('THROTTLE_LOGIN_IP', '20/10'),
+        'account': _throttle_rate('THROTTLE_LOGIN_ACCOUNT', '5/1'),
+    },
+    'register': {
+        'ip': _throttle_rate('THROTTLE_REGISTER_IP', '5/1'),
+    },
+    'change_password': {
+        'ip': _throttle_rate('THROTTLE_CHANGE_PASSWORD_IP', '10/5'),
+        'account': _throttle_rate('THROTTLE_CHANGE_PASSWORD_ACCOUNT', '5/1'),
+    },
+}
+
+# File de tâches d'arrière-plan en base (api.jobs, commande run_jobs) :
+# threads par worker, attente quand la file est vide, délai de la première
+# nouvelle tentative (doublé à chaque échec, plafonné) et durée après
+# laquelle une tâche d'un worker arrêté est reprise
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', 2))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+JOB_RETRY_BACKOFF = 5
+JOB_RETRY_BACKOFF_MAX = 3600
+JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', 600))
+
+# Métadonnées TMDB (api.services.tmdb) : client interchangeable et cache en base
+TMDB_CLIENT = os.environ.get('TMDB_CLIENT', 'api.services.tmdb.HttpTMDBClient')
+TMDB_API_KEY = os.environ.get('TMDB_API_KEY', '')
+TMDB_LANGUAGE = 'fr-FR'
+TMDB_TIMEOUT = 5
+TMDB_CACHE_TTL = 7 * 24 * 3600  # secondes avant rafraîchissement d'une entrée
+TMDB_MAX_CONCURRENCY = 8
+TMDB_MAX_BATCH = 200
+
 ROOT_URLCONF = 'config.urls' 
 # Configuration de la base de données PostgreSQL
 DATABASES = {
@@ -179,6 +325,38 @@ if not DEBUG:
         # Fallback si dj_database_url n'est pas disponible
         pass
 
+# Réplicas en lecture (api.db_routing) : URLs séparées par des virgules.
+# En test, chaque réplica pointe vers la base de test principale (MIRROR).
+REPLICA_DATABASES = []
+_replica_urls = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+if _replica_urls:
+    import dj_database_url
+
+    for _index, _url in enumerate(_replica_urls, start=1):
+        DATABASES[f'replica_{_index}'] = {**dj_database_url.parse(_url), 'TEST': {'MIRROR': 'default'}}
+        REPLICA_DATABASES.append(f'replica_{_index}')
+DATABASE_ROUTERS = ['api.db_routing.ReplicaRouter']
+READ_YOUR_WRITES_WINDOW = int(os.environ.get('READ_YOUR_WRITES_WINDOW', 5))  # secondes sur la base principale après une écriture
+REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 2.0))  # secondes de retard tolérées
+REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', 5.0))  # secondes entre deux vérifications
+
+# Connexions à la base (api.db_pool) : pool psycopg 3 sous PostgreSQL si DB_POOL
+# (ou ?pool=1 dans DATABASE_URL), sinon connexions persistantes vérifiées avant
+# réutilisation. Sous ASGI, préférer le pool aux connexions persistantes.
+from api import db_pool
+
+DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+DB_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # attente max d'une connexion libre (s)
+    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),  # fermeture des connexions inactives (s)
+    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),  # renouvellement (s)
+}
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))  # sans pool (s)
+for _database in DATABASES.values():
+    db_pool.configure(_database, DB_POOL, DB_POOL_OPTIONS, DB_CONN_MAX_AGE)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'   
 AUTH_USER_MODEL = 'users.CustomUser'
 TEMPLATES = [
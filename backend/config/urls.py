@@ -6,7 +6,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
-from rest_framework_simplejwt.views import TokenRefreshView
+from api.views import db_pool_stats_view, metrics_view
+from users.views import CustomTokenRefreshView
 from django.views.generic import TemplateView
 
 # Vue d'accueil personnalisée
@@ -49,10 +50,15 @@ urlpatterns = [
         path('home/', api_home_view, name='api_home'),
         path('', include('users.urls')),
         path('reviews/', include('reviews.urls')),
+        path('movies/', include('api.urls')),
+        path('db/pool-stats/', db_pool_stats_view, name='db-pool-stats'),
     ])),
     
     # Endpoint de rafraîchissement du token
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+
+    # Métriques Prometheus
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Servir les fichiers media et static en production
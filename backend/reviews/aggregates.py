@@ -0,0 +1,113 @@
+"""
+Maintenance incrémentale des agrégats par film (MovieStats)
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from api import response_cache
+
+from . import suggest
+from .models import Movie, MovieStats, Review
+
+RATINGS = range(1, 6)
+
+
+def add_review(movie_id, rating, created_at):
+    """
+    Ajoute une critique aux agrégats de son film
+    """
+    _add(movie_id, Counter({rating: 1}), created_at)
+
+
+def add_reviews(reviews):
+    """
+    Ajoute un lot de critiques aux agrégats (une mise à jour par film)
+    """
+    ratings = defaultdict(Counter)
+    last = {}
+    for review in reviews:
+        ratings[review.movie_id][review.rating] += 1
+        if review.movie_id not in last or review.created_at > last[review.movie_id]:
+            last[review.movie_id] = review.created_at
+    for movie_id, counts in ratings.items():
+        _add(movie_id, counts, last[movie_id])
+
+
+def _add(movie_id, ratings, last_review_at):
+    """
+    Incrémente les agrégats d'un film de {note: nombre de critiques}
+    """
+    count = sum(ratings.values())
+    rating_sum = sum(rating * n for rating, n in ratings.items())
+    updated = MovieStats.objects.filter(movie_id=movie_id).update(
+        review_count=F('review_count') + count,
+        rating_sum=F('rating_sum') + rating_sum,
+        last_review_at=Greatest(Coalesce('last_review_at', Value(last_review_at)), Value(last_review_at)),
+        **{f'rating_{rating}': F(f'rating_{rating}') + n for rating, n in ratings.items()}
+    )
+    if updated:
+        return
+    movie = Movie.objects.get(pk=movie_id)
+    try:
+        with transaction.atomic():
+            MovieStats.objects.create(
+                movie=movie,
+                title=movie.title,
+                review_count=count,
+                rating_sum=rating_sum,
+                last_review_at=last_review_at,
+                **{f'rating_{rating}': n for rating, n in ratings.items()}
+            )
+            suggest.index_title(movie)
+    except IntegrityError:
+        # Ligne créée entre-temps par une écriture concurrente
+        _add(movie_id, ratings, last_review_at)
+
+
+def remove_review(movie_id, rating, created_at):
+    """
+    Retire une critique des agrégats de son film
+    """
+    MovieStats.objects.filter(movie_id=movie_id).update(**{
+        'review_count': F('review_count') - 1,
+        'rating_sum': F('rating_sum') - rating,
+        f'rating_{rating}': F(f'rating_{rating}') - 1,
+    })
+    stats = MovieStats.objects.filter(movie_id=movie_id).first()
+    if stats is None:
+        return
+    if stats.review_count <= 0:
+        stats.delete()
+    elif stats.last_review_at is None or stats.last_review_at <= created_at:
+        # La critique retirée était la plus récente : recalculer la date
+        stats.last_review_at = Review.objects.filter(movie_id=movie_id).aggregate(
+            last=Max('created_at')
+        )['last']
+        stats.save(update_fields=['last_review_at'])
+
+
+def rebuild():
+    """
+    Reconstruit entièrement la table des agrégats à partir des critiques
+    """
+    rows = Review.objects.values('movie_id', 'movie__title', 'movie__key').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        last_review_at=Max('created_at'),
+        **{f'rating_{n}': Count('id', filter=Q(rating=n)) for n in RATINGS}
+    ).order_by()
+    with transaction.atomic():
+        MovieStats.objects.all().delete()
+        MovieStats.objects.bulk_create(
+            (
+                MovieStats(title=row.pop('movie__title'), search_key=row.pop('movie__key'), **row)
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+        suggest.rebuild_index()
+        response_cache.clear()
+    return MovieStats.objects.count()
@@ -0,0 +1,100 @@
+"""
+Variantes asynchrones des vues de lecture des critiques, pour un déploiement
+ASGI (réglage ASYNC_READ_VIEWS).
+
+Mêmes requêtes, réponses, cache et ETag que reviews.views ; l'attente de la
+base ne bloque pas de thread, et les requêtes indépendantes des statistiques
+s'exécutent en parallèle (api.async_db).
+"""
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from api import async_db
+from api.async_views import DataResponse, error_response, read_view
+from api.conditional import conditional_get
+from api.middleware import query_budget
+from api.pagination import ReviewCursorPagination
+from api.response_cache import cache_response
+from users.authentication import TokenClaimsAuthentication
+from .serializers import ReviewListValuesSerializer
+from .views import (
+    EMPTY_MOVIE_DATA,
+    movie_data,
+    movie_reviews_queryset,
+    movie_scopes,
+    movie_stats_queryset,
+    my_reviews_queryset,
+    own_reviews_scopes,
+    stats_data,
+    stats_scopes,
+    stats_totals,
+    top_rated_movies,
+    top_reviewed_movies,
+)
+
+
+@query_budget(4)
+@read_view()
+@conditional_get(stats_scopes)
+@cache_response(stats_scopes)
+async def review_stats_view(request):
+    """
+    Statistiques détaillées sur les critiques
+    """
+    try:
+        totals, top_reviewed, top_rated = await async_db.parallel(
+            stats_totals, top_reviewed_movies, top_rated_movies
+        )
+        return DataResponse(stats_data(totals, top_reviewed, top_rated))
+    except Exception:
+        return DataResponse(
+            {'error': 'Erreur lors de la récupération des statistiques'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@query_budget(3)
+@read_view()
+@conditional_get(movie_scopes)
+@cache_response(movie_scopes)
+async def movie_reviews_view(request, movie_title):
+    """
+    Critiques d'un film
+    """
+    try:
+        stats = await movie_stats_queryset(movie_title).afirst()
+        if not stats or not stats['review_count']:
+            return DataResponse(EMPTY_MOVIE_DATA)
+
+        paginator = ReviewCursorPagination()
+        page = await paginator.apaginate_queryset(movie_reviews_queryset(stats), request)
+        return DataResponse(movie_data(movie_title, stats, page, paginator))
+    except NotFound as e:
+        # Curseur invalide
+        return error_response(e)
+    except Exception:
+        return DataResponse(
+            {'error': 'Erreur lors de la récupération des critiques du film'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@query_budget(1)
+@read_view(TokenClaimsAuthentication)
+@conditional_get(own_reviews_scopes)
+async def my_reviews_view(request):
+    """
+    Critiques de l'utilisateur connecté
+    """
+    try:
+        paginator = ReviewCursorPagination()
+        page = await paginator.apaginate_queryset(my_reviews_queryset(request.user.id), request)
+        return DataResponse(ReviewListValuesSerializer().serialize(page), headers=paginator.get_headers())
+    except NotFound as e:
+        # Curseur invalide
+        return error_response(e)
+    except Exception:
+        return DataResponse(
+            {'error': 'Erreur lors de la récupération de vos critiques'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
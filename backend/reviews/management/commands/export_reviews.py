@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from reviews import transfer
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "Exporte toutes les critiques en flux (NDJSON ou CSV)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=transfer.FORMATS, default='ndjson')
+        parser.add_argument('--output', default='-', help="Fichier de sortie ('-' pour la sortie standard)")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = transfer.export_rows(Review.objects.all(), chunk_size=options['chunk_size'])
+        lines = transfer.export_lines(rows, options['format'])
+        if options['output'] == '-':
+            sys.stdout.writelines(lines)
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+            f.writelines(lines)
+        self.stderr.write(self.style.SUCCESS(f"Export écrit dans {options['output']}"))
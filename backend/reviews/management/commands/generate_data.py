@@ -0,0 +1,134 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reviews import aggregates, search
+from reviews.models import Movie, Review
+from reviews.text import normalize_title
+from reviews.transfer import keep_timestamps
+
+User = get_user_model()
+
+WORDS = (
+    "nuit jour retour ombre lumière dernier premier voyage secret mémoire rêve "
+    "cité empire royaume étoile océan tempête silence fantôme guerre paix destin "
+    "amour ville montagne désert hiver été miroir horizon légende révolte"
+).split()
+
+SENTENCES = [
+    "Une mise en scène impressionnante et un scénario solide.",
+    "Les acteurs sont excellents, en particulier le rôle principal.",
+    "La photographie est magnifique mais le rythme est inégal.",
+    "Un film qui divise, mais qui ne laisse pas indifférent.",
+    "La bande originale accompagne parfaitement les émotions.",
+    "Trop long, avec une fin décevante.",
+    "Un classique moderne que je reverrai avec plaisir.",
+    "Des effets visuels stupéfiants au service d'une histoire simple.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère des utilisateurs et des critiques synthétiques (popularité des films "
+        "selon une loi de Zipf, nombre de critiques par utilisateur à queue lourde)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--movies', type=int, default=None,
+                            help="Nombre de films distincts (par défaut reviews / 20)")
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help="Exposant de la loi de Zipf pour la popularité des films")
+        parser.add_argument('--pareto', type=float, default=1.2,
+                            help="Paramètre de forme de la loi de Pareto (activité des utilisateurs)")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='benchmark',
+                            help="Mot de passe commun des utilisateurs générés")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        n_users = options['users']
+        n_reviews = options['reviews']
+        n_movies = options['movies'] or max(1, n_reviews // 20)
+
+        users = self.create_users(n_users, options['password'], batch_size)
+        movies = self.create_movies(rng, n_movies, batch_size)
+
+        # Poids cumulés : Zipf pour les films, Pareto pour les auteurs
+        movie_weights = list(accumulate(1 / (rank ** options['zipf']) for rank in range(1, len(movies) + 1)))
+        user_weights = list(accumulate(rng.paretovariate(options['pareto']) for _ in users))
+
+        now = timezone.now()
+        # Dates réparties sur deux ans
+        with keep_timestamps():
+            created = 0
+            while created < n_reviews:
+                size = min(batch_size, n_reviews - created)
+                batch = []
+                for _ in range(size):
+                    movie_id, title = rng.choices(movies, cum_weights=movie_weights)[0]
+                    date = now - timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600))
+                    batch.append(Review(
+                        title=title,
+                        movie_id=movie_id,
+                        content=' '.join(rng.sample(SENTENCES, rng.randint(1, 4))),
+                        rating=rng.choices(range(1, 6), weights=(1, 2, 4, 6, 4))[0],
+                        author_id=rng.choices(users, cum_weights=user_weights)[0],
+                        created_at=date,
+                        updated_at=date,
+                    ))
+                Review.objects.bulk_create(batch, batch_size=batch_size)
+                created += size
+                self.stdout.write(f"  {created}/{n_reviews} critiques")
+
+        # bulk_create ne déclenche pas les signaux : reconstruire les index dérivés
+        aggregates.rebuild()
+        search.rebuild_index(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(users)} utilisateurs, {len(movies)} films, {n_reviews} critiques générés"
+        ))
+
+    def create_users(self, count, password, batch_size):
+        # Un seul hachage pour tous les comptes générés
+        password_hash = make_password(password)
+        start = User.objects.count()
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'synth{start + i}',
+                    email=f'synth{start + i}@example.com',
+                    password=password_hash,
+                )
+                for i in range(count)
+            ),
+            batch_size=batch_size,
+        )
+        # Identifiants de tous les comptes synthétiques (y compris ceux d'une génération précédente)
+        return list(User.objects.filter(username__startswith='synth').values_list('id', flat=True))
+
+    def create_movies(self, rng, count, batch_size):
+        titles = {}
+        while len(titles) < count:
+            title = ' '.join(rng.sample(WORDS, rng.randint(1, 3))).capitalize()
+            if len(titles) % 7 == 0:
+                title = f"{title} {rng.randint(2, 4)}"
+            titles.setdefault(normalize_title(title), title)
+        Movie.objects.bulk_create(
+            (Movie(key=key, title=title) for key, title in titles.items()),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        keys = list(titles)
+        movies = []
+        for start in range(0, len(keys), 1000):
+            movies.extend(Movie.objects.filter(key__in=keys[start:start + 1000]).values_list('id', 'title'))
+        # Le rang dans cette liste détermine la popularité (loi de Zipf)
+        return sorted(movies)
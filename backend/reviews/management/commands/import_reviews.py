@@ -0,0 +1,60 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des critiques depuis un export NDJSON ou CSV, par lots transactionnels. "
+        "La progression est enregistrée dans <fichier>.checkpoint pour pouvoir reprendre avec --resume"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=transfer.FORMATS,
+                            help="Format du fichier (déduit de l'extension par défaut)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--resume', action='store_true',
+                            help="Reprendre après le dernier lot importé")
+        parser.add_argument('--skip', type=int, default=0,
+                            help="Nombre d'enregistrements à ignorer en début de fichier")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        checkpoint = f'{path}.checkpoint'
+
+        skip = options['skip']
+        if options['resume'] and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                skip = int(f.read().strip() or 0)
+            self.stdout.write(f"Reprise après l'enregistrement {skip}")
+
+        def on_batch(position, result):
+            # Le lot est validé en base : la reprise peut repartir de cette position
+            with open(checkpoint, 'w') as f:
+                f.write(str(position))
+            self.stdout.write(
+                f"  {position} enregistrements lus, {result['imported']} importés, "
+                f"{len(result['errors'])} rejetés"
+            )
+
+        try:
+            with open(path, encoding='utf-8', newline='') as f:
+                result = transfer.import_reviews(
+                    transfer.read_records(f, import_format),
+                    batch_size=options['batch_size'],
+                    skip=skip,
+                    on_batch=on_batch,
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for position, errors in result['errors'][:20]:
+            self.stderr.write(f"  enregistrement {position} : {errors}")
+        os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['imported']} critiques importées, {len(result['errors'])} rejetées"
+        ))
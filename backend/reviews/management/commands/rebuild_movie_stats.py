@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews import aggregates
+
+
+class Command(BaseCommand):
+    help = "Reconstruit la table des statistiques par film (et l'index d'autocomplétion des titres)"
+
+    def handle(self, *args, **options):
+        total = aggregates.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{total} films recalculés"))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:21
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_movie_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    MovieStats = apps.get_model('reviews', 'MovieStats')
+    rows = Review.objects.values('title').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        last_review_at=Max('created_at'),
+        **{f'rating_{n}': Count('id', filter=Q(rating=n)) for n in range(1, 6)}
+    ).order_by()
+    MovieStats.objects.bulk_create((MovieStats(**row) for row in rows), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, unique=True, verbose_name='Titre du film')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de critiques')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Somme des notes')),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('last_review_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernière critique')),
+            ],
+            options={
+                'verbose_name': 'Statistiques du film',
+                'verbose_name_plural': 'Statistiques des films',
+                'indexes': [models.Index(fields=['-review_count'], name='moviestats_review_count_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_movie_stats, migrations.RunPython.noop),
+    ]
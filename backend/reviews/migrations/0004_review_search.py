@@ -0,0 +1,131 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:25
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copie figée de reviews.text à la date de la migration : l'index rempli ici
+# ne doit pas changer si la normalisation du code évolue
+TOKEN_RE = re.compile(r'\w+')
+
+STOPWORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui
+    ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se
+    ses son sur ta te tes toi ton tu un une vos votre vous c d j l m n s t y est sont
+    the of and
+""".split())
+
+MAX_TERM_LENGTH = 64
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(fold(text))
+        if token not in STOPWORDS
+    ]
+
+
+def weighted_terms(fields):
+    weights = Counter()
+    for text, weight in fields:
+        for token in tokenize(text):
+            weights[token] += weight
+    return weights
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('cine_fr', coalesce(NEW.title, '')), 'A') || "
+    "setweight(to_tsvector('cine_fr', coalesce(NEW.content, '')), 'B')"
+)
+
+POSTGRES_FORWARD = f"""
+CREATE EXTENSION IF NOT EXISTS unaccent;
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'cine_fr') THEN
+        CREATE TEXT SEARCH CONFIGURATION cine_fr (COPY = french);
+        ALTER TEXT SEARCH CONFIGURATION cine_fr
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+    END IF;
+END $$;
+ALTER TABLE reviews_review ADD COLUMN search_vector tsvector;
+CREATE FUNCTION reviews_review_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER reviews_review_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON reviews_review
+    FOR EACH ROW EXECUTE FUNCTION reviews_review_search_vector_update();
+UPDATE reviews_review SET title = title;
+CREATE INDEX reviews_review_search_vector_gin ON reviews_review USING GIN (search_vector);
+"""
+
+POSTGRES_BACKWARD = """
+DROP INDEX IF EXISTS reviews_review_search_vector_gin;
+DROP TRIGGER IF EXISTS reviews_review_search_vector_trigger ON reviews_review;
+DROP FUNCTION IF EXISTS reviews_review_search_vector_update();
+ALTER TABLE reviews_review DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def setup_search(apps, schema_editor):
+    """
+    PostgreSQL : colonne tsvector + trigger + index GIN.
+    Autres bases : remplissage de l'index inversé local.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_FORWARD)
+        return
+    Review = apps.get_model('reviews', 'Review')
+    ReviewSearchTerm = apps.get_model('reviews', 'ReviewSearchTerm')
+    batch = []
+    for review in Review.objects.only('id', 'title', 'content').iterator(chunk_size=1000):
+        weights = weighted_terms([(review.title, 4), (review.content, 1)])
+        batch.extend(
+            ReviewSearchTerm(review_id=review.id, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+        if len(batch) >= 1000:
+            ReviewSearchTerm.objects.bulk_create(batch)
+            batch = []
+    ReviewSearchTerm.objects.bulk_create(batch)
+
+
+def teardown_search(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_review_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='reviews.review')),
+            ],
+            options={
+                'verbose_name': 'Terme de recherche',
+                'verbose_name_plural': 'Termes de recherche',
+                'indexes': [models.Index(fields=['term', 'review'], name='reviewsearchterm_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('review', 'term'), name='unique_review_term')],
+            },
+        ),
+        migrations.RunPython(setup_search, teardown_search),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:26
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copie figée de reviews.text à la date de la migration
+TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def backfill_title_index(apps, schema_editor):
+    MovieStats = apps.get_model('reviews', 'MovieStats')
+    TitleTrigram = apps.get_model('reviews', 'TitleTrigram')
+    trigrams = []
+    for movie in MovieStats.objects.iterator(chunk_size=1000):
+        movie.search_key = fold(movie.title).strip()
+        movie.save(update_fields=['search_key'])
+        grams = set()
+        for word in TOKEN_RE.findall(movie.search_key):
+            padded = f'  {word} '
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        trigrams.extend(TitleTrigram(movie_id=movie.id, trigram=gram) for gram in grams)
+    TitleTrigram.objects.bulk_create(trigrams, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_review_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviestats',
+            name='search_key',
+            field=models.CharField(db_index=True, default='', max_length=200),
+        ),
+        migrations.CreateModel(
+            name='TitleTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='reviews.moviestats')),
+            ],
+            options={
+                'verbose_name': 'Trigramme de titre',
+                'verbose_name_plural': 'Trigrammes de titres',
+                'indexes': [models.Index(fields=['trigram', 'movie'], name='titletrigram_trigram_idx')],
+                'constraints': [models.UniqueConstraint(fields=('movie', 'trigram'), name='unique_movie_trigram')],
+            },
+        ),
+        migrations.RunPython(backfill_title_index, migrations.RunPython.noop),
+    ]
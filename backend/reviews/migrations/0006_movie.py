@@ -0,0 +1,59 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_suggest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Titre du film')),
+                ('key', models.CharField(max_length=200, unique=True, verbose_name='Clé normalisée')),
+            ],
+            options={
+                'verbose_name': 'Film',
+                'verbose_name_plural': 'Films',
+            },
+        ),
+        migrations.AlterField(
+            model_name='moviestats',
+            name='title',
+            field=models.CharField(max_length=200, verbose_name='Titre du film'),
+        ),
+        migrations.AddField(
+            model_name='moviestats',
+            name='movie',
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='reviews.movie', verbose_name='Film'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='movie',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reviews', to='reviews.movie', verbose_name='Film'),
+        ),
+        # Les trigrammes sont désormais rattachés au film canonique (recalculés en 0007)
+        migrations.RemoveConstraint(
+            model_name='titletrigram',
+            name='unique_movie_trigram',
+        ),
+        migrations.RemoveIndex(
+            model_name='titletrigram',
+            name='titletrigram_trigram_idx',
+        ),
+        migrations.RemoveField(
+            model_name='titletrigram',
+            name='movie',
+        ),
+        migrations.AddField(
+            model_name='titletrigram',
+            name='movie',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='reviews.movie'),
+        ),
+    ]
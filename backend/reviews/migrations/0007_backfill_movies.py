@@ -0,0 +1,69 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:31
+
+import re
+import unicodedata
+
+from django.db import migrations
+from django.db.models import Count, Max, Min, Q, Sum
+
+# Copie figée de reviews.text à la date de la migration : les clés des films
+# créés ici ne doivent pas dépendre de la normalisation courante du code
+TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def normalize_title(title):
+    return ' '.join(fold(title).split())
+
+
+def backfill_movies(apps, schema_editor):
+    """
+    Crée un film par clé normalisée, rattache les critiques et recalcule
+    les agrégats (et leurs trigrammes) par film
+    """
+    Movie = apps.get_model('reviews', 'Movie')
+    Review = apps.get_model('reviews', 'Review')
+    MovieStats = apps.get_model('reviews', 'MovieStats')
+    TitleTrigram = apps.get_model('reviews', 'TitleTrigram')
+
+    titles_by_key = {}
+    for row in Review.objects.values('title').annotate(first=Min('created_at')).order_by('first'):
+        titles_by_key.setdefault(normalize_title(row['title']), []).append(row['title'])
+    for key, titles in titles_by_key.items():
+        movie = Movie.objects.create(key=key, title=' '.join(titles[0].split()))
+        Review.objects.filter(title__in=titles).update(movie=movie)
+
+    MovieStats.objects.all().delete()
+    TitleTrigram.objects.all().delete()
+    rows = Review.objects.values('movie_id', 'movie__title', 'movie__key').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        last_review_at=Max('created_at'),
+        **{f'rating_{n}': Count('id', filter=Q(rating=n)) for n in range(1, 6)}
+    ).order_by()
+    trigrams = []
+    for row in rows:
+        title = row.pop('movie__title')
+        search_key = row.pop('movie__key')
+        MovieStats.objects.create(title=title, search_key=search_key, **row)
+        grams = set()
+        for word in TOKEN_RE.findall(search_key):
+            padded = f'  {word} '
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        trigrams.extend(TitleTrigram(movie_id=row['movie_id'], trigram=gram) for gram in grams)
+    TitleTrigram.objects.bulk_create(trigrams, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_movie'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_movies, migrations.RunPython.noop),
+    ]
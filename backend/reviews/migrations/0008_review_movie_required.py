@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_backfill_movies'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='moviestats',
+            name='movie',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='reviews.movie', verbose_name='Film'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='movie',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reviews', to='reviews.movie', verbose_name='Film'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['movie', '-created_at', '-id'], name='review_movie_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='titletrigram',
+            name='movie',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='reviews.movie'),
+        ),
+        migrations.AddConstraint(
+            model_name='titletrigram',
+            constraint=models.UniqueConstraint(fields=('movie', 'trigram'), name='unique_movie_trigram'),
+        ),
+        migrations.AddIndex(
+            model_name='titletrigram',
+            index=models.Index(fields=['trigram', 'movie'], name='titletrigram_trigram_idx'),
+        ),
+    ]
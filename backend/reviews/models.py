@@ -1,13 +1,64 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
+from .text import normalize_title
+
 User = get_user_model()
 
+
+class MovieManager(models.Manager):
+    def resolve(self, title):
+        """
+        Retourne le film correspondant au titre (créé au besoin) via sa clé normalisée
+        """
+        movie, _ = self.get_or_create(
+            key=normalize_title(title),
+            defaults={'title': ' '.join(title.split())}
+        )
+        return movie
+
+    def resolve_many(self, titles):
+        """
+        Films correspondant à une liste de titres, indexés par clé normalisée
+        (les films manquants sont créés en une requête)
+        """
+        titles = {normalize_title(title): ' '.join(title.split()) for title in titles}
+        self.bulk_create(
+            (self.model(key=key, title=title) for key, title in titles.items()),
+            ignore_conflicts=True,
+        )
+        return {movie.key: movie for movie in self.filter(key__in=list(titles))}
+
+
+class Movie(models.Model):
+    """
+    Film canonique : les titres identiques à la casse, aux accents et aux
+    espaces près partagent la même clé
+    """
+    title = models.CharField(max_length=200, verbose_name="Titre du film")
+    key = models.CharField(max_length=200, unique=True, verbose_name="Clé normalisée")
+
+    objects = MovieManager()
+
+    class Meta:
+        verbose_name = "Film"
+        verbose_name_plural = "Films"
+
+    def __str__(self):
+        return self.title
+
+
 class Review(models.Model):
     """
     Modèle pour les critiques de films
     """
     title = models.CharField(max_length=200, verbose_name="Titre du film")
+    movie = models.ForeignKey(
+        Movie,
+        on_delete=models.PROTECT,
+        related_name='reviews',
+        verbose_name="Film"
+    )
     content = models.TextField(verbose_name="Contenu de la critique")
     rating = models.IntegerField(
         choices=[(i, i) for i in range(1, 6)],  # Notes de 1 à 5
@@ -26,6 +77,124 @@ class Review(models.Model):
         verbose_name = "Critique"
         verbose_name_plural = "Critiques"
         ordering = ['-created_at']
+        indexes = [
+            # Index couvrant la pagination keyset (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='review_created_id_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='review_author_created_idx'),
+            models.Index(fields=['movie', '-created_at', '-id'], name='review_movie_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.author.username} ({self.rating}/5)"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Mémoriser les valeurs chargées pour calculer les deltas d'agrégats
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Les agrégats (signaux post_save) sont mis à jour dans la même transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            loaded = getattr(self, '_loaded_values', None) or {}
+            if self.movie_id is None or loaded.get('title') != self.title:
+                self.movie = Movie.objects.resolve(self.title)
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            'title': self.title,
+            'movie_id': self.movie_id,
+            'rating': self.rating,
+            'created_at': self.created_at,
+        }
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+
+class MovieStats(models.Model):
+    """
+    Agrégats dénormalisés par film, maintenus à chaque écriture de critique
+    """
+    movie = models.OneToOneField(
+        Movie,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name="Film"
+    )
+    title = models.CharField(max_length=200, verbose_name="Titre du film")
+    # Clé normalisée du film (minuscules, sans accents) pour l'autocomplétion par préfixe
+    search_key = models.CharField(max_length=200, db_index=True, default='')
+    review_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de critiques")
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Somme des notes")
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    last_review_at = models.DateTimeField(null=True, blank=True, verbose_name="Dernière critique")
+
+    class Meta:
+        verbose_name = "Statistiques du film"
+        verbose_name_plural = "Statistiques des films"
+        indexes = [
+            models.Index(fields=['-review_count'], name='moviestats_review_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.review_count} critiques)"
+
+    def save(self, *args, **kwargs):
+        self.search_key = normalize_title(self.title)
+        super().save(*args, **kwargs)
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0
+        return self.rating_sum / self.review_count
+
+
+
+class ReviewSearchTerm(models.Model):
+    """
+    Index inversé de la recherche plein texte (utilisé hors PostgreSQL)
+    """
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Terme de recherche"
+        verbose_name_plural = "Termes de recherche"
+        constraints = [
+            models.UniqueConstraint(fields=['review', 'term'], name='unique_review_term'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'review'], name='reviewsearchterm_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.review_id})"
+
+
+class TitleTrigram(models.Model):
+    """
+    Index de trigrammes des titres de films (autocomplétion tolérante aux fautes)
+    """
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        verbose_name = "Trigramme de titre"
+        verbose_name_plural = "Trigrammes de titres"
+        constraints = [
+            models.UniqueConstraint(fields=['movie', 'trigram'], name='unique_movie_trigram'),
+        ]
+        indexes = [
+            models.Index(fields=['trigram', 'movie'], name='titletrigram_trigram_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram} ({self.movie_id})"
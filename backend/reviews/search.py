@@ -0,0 +1,121 @@
+"""
+Recherche plein texte sur les critiques (titre pondéré au-dessus du contenu).
+
+Sous PostgreSQL, chaque critique porte une colonne `search_vector` (tsvector)
+maintenue par un trigger et indexée en GIN, avec une configuration `cine_fr`
+(français + unaccent). Sur les autres bases (SQLite en test), un index inversé
+local (ReviewSearchTerm) est maintenu à l'écriture.
+"""
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Review, ReviewSearchTerm
+from .text import tokenize, weighted_terms
+
+TITLE_WEIGHT = 4
+CONTENT_WEIGHT = 1
+
+TSQUERY = "websearch_to_tsquery('cine_fr', %s)"
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('cine_fr', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('cine_fr', coalesce(content, '')), 'B')"
+)
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def index_review(review):
+    """
+    Met à jour l'index inversé d'une critique (le trigger s'en charge sous PostgreSQL)
+    """
+    if uses_postgres():
+        return
+    weights = weighted_terms([(review.title, TITLE_WEIGHT), (review.content, CONTENT_WEIGHT)])
+    with transaction.atomic():
+        ReviewSearchTerm.objects.filter(review=review).delete()
+        ReviewSearchTerm.objects.bulk_create(
+            ReviewSearchTerm(review=review, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+
+
+def index_reviews(reviews):
+    """
+    Indexe un lot de critiques nouvellement créées (import en masse)
+    """
+    if uses_postgres():
+        return
+    ReviewSearchTerm.objects.bulk_create(
+        ReviewSearchTerm(review_id=review.id, term=term, weight=weight)
+        for review in reviews
+        for term, weight in weighted_terms(
+            [(review.title, TITLE_WEIGHT), (review.content, CONTENT_WEIGHT)]
+        ).items()
+    )
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reconstruit l'index de recherche pour toutes les critiques
+    """
+    if uses_postgres():
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE reviews_review SET search_vector = {SEARCH_VECTOR}")
+        return Review.objects.count()
+    total = 0
+    with transaction.atomic():
+        ReviewSearchTerm.objects.all().delete()
+        batch = []
+        for review in Review.objects.only('id', 'title', 'content').iterator(chunk_size=batch_size):
+            weights = weighted_terms([(review.title, TITLE_WEIGHT), (review.content, CONTENT_WEIGHT)])
+            batch.extend(
+                ReviewSearchTerm(review_id=review.id, term=term, weight=weight)
+                for term, weight in weights.items()
+            )
+            total += 1
+            if len(batch) >= batch_size:
+                ReviewSearchTerm.objects.bulk_create(batch)
+                batch = []
+        ReviewSearchTerm.objects.bulk_create(batch)
+    return total
+
+
+def _matching_terms(terms, **filters):
+    """
+    Critiques contenant tous les termes de la requête, avec leur score
+    """
+    return ReviewSearchTerm.objects.filter(term__in=terms, **filters).values('review').annotate(
+        matched=Count('term'),
+        score=Sum('weight'),
+    ).filter(matched=len(terms))
+
+
+def filter_reviews(queryset, query):
+    """
+    Restreint un queryset de critiques à celles qui correspondent à la requête
+    """
+    if uses_postgres():
+        return queryset.filter(
+            RawSQL(f"reviews_review.search_vector @@ {TSQUERY}", [query], output_field=BooleanField())
+        )
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return queryset.none()
+    return queryset.filter(id__in=_matching_terms(terms).values('review'))
+
+
+def search_reviews(queryset, query):
+    """
+    Critiques correspondant à la requête, annotées d'un score `rank` et triées par pertinence
+    """
+    if uses_postgres():
+        rank = RawSQL(f"ts_rank(reviews_review.search_vector, {TSQUERY})", [query], output_field=FloatField())
+    else:
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return queryset.none()
+        rank = Subquery(_matching_terms(terms, review=OuterRef('pk')).values('score'))
+    return filter_reviews(queryset, query).annotate(rank=rank).order_by('-rank', '-created_at', '-id')
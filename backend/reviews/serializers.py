@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.serializers import ValuesSerializer
 from .models import Review
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -14,12 +15,13 @@ class ReviewSerializer(serializers.ModelSerializer):
             'title', 
             'content', 
             'rating', 
+            'movie',
             'author', 
             'author_username',
             'created_at', 
             'updated_at'
         ]
-        read_only_fields = ['id', 'author', 'author_username', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'movie', 'author', 'author_username', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         # Assigner l'auteur automatiquement à l'utilisateur connecté
@@ -41,4 +43,19 @@ class ReviewListSerializer(serializers.ModelSerializer):
             'rating', 
             'author_username',
             'created_at'
-        ]
\ No newline at end of file
+        ]
+
+class ReviewListValuesSerializer(ValuesSerializer):
+    """
+    ReviewListSerializer sur des lignes values_list() (listes paginées)
+    """
+    serializer_class = ReviewListSerializer
+
+class ReviewSearchResultSerializer(ReviewListSerializer):
+    """
+    Sérialiseur des résultats de recherche (avec le score de pertinence)
+    """
+    rank = serializers.FloatField(read_only=True)
+    
+    class Meta(ReviewListSerializer.Meta):
+        fields = ReviewListSerializer.Meta.fields + ['rank']
@@ -0,0 +1,69 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from api import response_cache
+
+from . import aggregates, search
+from .models import Review
+from .text import normalize_title
+
+TRACKED_FIELDS = {'title', 'movie_id', 'rating', 'created_at'}
+
+
+def invalidate_responses(review, previous=None):
+    """
+    Invalide les réponses en cache qui dépendent de la critique : statistiques,
+    page du film (ancien et nouveau titre) et fiche de l'auteur
+    """
+    titles = {review.title, (previous or {}).get('title') or review.title}
+    response_cache.bump(
+        'reviews',
+        f'user:{review.author_id}',
+        *(f'movie:{normalize_title(title)}' for title in titles)
+    )
+
+
+@receiver(pre_save, sender=Review)
+def review_pre_save(sender, instance, raw=False, **kwargs):
+    """
+    Charge l'état précédent d'une critique modifiée sans passer par from_db
+    """
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if raw or instance.pk is None or TRACKED_FIELDS <= loaded.keys():
+        return
+    instance._loaded_values = (
+        Review.objects.filter(pk=instance.pk).values('title', 'movie_id', 'rating', 'created_at').first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Met à jour les agrégats du film après création ou modification d'une critique
+    """
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_values', None)
+    invalidate_responses(instance, previous if not created else None)
+    update_fields = kwargs.get('update_fields')
+    if created or update_fields is None or {'title', 'content'} & set(update_fields):
+        search.index_review(instance)
+    if not created and previous:
+        if previous.get('movie_id') == instance.movie_id and previous.get('rating') == instance.rating:
+            return
+        aggregates.remove_review(previous['movie_id'], previous['rating'], previous['created_at'])
+    aggregates.add_review(instance.movie_id, instance.rating, instance.created_at)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Retire la critique supprimée des agrégats de son film
+    """
+    previous = getattr(instance, '_loaded_values', None) or {}
+    invalidate_responses(instance, previous)
+    aggregates.remove_review(
+        previous.get('movie_id', instance.movie_id),
+        previous.get('rating', instance.rating),
+        instance.created_at,
+    )
@@ -0,0 +1,126 @@
+"""
+Autocomplétion des titres de films critiqués, tolérante aux fautes de frappe.
+
+Les titres distincts sont ceux des films de MovieStats (classés par nombre de
+critiques).
+La recherche combine un préfixe indexé sur le titre normalisé et un index de
+trigrammes (TitleTrigram) dont les candidats sont départagés par une distance
+d'édition bornée.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Movie, MovieStats, TitleTrigram
+from .text import TOKEN_RE, fold, normalize_title
+
+# Nombre maximal de candidats issus des trigrammes à départager
+TRIGRAM_CANDIDATES = 50
+
+
+def trigrams(text):
+    """
+    Trigrammes de chaque mot, complétés comme pg_trgm ("  mot ")
+    """
+    grams = set()
+    for word in TOKEN_RE.findall(fold(text)):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def max_typos(query):
+    """
+    Nombre de fautes tolérées selon la longueur de la saisie
+    """
+    if len(query) <= 3:
+        return 0
+    return 1 if len(query) <= 6 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Distance de Levenshtein, abandonnée dès qu'elle dépasse `limit`
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def index_title(movie):
+    """
+    Indexe les trigrammes du titre d'un film (sans effet s'il l'est déjà)
+    """
+    TitleTrigram.objects.bulk_create(
+        (TitleTrigram(movie=movie, trigram=gram) for gram in trigrams(movie.title)),
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reconstruit entièrement l'index de trigrammes
+    """
+    with transaction.atomic():
+        TitleTrigram.objects.all().delete()
+        batch = []
+        for movie_id, title in Movie.objects.values_list('id', 'title').iterator(chunk_size=batch_size):
+            batch.extend(TitleTrigram(movie_id=movie_id, trigram=gram) for gram in trigrams(title))
+            if len(batch) >= batch_size:
+                TitleTrigram.objects.bulk_create(batch)
+                batch = []
+        TitleTrigram.objects.bulk_create(batch)
+
+
+def suggest(query, limit=10):
+    """
+    Titres correspondant au début de `query` (à une ou deux fautes près),
+    les plus critiqués en premier
+    """
+    key = normalize_title(query)
+    if not key:
+        return []
+
+    fields = ('movie_id', 'title', 'review_count')
+    results = list(
+        MovieStats.objects.filter(search_key__startswith=key, review_count__gt=0)
+        .order_by('-review_count', 'title')
+        .values(*fields)[:limit]
+    )
+    if len(results) >= limit:
+        return results
+
+    grams = trigrams(key)
+    seen = {row['movie_id'] for row in results}
+    candidate_ids = [
+        row['movie'] for row in
+        TitleTrigram.objects.filter(trigram__in=grams).values('movie')
+        .annotate(shared=Count('id')).order_by('-shared')[:TRIGRAM_CANDIDATES]
+        if row['movie'] not in seen
+    ]
+    limit_typos = max_typos(key)
+    fuzzy = []
+    for row in MovieStats.objects.filter(movie_id__in=candidate_ids, review_count__gt=0).values(*fields, 'search_key'):
+        # Comparer la saisie au début du titre de même longueur (à une lettre près)
+        distance = min(
+            edit_distance(key, row['search_key'][:len(key) + delta], limit_typos)
+            for delta in (-1, 0, 1)
+        )
+        if distance <= limit_typos:
+            fuzzy.append((distance, -row['review_count'], row['title'], row))
+    fuzzy.sort(key=lambda item: item[:3])
+    for *_, row in fuzzy[:limit - len(results)]:
+        del row['search_key']
+        results.append(row)
+    return results
@@ -1,3 +1,513 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import threading
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import renderers
+from api.middleware import RequestTimingMiddleware
+from users import revocation
+
+from . import aggregates, async_views, search, transfer
+from .models import Movie, MovieStats, Review
+from .serializers import ReviewListSerializer, ReviewListValuesSerializer
+
+User = get_user_model()
+
+
+class ReviewQueryCountTests(TestCase):
+    """
+    Le nombre de requêtes SQL par endpoint ne doit pas dépendre du nombre de lignes
+    """
+    sizes = (10, 100, 1000)
+
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def grow_to(self, size):
+        """
+        Complète la base jusqu'à `size` critiques réparties sur plusieurs auteurs
+        """
+        missing = size - Review.objects.count()
+        start = User.objects.count()
+        authors = User.objects.bulk_create(
+            User(username=f'user{start + i}', email=f'user{start + i}@example.com')
+            for i in range(missing // 10)
+        ) + [self.user]
+        movie = Movie.objects.resolve('Inception')
+        Review.objects.bulk_create(
+            Review(
+                title='Inception',
+                movie=movie,
+                content='Critique',
+                rating=1 + i % 5,
+                author=authors[i % len(authors)],
+            )
+            for i in range(missing)
+        )
+        aggregates.rebuild()
+
+    def assertQueriesPerSize(self, expected, url):
+        for size in self.sizes:
+            self.grow_to(size)
+            with self.subTest(size=size), self.assertNumQueries(expected):
+                response = self.client.get(url, {'page_size': size})
+            self.assertEqual(response.status_code, 200)
+
+    def test_review_list(self):
+        self.assertQueriesPerSize(1, '/api/reviews/')
+
+    def test_my_reviews(self):
+        self.assertQueriesPerSize(1, '/api/reviews/my-reviews/')
+
+    def test_movie_reviews(self):
+        self.assertQueriesPerSize(2, '/api/reviews/movie/Inception/')
+
+    def test_review_stats(self):
+        self.assertQueriesPerSize(3, '/api/reviews/stats/')
+
+    def test_review_detail(self):
+        self.grow_to(10)
+        review = Review.objects.filter(author=self.user).first()
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/reviews/{review.pk}/')
+        self.assertEqual(response.status_code, 200)
+
+
+class MovieStatsTests(TestCase):
+    """
+    Les agrégats maintenus à chaque écriture correspondent à un recalcul complet
+    """
+    fields = ('movie_id', 'title', 'search_key', 'review_count', 'rating_sum',
+              'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5', 'last_review_at')
+
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+
+    def stats(self, title='Inception'):
+        return MovieStats.objects.filter(movie__key=title.lower()).values(*self.fields).first()
+
+    def test_rating_change(self):
+        review = Review.objects.create(title='Inception', content='Critique', rating=4, author=self.user)
+        Review.objects.create(title='Inception', content='Critique', rating=2, author=self.user)
+        review.rating = 5
+        review.save()
+        stats = self.stats()
+        self.assertEqual(stats['review_count'], 2)
+        self.assertEqual(stats['rating_sum'], 7)
+        self.assertEqual([stats[f'rating_{n}'] for n in range(1, 6)], [0, 1, 0, 0, 1])
+
+    def test_delete_reviews(self):
+        first, second, last = (
+            Review.objects.create(title='Inception', content=f'Critique {i}', rating=3, author=self.user)
+            for i in range(3)
+        )
+        self.assertEqual(self.stats()['last_review_at'], last.created_at)
+
+        # La plus récente retirée : la date redevient celle de la précédente
+        last.delete()
+        self.assertEqual(self.stats()['last_review_at'], second.created_at)
+        self.assertEqual(self.stats()['review_count'], 2)
+
+        # Dernière critique du film : la ligne disparaît
+        second.delete()
+        first.delete()
+        self.assertFalse(MovieStats.objects.exists())
+
+    def test_rebuild_matches_incremental(self):
+        reviews = [
+            Review.objects.create(title=title, content='Critique', rating=rating, author=self.user)
+            for title, rating in [('Amélie', 5), ('amelie', 3), ('Inception', 4), ('Inception', 1), ('Dune', 2)]
+        ]
+        reviews[1].rating = 2
+        reviews[1].save()
+        reviews[3].title = 'Dune'
+        reviews[3].save()
+        reviews[2].delete()
+
+        incremental = list(MovieStats.objects.order_by('movie_id').values(*self.fields))
+        call_command('rebuild_movie_stats', stdout=io.StringIO())
+        self.assertEqual(list(MovieStats.objects.order_by('movie_id').values(*self.fields)), incremental)
+        self.assertEqual([row['review_count'] for row in incremental], [2, 2])
+
+
+class ReviewPaginationTests(TestCase):
+    """
+    Pagination par curseur des listes de critiques (en-tête Link, clé `next` par film)
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        for i in range(5):
+            Review.objects.create(title='Inception', content=f'Critique {i}', rating=3, author=self.user)
+        # Même date pour toutes : l'ordre ne tient qu'à l'id
+        self.created_at = timezone.now()
+        Review.objects.update(created_at=self.created_at)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def next_link(self, response):
+        link = response.get('Link')
+        return link[1:link.index('>')] if link else None
+
+    def test_pages_follow_stable_order(self):
+        ids = []
+        url = '/api/reviews/my-reviews/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json()), 2)
+            ids += [review['id'] for review in response.json()]
+            url = self.next_link(response)
+        self.assertEqual(ids, sorted(Review.objects.values_list('id', flat=True), reverse=True))
+
+    def test_cursor_is_opaque(self):
+        link = self.next_link(self.client.get('/api/reviews/', {'page_size': 2}))
+        cursor = link.split('cursor=')[1].split('&')[0]
+        self.assertNotIn(str(self.created_at.year), cursor)
+        self.assertNotIn('created_at', cursor)
+
+    def test_invalid_cursor(self):
+        for url in ('/api/reviews/', '/api/reviews/my-reviews/', '/api/reviews/movie/inception/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'cursor': 'pas-un-curseur'})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['detail'], 'Curseur invalide.')
+
+    @override_settings(PAGINATION_PAGE_SIZE=2, PAGINATION_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.client.get('/api/reviews/').json()), 2)
+        self.assertEqual(len(self.client.get('/api/reviews/', {'page_size': 1000}).json()), 3)
+        self.assertEqual(len(self.client.get('/api/reviews/', {'page_size': 0}).json()), 2)
+
+        data = self.client.get('/api/reviews/movie/inception/').json()
+        self.assertEqual(len(data['reviews']), 2)
+        self.assertEqual(data['total_reviews'], 5)
+        last = self.client.get(data['next'].split('localhost', 1)[1] + '&page_size=3').json()
+        self.assertEqual(len(last['reviews']), 3)
+        self.assertIsNone(last['next'])
+
+
+class ReviewSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def create(self, title, content):
+        return Review.objects.create(title=title, content=content, rating=4, author=self.user)
+
+    def test_title_ranks_above_content(self):
+        in_content = self.create('Inception', "Un rêve dans le Fabuleux destin")
+        in_title = self.create("Le Fabuleux Destin d'Amélie Poulain", 'Poétique')
+        self.create('Dune', 'Sable')
+        results = self.client.get('/api/reviews/search/', {'q': 'fabuleux destin'}).json()['results']
+        self.assertEqual([r['id'] for r in results], [in_title.id, in_content.id])
+
+    def test_accent_and_case_folding(self):
+        review = self.create("Le Fabuleux Destin d'Amélie Poulain", 'Poétique')
+        results = self.client.get('/api/reviews/search/', {'q': 'AMELIE poetique'}).json()['results']
+        self.assertEqual([r['id'] for r in results], [review.id])
+
+    def test_index_follows_updates(self):
+        review = self.create('Inception', 'Rêves')
+        review.content = 'Toupie'
+        review.save()
+        response = self.client.get('/api/reviews/', {'search': 'toupie'})
+        self.assertEqual([r['id'] for r in response.json()], [review.id])
+        self.assertEqual(self.client.get('/api/reviews/', {'search': 'reves'}).json(), [])
+
+
+class TitleSuggestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        user = User.objects.create(username='auteur', email='auteur@example.com')
+        for title, count in [('Inception', 3), ('Interstellar', 5), ('Intouchables', 1), ('Amélie', 2)]:
+            for _ in range(count):
+                Review.objects.create(title=title, content='Critique', rating=4, author=user)
+
+    def titles(self, query):
+        response = self.client.get('/api/reviews/titles/suggest/', {'q': query})
+        return [row['title'] for row in response.json()['suggestions']]
+
+    def test_prefix_ranked_by_review_count(self):
+        self.assertEqual(self.titles('int'), ['Interstellar', 'Intouchables'])
+        self.assertEqual(self.titles('ame'), ['Amélie'])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.titles('incpetion'), ['Inception'])
+        self.assertEqual(self.titles('intersetllar'), ['Interstellar'])
+
+    def test_index_follows_deletes(self):
+        Review.objects.filter(title='Amélie').delete()
+        self.assertEqual(self.titles('ame'), [])
+
+
+class MovieTests(TestCase):
+    def test_titles_share_canonical_movie(self):
+        user = User.objects.create(username='auteur', email='auteur@example.com')
+        first = Review.objects.create(title='Amélie', content='Critique', rating=5, author=user)
+        second = Review.objects.create(title='  amelie ', content='Critique', rating=3, author=user)
+        self.assertEqual(first.movie_id, second.movie_id)
+        self.assertEqual(first.movie.stats.review_count, 2)
+
+        response = APIClient(HTTP_HOST='localhost').get('/api/reviews/movie/AMELIE/')
+        self.assertEqual(response.json()['total_reviews'], 2)
+        self.assertEqual(response.json()['average_rating'], 4.0)
+
+        second.title = 'Inception'
+        second.save()
+        self.assertEqual(Movie.objects.get(key='inception').stats.review_count, 1)
+        self.assertEqual(Movie.objects.get(key='amelie').stats.review_count, 1)
+
+
+class GenerateDataTests(TestCase):
+    def test_skewed_dataset_with_consistent_aggregates(self):
+        call_command('generate_data', users=50, reviews=2000, movies=100, batch_size=500, stdout=io.StringIO())
+        self.assertEqual(Review.objects.count(), 2000)
+        self.assertEqual(User.objects.filter(username__startswith='synth').count(), 50)
+
+        # Loi de Zipf : le film le plus populaire concentre une part importante des critiques
+        counts = list(MovieStats.objects.order_by('-review_count').values_list('review_count', flat=True))
+        self.assertEqual(sum(counts), 2000)
+        self.assertGreater(counts[0], 10 * counts[len(counts) // 2])
+
+
+class ReviewTransferTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        for title, rating in [('Amélie', 5), ('Inception', 4), ('amelie', 3)]:
+            Review.objects.create(title=title, content=f'Critique de {title}', rating=rating, author=self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def export(self, export_format):
+        response = self.client.get(f'/api/reviews/export/?type={export_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_formats(self):
+        lines = self.export('ndjson').splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Amélie', 'Inception', 'amelie'])
+        self.assertEqual(json.loads(lines[0])['author_username'], 'auteur')
+
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual([row['rating'] for row in rows], ['5', '4', '3'])
+        self.assertEqual(self.client.get('/api/reviews/export/?type=xml').status_code, 400)
+
+    def test_import_round_trip_with_resume(self):
+        exported = self.export('ndjson') + '{"title": "Sans auteur"}\n'
+        Review.objects.all().delete()
+
+        positions = []
+        result = transfer.import_reviews(
+            transfer.read_records(io.StringIO(exported), 'ndjson'),
+            batch_size=2,
+            on_batch=lambda position, result: positions.append(position),
+        )
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual([position for position, _ in result['errors']], [4])
+        self.assertEqual(positions, [2, 4])
+        self.assertEqual(Movie.objects.get(key='amelie').stats.review_count, 2)
+        self.assertEqual(Movie.objects.get(key='amelie').stats.rating_sum, 8)
+        self.assertEqual(search.search_reviews(Review.objects.all(), 'inception').count(), 1)
+
+        # Reprise après le premier lot : seuls les enregistrements suivants sont importés
+        result = transfer.import_reviews(
+            transfer.read_records(io.StringIO(exported), 'ndjson'), batch_size=2, skip=2,
+        )
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(Review.objects.count(), 4)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        Review.objects.create(title='Amélie', content='Critique', rating=4, author=self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_hit_without_queries(self):
+        self.assertEqual(self.get('/api/reviews/stats/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.get('/api/reviews/stats/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['total_reviews'], 1)
+
+    def test_writes_invalidate_dependent_responses(self):
+        self.get('/api/reviews/stats/')
+        self.get('/api/reviews/movie/amelie/')
+        self.get(f'/api/users/{self.user.pk}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(title='AMELIE', content='Encore', rating=2, author=self.user)
+        self.assertEqual(self.get('/api/reviews/stats/').json()['total_reviews'], 2)
+        self.assertEqual(self.get('/api/reviews/movie/amelie/').json()['total_reviews'], 2)
+        self.assertEqual(self.get(f'/api/users/{self.user.pk}/').json()['reviews_count'], 2)
+
+        # Renommage de l'auteur : les pages de films affichent son nom
+        self.user.username = 'critique'
+        self.user.save()
+        response = self.get('/api/reviews/movie/amelie/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['reviews'][0]['author_username'], 'critique')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        Review.objects.create(title='Amélie', content='Critique', rating=4, author=self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def test_not_modified_until_write(self):
+        for url in ['/api/reviews/my-reviews/', '/api/reviews/stats/', '/api/reviews/movie/amelie/']:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+
+        etag = self.client.get('/api/reviews/my-reviews/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(title='Inception', content='Critique', rating=5, author=self.user)
+        response = self.client.get('/api/reviews/my-reviews/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get('/api/reviews/my-reviews/')['ETag']
+        other = User.objects.create(username='autre', email='autre@example.com')
+        self.client.force_authenticate(other)
+        response = self.client.get('/api/reviews/my-reviews/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+class AsyncReadViewTests(TestCase):
+    """
+    Les variantes asynchrones répondent comme les vues DRF
+    """
+    def setUp(self):
+        self.user = User.objects.create(username='auteur', email='auteur@example.com')
+        for title, rating in [('Amélie', 5), ('Inception', 4), ('amelie', 3)]:
+            Review.objects.create(title=title, content=f'Critique de {title}', rating=rating, author=self.user)
+        revocation.publish()
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.factory = RequestFactory(HTTP_HOST='localhost')
+
+    def compare(self, view, url, **kwargs):
+        cache.clear()
+        expected = self.client.get(url, {'page_size': 1}, **self.auth)
+        cache.clear()
+        response = async_to_sync(view)(self.factory.get(url, {'page_size': 1}, **self.auth), **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(response.get('Link'), expected.get('Link'))
+        return response
+
+    def test_same_responses(self):
+        self.compare(async_views.review_stats_view, '/api/reviews/stats/')
+        self.compare(async_views.movie_reviews_view, '/api/reviews/movie/amelie/', movie_title='amelie')
+        response = self.compare(async_views.my_reviews_view, '/api/reviews/my-reviews/')
+        self.assertIn('rel="next"', response['Link'])
+
+        request = self.factory.get('/api/reviews/my-reviews/', {'page_size': 1},
+                                   HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(async_to_sync(async_views.my_reviews_view)(request).status_code, 304)
+
+    def test_authentication_required(self):
+        response = async_to_sync(async_views.my_reviews_view)(self.factory.get('/api/reviews/my-reviews/'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalid_cursor(self):
+        request = self.factory.get('/api/reviews/my-reviews/', {'cursor': 'pas-un-curseur'}, **self.auth)
+        response = async_to_sync(async_views.my_reviews_view)(request)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content)['detail'], 'Curseur invalide.')
+
+
+class AsyncParallelQueryTests(TransactionTestCase):
+    """
+    Hors transaction, les requêtes exécutées sur les threads de async_db
+    sont comptées avec celles de la requête HTTP
+    """
+    def test_pool_queries_are_counted(self):
+        cache.clear()
+        user = User.objects.create(username='auteur', email='auteur@example.com')
+        Review.objects.create(title='Inception', content='Critique', rating=4, author=user)
+
+        async def get_response(request):
+            return await async_views.review_stats_view(request)
+
+        middleware = RequestTimingMiddleware(get_response)
+        response = async_to_sync(middleware)(RequestFactory(HTTP_HOST='localhost').get('/api/reviews/stats/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['total_reviews'], 1)
+        self.assertIn('queries;desc="3"', response['Server-Timing'])
+
+    def test_async_orm_queries_are_counted(self):
+        cache.clear()
+        user = User.objects.create(username='auteur', email='auteur@example.com')
+        Review.objects.create(title='Inception', content='Critique', rating=4, author=user)
+
+        async def get_response(request):
+            return await async_views.movie_reviews_view(request, movie_title='inception')
+
+        # Boucle d'événements hors du thread principal, comme sous uvicorn :
+        # l'ORM asynchrone exécute les requêtes sur un autre thread (autre connexion)
+        middleware = RequestTimingMiddleware(get_response)
+        request = RequestFactory(HTTP_HOST='localhost').get('/api/reviews/movie/inception/')
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(asyncio.run(middleware(request))))
+        thread.start()
+        thread.join()
+        self.assertEqual(json.loads(responses[0].content)['total_reviews'], 1)
+        self.assertIn('queries;desc="2"', responses[0]['Server-Timing'])
+
+
+class ValuesSerializerTests(TestCase):
+    """
+    Les listes sur values_list() rendent le même JSON que les ModelSerializer
+    """
+    def setUp(self):
+        self.user = User.objects.create(username='Zoé', email='zoe@example.com')
+        for i, title in enumerate(['Amélie', 'Inception', 'Le "Parrain"']):
+            Review.objects.create(title=title, content=f'Critique\n{i} ✓', rating=1 + i, author=self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def test_byte_identical(self):
+        queryset = Review.objects.order_by('-created_at', '-id')
+        rows = ReviewListValuesSerializer()
+        self.assertEqual(
+            renderers.dumps(rows.serialize(rows.values(queryset))),
+            renderers.dumps(ReviewListSerializer(queryset.select_related('author'), many=True).data),
+        )
+
+    def test_pagination(self):
+        response = self.client.get('/api/reviews/', {'page_size': 2})
+        self.assertEqual(len(response.json()), 2)
+        # Curseur construit à partir des colonnes de la dernière ligne
+        next_url = response['Link'][1:response['Link'].index('>')]
+        self.assertEqual(self.client.get(next_url).json(), [
+            ReviewListSerializer(Review.objects.order_by('created_at', 'id').first()).data
+        ])
@@ -0,0 +1,55 @@
+"""
+Normalisation du texte (casse, accents, espaces) pour la recherche et les clés de films
+"""
+import re
+import unicodedata
+from collections import Counter
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Mots vides français (déjà sans accents) ignorés par l'index de recherche
+STOPWORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il ils je la le les leur lui
+    ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se
+    ses son sur ta te tes toi ton tu un une vos votre vous c d j l m n s t y est sont
+    the of and
+""".split())
+
+MAX_TERM_LENGTH = 64
+
+
+def fold(text):
+    """
+    Minuscules et suppression des accents : "Amélie " -> "amelie "
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def normalize_title(title):
+    """
+    Clé canonique d'un titre : "  Amélie  Poulain " -> "amelie poulain"
+    """
+    return ' '.join(fold(title).split())
+
+
+def tokenize(text):
+    """
+    Découpe un texte en termes normalisés, sans les mots vides
+    """
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(fold(text))
+        if token not in STOPWORDS
+    ]
+
+
+def weighted_terms(fields):
+    """
+    Calcule le poids de chaque terme pour une liste de (texte, poids)
+    """
+    weights = Counter()
+    for text, weight in fields:
+        for token in tokenize(text):
+            weights[token] += weight
+    return weights
@@ -0,0 +1,184 @@
+"""
+Export en flux (NDJSON ou CSV) et import par lots des critiques.
+
+L'export lit la table par morceaux (curseur côté serveur sous PostgreSQL) :
+la mémoire reste constante quelle que soit la taille de la table. L'import
+valide chaque enregistrement puis écrit par lots transactionnels ; la position
+du dernier lot validé permet de reprendre un import interrompu.
+"""
+import csv
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from api import response_cache
+
+from . import aggregates, search
+from .models import Movie, Review
+from .text import normalize_title
+
+User = get_user_model()
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+EXPORT_FIELDS = ['id', 'title', 'content', 'rating', 'author_username', 'created_at', 'updated_at']
+
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Critiques sous forme de dictionnaires, lues par morceaux dans l'ordre des id
+    """
+    return queryset.order_by('id').values(
+        'id', 'title', 'content', 'rating', 'created_at', 'updated_at',
+        author_username=F('author__username'),
+    ).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """
+    Pseudo-fichier qui renvoie la ligne écrite au lieu de la stocker
+    """
+    def write(self, value):
+        return value
+
+
+def export_lines(rows, export_format):
+    """
+    Générateur des lignes d'export au format demandé
+    """
+    if export_format == 'csv':
+        writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_FIELDS)
+        yield writer.writeheader()
+        for row in rows:
+            row['created_at'] = row['created_at'].isoformat()
+            row['updated_at'] = row['updated_at'].isoformat()
+            yield writer.writerow(row)
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(row) + '\n'
+
+
+def read_records(stream, import_format):
+    """
+    Enregistrements d'un fichier d'export (None pour une ligne illisible)
+    """
+    if import_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+class ReviewImportSerializer(serializers.Serializer):
+    """
+    Validation d'une critique importée (l'auteur est désigné par son nom d'utilisateur)
+    """
+    title = serializers.CharField(max_length=200)
+    content = serializers.CharField()
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    author_username = serializers.CharField(max_length=150)
+    created_at = serializers.DateTimeField(required=False)
+
+
+@contextmanager
+def keep_timestamps():
+    """
+    Désactive auto_now_add/auto_now pour conserver les dates fournies
+    (écritures en masse hors requêtes web uniquement)
+    """
+    created_at = Review._meta.get_field('created_at')
+    updated_at = Review._meta.get_field('updated_at')
+    created_at.auto_now_add, updated_at.auto_now = False, False
+    try:
+        yield
+    finally:
+        created_at.auto_now_add, updated_at.auto_now = True, True
+
+
+def import_reviews(records, batch_size=1000, skip=0, on_batch=None):
+    """
+    Valide et importe des critiques par lots transactionnels.
+
+    Les `skip` premiers enregistrements sont ignorés (reprise) ; on_batch(position,
+    résultat) est appelé après chaque lot validé. Retourne {'imported', 'errors'}
+    où errors est une liste de (position, erreurs).
+    """
+    result = {'imported': 0, 'errors': []}
+    batch = []
+    position = skip
+    for position, record in enumerate(records, start=1):
+        if position <= skip:
+            continue
+        if not isinstance(record, dict):
+            result['errors'].append((position, {'non_field_errors': ["Enregistrement illisible."]}))
+            continue
+        serializer = ReviewImportSerializer(data=record)
+        if not serializer.is_valid():
+            result['errors'].append((position, serializer.errors))
+            continue
+        batch.append((position, serializer.validated_data))
+        if len(batch) >= batch_size:
+            _write_batch(batch, result)
+            batch = []
+            if on_batch:
+                on_batch(position, result)
+    if batch:
+        _write_batch(batch, result)
+    if on_batch:
+        on_batch(position, result)
+    return result
+
+
+def _write_batch(batch, result):
+    """
+    Écrit un lot validé : critiques, films, agrégats et index de recherche
+    dans une seule transaction
+    """
+    authors = dict(
+        User.objects.filter(username__in={data['author_username'] for _, data in batch})
+        .values_list('username', 'id')
+    )
+    rows = []
+    for position, data in batch:
+        if data['author_username'] in authors:
+            rows.append(data)
+        else:
+            result['errors'].append((position, {'author_username': ["Utilisateur inconnu."]}))
+    if not rows:
+        return
+
+    now = timezone.now()
+    with transaction.atomic(), keep_timestamps():
+        movies = Movie.objects.resolve_many(data['title'] for data in rows)
+        reviews = Review.objects.bulk_create([
+            Review(
+                title=data['title'],
+                movie=movies[normalize_title(data['title'])],
+                content=data['content'],
+                rating=data['rating'],
+                author_id=authors[data['author_username']],
+                created_at=data.get('created_at', now),
+                updated_at=now,
+            )
+            for data in rows
+        ])
+        # bulk_create ne déclenche pas les signaux
+        aggregates.add_reviews(reviews)
+        search.index_reviews(reviews)
+        response_cache.clear()
+    result['imported'] += len(reviews)
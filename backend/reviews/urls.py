@@ -1,5 +1,13 @@
+from django.conf import settings
 from django.urls import path
-from .views import ReviewListCreateView, ReviewDetailView, review_stats_view, my_reviews_view, movie_reviews_view
+from . import async_views, views
+from .views import ReviewListCreateView, ReviewDetailView, review_search_view, title_suggest_view, review_export_view
+
+# Sous ASGI, les vues de lecture attendent la base sans occuper de thread
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
+movie_reviews_view = read_views.movie_reviews_view
+my_reviews_view = read_views.my_reviews_view
+review_stats_view = read_views.review_stats_view
 
 urlpatterns = [
     # Critiques
@@ -14,4 +22,13 @@ urlpatterns = [
     
     # Statistiques
     path('stats/', review_stats_view, name='review-stats'),
+    
+    # Recherche plein texte
+    path('search/', review_search_view, name='review-search'),
+    
+    # Autocomplétion des titres
+    path('titles/suggest/', title_suggest_view, name='title-suggest'),
+    
+    # Export en flux (NDJSON ou CSV)
+    path('export/', review_export_view, name='review-export'),
 ]
\ No newline at end of file
@@ -1,16 +1,44 @@
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Q, Avg, Count
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from django.db.models import Q, Avg, Count, F, FloatField, Sum
+from django.db.models.functions import Cast
 from django.db import models
-from .models import Review
-from .serializers import ReviewSerializer, ReviewListSerializer
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from api.conditional import conditional_get
+from api.middleware import query_budget
+from api.response_cache import cache_response
+from api.pagination import ReviewCursorPagination
+from users.authentication import TokenClaimsAuthentication
+from . import search, suggest, transfer
+from .models import Review, MovieStats
+from .serializers import ReviewSerializer, ReviewListSerializer, ReviewListValuesSerializer, ReviewSearchResultSerializer
+from .text import normalize_title
 
+# Entités dont dépendent les réponses (cache et ETag, voir api.response_cache)
+def review_list_scopes(request):
+    return ['reviews', 'authors']
+
+def stats_scopes(request):
+    return ['reviews']
+
+def movie_scopes(request, movie_title):
+    return [f'movie:{normalize_title(movie_title)}', 'authors']
+
+def own_reviews_scopes(request, *args, **kwargs):
+    # Chaque écriture d'une critique change la version user:<auteur>
+    return [f'user:{request.user.id}']
+
+@method_decorator(conditional_get(review_list_scopes), name='get')
 class ReviewListCreateView(generics.ListCreateAPIView):
     """
     Vue pour lister et créer des critiques
     """
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ReviewCursorPagination
+    query_budget = 5
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -19,130 +47,247 @@ class ReviewListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         # Récupérer les critiques, avec possibilité de filtrer
-        queryset = Review.objects.all().order_by('-created_at')
+        queryset = Review.objects.select_related('author').order_by('-created_at')
         
         # Filtrer par auteur si spécifié
         author_id = self.request.query_params.get('author_id')
         if author_id:
             queryset = queryset.filter(author_id=author_id)
         
-        # Filtrer par titre si spécifié
+        # Filtrer par recherche plein texte (titre et contenu) si spécifié
         title_search = self.request.query_params.get('search')
         if title_search:
-            queryset = queryset.filter(title__icontains=title_search)
+            queryset = search.filter_reviews(queryset, title_search)
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        # Lecture seule : lignes values_list() plutôt qu'un modèle par critique
+        rows = ReviewListValuesSerializer()
+        page = self.paginate_queryset(rows.values(self.get_queryset()))
+        return self.get_paginated_response(rows.serialize(page))
+    
     def perform_create(self, serializer):
         # L'auteur est automatiquement assigné dans le sérialiseur
         serializer.save()
 
+@method_decorator(conditional_get(own_reviews_scopes), name='get')
 class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Vue pour voir, modifier et supprimer une critique spécifique
     """
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 8
     
     def get_queryset(self):
         # Un utilisateur ne peut voir/modifier que ses propres critiques
-        return Review.objects.filter(author=self.request.user)
+        return Review.objects.filter(author=self.request.user).select_related('author')
 
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@conditional_get(stats_scopes)
+@cache_response(stats_scopes)
 def review_stats_view(request):
     """
     Vue pour obtenir des statistiques détaillées sur les critiques
     """
     try:
-        total_reviews = Review.objects.count()
-        avg_rating = Review.objects.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        
-        # Statistiques par film
-        movie_stats = Review.objects.values('title').annotate(
-            movie_avg_rating=Avg('rating'),
-            movie_review_count=models.Count('id')
-        ).order_by('-movie_avg_rating')
-        
-        # Top films par nombre de critiques
-        top_reviewed = Review.objects.values('title').annotate(
-            review_count=models.Count('id')
-        ).order_by('-review_count')[:5]
-        
-        # Top films par note moyenne
-        top_rated = Review.objects.values('title').annotate(
-            avg_rating=Avg('rating'),
-            review_count=models.Count('id')
-        ).filter(review_count__gte=2).order_by('-avg_rating')[:5]
-        
-        return Response({
-            'total_reviews': total_reviews,
-            'average_rating': round(avg_rating, 1) if avg_rating else 0,
-            'rating_distribution': {
-                '5_stars': Review.objects.filter(rating=5).count(),
-                '4_stars': Review.objects.filter(rating=4).count(),
-                '3_stars': Review.objects.filter(rating=3).count(),
-                '2_stars': Review.objects.filter(rating=2).count(),
-                '1_star': Review.objects.filter(rating=1).count(),
-            },
-            'movie_statistics': {
-                'total_movies': movie_stats.count(),
-                'top_reviewed': list(top_reviewed),
-                'top_rated': list(top_rated)
-            }
-        })
+        return Response(stats_data(stats_totals(), top_reviewed_movies(), top_rated_movies()))
     except Exception as e:
         return Response(
             {'error': 'Erreur lors de la récupération des statistiques'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+# Requêtes indépendantes des statistiques (exécutées en parallèle par la variante asynchrone)
+def stats_totals():
+    # Lecture depuis les agrégats par film (une ligne par film, aucun scan des critiques)
+    return MovieStats.objects.aggregate(
+        total_reviews=Sum('review_count'),
+        rating_sum=Sum('rating_sum'),
+        total_movies=Count('id'),
+        **{f'rating_{n}': Sum(f'rating_{n}') for n in range(1, 6)}
+    )
+
+def top_reviewed_movies():
+    # Top films par nombre de critiques
+    return list(MovieStats.objects.filter(review_count__gt=0).values(
+        'title', 'review_count'
+    ).order_by('-review_count')[:5])
+
+def top_rated_movies():
+    # Top films par note moyenne
+    return list(MovieStats.objects.filter(review_count__gte=2).annotate(
+        avg_rating=Cast('rating_sum', FloatField()) / F('review_count')
+    ).values('title', 'avg_rating', 'review_count').order_by('-avg_rating')[:5])
+
+def stats_data(totals, top_reviewed, top_rated):
+    total_reviews = totals['total_reviews'] or 0
+    avg_rating = totals['rating_sum'] / total_reviews if total_reviews else None
+    return {
+        'total_reviews': total_reviews,
+        'average_rating': round(avg_rating, 1) if avg_rating else 0,
+        'rating_distribution': {
+            '5_stars': totals['rating_5'] or 0,
+            '4_stars': totals['rating_4'] or 0,
+            '3_stars': totals['rating_3'] or 0,
+            '2_stars': totals['rating_2'] or 0,
+            '1_star': totals['rating_1'] or 0,
+        },
+        'movie_statistics': {
+            'total_movies': totals['total_movies'],
+            'top_reviewed': top_reviewed,
+            'top_rated': top_rated
+        }
+    }
+
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@conditional_get(movie_scopes)
+@cache_response(movie_scopes)
 def movie_reviews_view(request, movie_title):
     """
     Vue pour récupérer toutes les critiques d'un film spécifique
     """
     try:
-        # Normaliser le titre du film pour la recherche insensible à la casse
-        normalized_title = movie_title.strip()
-        reviews = Review.objects.filter(title__iexact=normalized_title).order_by('-created_at')
-        
-        if not reviews.exists():
-            return Response({
-                'message': 'Aucune critique trouvée pour ce film',
-                'reviews': []
-            }, status=status.HTTP_200_OK)
-        
-        serializer = ReviewListSerializer(reviews, many=True)
+        stats = movie_stats_queryset(movie_title).first()
+        if not stats or not stats['review_count']:
+            return Response(EMPTY_MOVIE_DATA, status=status.HTTP_200_OK)
         
-        # Calculer les statistiques pour ce film
-        avg_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        
-        return Response({
-            'movie_title': normalized_title,
-            'total_reviews': reviews.count(),
-            'average_rating': round(avg_rating, 1) if avg_rating else 0,
-            'reviews': serializer.data
-        })
+        paginator = ReviewCursorPagination()
+        page = paginator.paginate_queryset(movie_reviews_queryset(stats), request)
+        return Response(movie_data(movie_title, stats, page, paginator))
+    except NotFound:
+        # Curseur invalide
+        raise
     except Exception as e:
         return Response(
             {'error': 'Erreur lors de la récupération des critiques du film'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+EMPTY_MOVIE_DATA = {
+    'message': 'Aucune critique trouvée pour ce film',
+    'reviews': []
+}
+
+def movie_stats_queryset(movie_title):
+    # Statistiques du film lues depuis les agrégats ; le titre est normalisé
+    # (casse, accents, espaces) pour retrouver le film canonique via sa clé unique
+    return MovieStats.objects.filter(movie__key=normalize_title(movie_title)).values(
+        'movie_id', 'review_count', 'rating_sum'
+    )
+
+def movie_reviews_queryset(stats):
+    # Lignes pour ReviewListValuesSerializer
+    return ReviewListValuesSerializer().values(Review.objects.filter(movie_id=stats['movie_id']))
+
+def movie_data(movie_title, stats, page, paginator):
+    total_reviews = stats['review_count']
+    avg_rating = stats['rating_sum'] / total_reviews
+    return {
+        'movie_title': movie_title.strip(),
+        'total_reviews': total_reviews,
+        'average_rating': round(avg_rating, 1) if avg_rating else 0,
+        'reviews': ReviewListValuesSerializer().serialize(page),
+        'next': paginator.get_next_link()
+    }
+
+@query_budget(1)
 @api_view(['GET'])
+@authentication_classes([TokenClaimsAuthentication])
 @permission_classes([permissions.IsAuthenticated])
+@conditional_get(own_reviews_scopes)
 def my_reviews_view(request):
     """
     Vue pour récupérer uniquement les critiques de l'utilisateur connecté
     """
     try:
-        reviews = Review.objects.filter(author=request.user).order_by('-created_at')
-        serializer = ReviewListSerializer(reviews, many=True)
-        return Response(serializer.data)
+        paginator = ReviewCursorPagination()
+        page = paginator.paginate_queryset(my_reviews_queryset(request.user.id), request)
+        return paginator.get_paginated_response(ReviewListValuesSerializer().serialize(page))
+    except NotFound:
+        # Curseur invalide
+        raise
     except Exception as e:
         return Response(
             {'error': 'Erreur lors de la récupération de vos critiques'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+def my_reviews_queryset(user_id):
+    # Lignes pour ReviewListValuesSerializer
+    return ReviewListValuesSerializer().values(Review.objects.filter(author_id=user_id))
+
+@query_budget(2)
+@api_view(['GET'])
+@authentication_classes([TokenClaimsAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def review_search_view(request):
+    """
+    Vue de recherche plein texte dans les titres et contenus des critiques,
+    triée par pertinence
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response(
+            {'error': 'Le paramètre q est requis.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    limit = ReviewCursorPagination().get_page_size(request)
+    reviews = search.search_reviews(Review.objects.select_related('author'), query)[:limit]
+    serializer = ReviewSearchResultSerializer(reviews, many=True)
+    return Response({
+        'query': query,
+        'results': serializer.data
+    })
+
+
+@query_budget(3)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def title_suggest_view(request):
+    """
+    Vue d'autocomplétion des titres de films déjà critiqués
+    """
+    query = request.query_params.get('q', '')
+    try:
+        limit = min(int(request.query_params.get('limit', 10)), 25)
+    except ValueError:
+        limit = 10
+    return Response({
+        'query': query,
+        'suggestions': suggest.suggest(query, limit=max(limit, 1))
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([TokenClaimsAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def review_export_view(request):
+    """
+    Vue d'export en flux des critiques (NDJSON par défaut, ou CSV avec ?type=csv)
+    """
+    export_format = request.query_params.get('type', 'ndjson')
+    if export_format not in transfer.FORMATS:
+        return Response(
+            {'error': f"Format inconnu, formats acceptés : {', '.join(transfer.FORMATS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    reviews = Review.objects.all()
+    author_id = request.query_params.get('author_id')
+    if author_id:
+        reviews = reviews.filter(author_id=author_id)
+
+    response = StreamingHttpResponse(
+        transfer.export_lines(transfer.export_rows(reviews), export_format),
+        content_type=transfer.CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="critiques.{export_format}"'
+    return response
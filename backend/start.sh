@@ -0,0 +1,29 @@
+#!/bin/sh
+# Démarrage du service web (commande de démarrage Render : ./start.sh,
+# répertoire racine backend).
+#
+# Le worker de la file api.jobs (photos de profil, compaction des tokens
+# révoqués) tourne dans le même conteneur que le serveur HTTP : les photos
+# envoyées sont enregistrées sur le disque local du service (MEDIA_ROOT),
+# qu'un service worker séparé ne verrait pas. Il est relancé s'il s'arrête ;
+# ses tâches interrompues sont reprises après JOB_LOCK_TIMEOUT secondes.
+#
+# RUN_JOBS=0 désactive le worker (ex. quand run_jobs tourne ailleurs avec un
+# stockage partagé). ASGI=1 sert l'application avec uvicorn (vues
+# asynchrones, voir config/asgi.py).
+set -e
+cd "$(dirname "$0")"
+
+if [ "${RUN_JOBS:-1}" != "0" ]; then
+    (
+        while true; do
+            python manage.py run_jobs || true
+            sleep 5
+        done
+    ) &
+fi
+
+if [ "${ASGI:-0}" = "1" ]; then
+    exec gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+fi
+exec gunicorn config.wsgi:application
@@ -2,4 +2,9 @@ from django.apps import AppConfig
  
 class UsersConfig(AppConfig): 
     default_auto_field = 'django.db.models.BigAutoField' 
-    name = 'users' 
+    name = 'users'
+
+    def ready(self):
+        from api import metrics
+        from . import hashing, signals  # noqa: F401
+        metrics.register_collector(hashing.metric_samples)
@@ -0,0 +1,229 @@
+"""
+Variantes asynchrones des vues de connexion, d'inscription et de changement
+de mot de passe, pour un déploiement ASGI (réglage ASYNC_AUTH_VIEWS).
+
+DRF n'exécute pas de vues asynchrones : ces vues Django reprennent les mêmes
+validations et formats de réponse que users.views, mais attendent le pool de
+hachage (users.hashing) sans bloquer la boucle d'événements.
+
+Les vues de lecture (liste et fiche des utilisateurs, réglage ASYNC_READ_VIEWS)
+utilisent l'ORM asynchrone (api.async_views).
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, NotFound, Throttled
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import throttling, tracing
+from api.async_views import DataResponse, error_response, read_view
+from api.conditional import conditional_get
+from api.middleware import query_budget
+from api.pagination import UserCursorPagination
+from api.response_cache import cache_response
+from . import hashing
+from .authentication import CachedJWTAuthentication, TokenClaimsAuthentication
+from .serializers import RegisterSerializer, UserListSerializer, UserListValuesSerializer, UserSerializer
+from .views import (
+    CustomTokenObtainPairSerializer,
+    LOGIN_INACTIVE_MESSAGE,
+    LOGIN_INVALID_MESSAGE,
+    LOGIN_REQUIRED_MESSAGE,
+    login_account,
+    user_detail_queryset,
+    user_list_queryset,
+)
+
+User = get_user_model()
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+def _unavailable(exc):
+    response = JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+    response['Retry-After'] = str(exc.wait)
+    return response
+
+
+async def _throttled(scope, request, account=None):
+    """
+    Réponse 429 si un seau de la portée est vide (avant hachage et accès à la base)
+    """
+    identities = {'ip': throttling.client_ip(request), 'account': account}
+    wait = await sync_to_async(throttling.check)(scope, identities)
+    return _unavailable(Throttled(wait)) if wait else None
+
+
+async def _authenticate(request):
+    """
+    Utilisateur du token JWT (même résolution en cache que les vues DRF)
+    """
+    result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    if result is None:
+        raise NotAuthenticated()
+    return result[0]
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    """
+    Connexion par email et mot de passe
+    """
+    data = _request_data(request)
+    email, password = data.get('email'), data.get('password')
+    throttled = await _throttled('login', request, login_account(email))
+    if throttled:
+        return throttled
+    tracing.trace('login.received', data=data)
+    if not email or not password:
+        return JsonResponse({'detail': [LOGIN_REQUIRED_MESSAGE]}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = await User.objects.filter(email=email).afirst()
+    try:
+        is_correct = user is not None and await hashing.acheck_password(user, password)
+    except hashing.HashingUnavailable as e:
+        return _unavailable(e)
+    if not is_correct:
+        tracing.trace('login.failed', user_found=user is not None)
+        return JsonResponse({'detail': [LOGIN_INVALID_MESSAGE]}, status=status.HTTP_400_BAD_REQUEST)
+    if not user.is_active:
+        return JsonResponse({'detail': [LOGIN_INACTIVE_MESSAGE]}, status=status.HTTP_400_BAD_REQUEST)
+
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    tracing.trace('login.succeeded', user_id=user.id)
+    return JsonResponse({
+        'tokens': {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        },
+        'user': UserSerializer(user, context={'request': request}).data,
+    })
+
+
+@csrf_exempt
+@require_POST
+async def register_view(request):
+    """
+    Inscription d'un nouvel utilisateur
+    """
+    throttled = await _throttled('register', request)
+    if throttled:
+        return throttled
+    serializer = RegisterSerializer(data=_request_data(request))
+    if not await sync_to_async(serializer.is_valid)():
+        tracing.trace('register.invalid', errors=serializer.errors)
+        return JsonResponse({
+            'error': 'Validation failed',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        password = await hashing.amake_password(serializer.validated_data['password'])
+    except hashing.HashingUnavailable as e:
+        return _unavailable(e)
+    user = await User.objects.acreate(**serializer.user_fields(serializer.validated_data), password=password)
+    tracing.trace('register.created', user_id=user.id)
+
+    refresh = RefreshToken.for_user(user)
+    return JsonResponse({
+        'user': UserSerializer(user, context={'request': request}).data,
+        'tokens': {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        },
+        'message': 'Inscription réussie !'
+    }, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_POST
+async def change_password_view(request):
+    """
+    Changement du mot de passe de l'utilisateur connecté
+    """
+    throttled = await _throttled('change_password', request, throttling.token_user_id(request))
+    if throttled:
+        return throttled
+    try:
+        user = await _authenticate(request)
+    except (AuthenticationFailed, NotAuthenticated, InvalidToken) as e:
+        detail = e.detail if isinstance(e.detail, dict) else {'detail': str(e.detail)}
+        return JsonResponse(detail, status=e.status_code)
+
+    data = _request_data(request)
+    current_password = data.get('current_password')
+    new_password = data.get('new_password')
+    if not current_password or not new_password:
+        return JsonResponse(
+            {'error': 'Les champs current_password et new_password sont requis.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        # Hachage absent de l'utilisateur en cache (champ différé) : lu en base
+        await user.arefresh_from_db(fields=['password'])
+        if not await hashing.acheck_password(user, current_password):
+            return JsonResponse(
+                {'error': 'Le mot de passe actuel est incorrect.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(new_password) < 6:
+            return JsonResponse(
+                {'error': 'Le nouveau mot de passe doit contenir au moins 6 caractères.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        await hashing.aset_password(user, new_password)
+    except hashing.HashingUnavailable as e:
+        return _unavailable(e)
+
+    # Utilisateur résolu depuis le cache : les autres colonnes peuvent être périmées
+    await user.asave(update_fields=['password'])
+    return JsonResponse({'message': 'Mot de passe modifié avec succès.'})
+
+
+@query_budget(1)
+@read_view(TokenClaimsAuthentication)
+async def user_list_view(request):
+    """
+    Liste des utilisateurs (hors utilisateur connecté)
+    """
+    paginator = UserCursorPagination()
+    rows = UserListValuesSerializer({'request': request})
+    try:
+        page = await paginator.apaginate_queryset(rows.values(user_list_queryset(request.user.id)), request)
+    except NotFound as e:
+        # Curseur invalide
+        return error_response(e)
+    return DataResponse(rows.serialize(page), headers=paginator.get_headers())
+
+
+def user_scopes(request, pk):
+    return [f'user:{pk}']
+
+
+@query_budget(2)
+@read_view()
+@conditional_get(user_scopes)
+@cache_response(user_scopes)
+async def user_detail_view(request, pk):
+    """
+    Fiche publique d'un utilisateur
+    """
+    user = await user_detail_queryset().filter(pk=pk).afirst()
+    if user is None:
+        return error_response(NotFound())
+    return DataResponse(UserListSerializer(user, context={'request': request}).data)
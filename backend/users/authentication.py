@@ -0,0 +1,191 @@
+"""
+Authentification JWT avec résolution de l'utilisateur en cache.
+
+L'utilisateur est cherché dans un cache LRU local au processus, puis dans le
+cache partagé (CACHES['default']), avant la base. Chaque entrée est associée
+au numéro de version du profil, stocké dans le cache partagé et changé à
+chaque modification de l'utilisateur (signaux de users.signals) : une entrée
+dont la version ne correspond plus est ignorée.
+
+Le hachage du mot de passe n'est pas mis en cache : le champ est différé
+(relu en base par la vue qui y accède, ex. changement de mot de passe) et
+seule son empreinte MD5 est gardée pour la vérification REVOKE_TOKEN_CLAIM.
+
+En déploiement multi-processus, CACHES doit pointer vers un cache commun
+(REDIS_URL) pour que l'invalidation soit vue par tous les processus.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api import metrics
+
+from . import revocation
+
+
+def _version_key(user_id):
+    return f'auth:user:{user_id}:version'
+
+
+def _user_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+class LRUCache:
+    """
+    Petit cache LRU thread-safe (clé -> (version, entrée))
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_local = LRUCache(getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024))
+
+lookups = metrics.Counter(
+    'auth_user_cache_requests_total', "Résolutions de l'utilisateur authentifié par niveau atteint",
+    ['result'],
+)
+
+
+def current_version(user_id):
+    """
+    Version courante du profil (créée si le cache partagé l'a perdue)
+    """
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def invalidate_user(user_id):
+    """
+    Change la version du profil : les entrées en cache deviennent obsolètes
+    """
+    cache.set(_version_key(str(user_id)), time.time_ns(), timeout=None)
+
+
+def clear():
+    """
+    Vide le cache local (tests, benchmarks après remise à zéro de la base)
+    """
+    _local.clear()
+
+
+def _cache_entry(user):
+    """
+    (utilisateur sans hachage du mot de passe, empreinte MD5 du hachage)
+    """
+    digest = get_md5_hash_password(user.password)
+    user = copy.copy(user)
+    # Champ différé : relu en base à la première lecture, ignoré par save()
+    del user.__dict__['password']
+    return user, digest
+
+
+def resolve_user(user_id, load):
+    """
+    (utilisateur, empreinte du mot de passe) pour un identifiant : cache
+    local, puis cache partagé, puis load() ; None si l'utilisateur n'existe pas
+    """
+    user_id = str(user_id)
+    version = current_version(user_id)
+    local = _local.get(user_id)
+    if local is not None and local[0] == version:
+        lookups.inc('local')
+        entry = local[1]
+    else:
+        entry = cache.get(_user_key(user_id, version))
+        if entry is None:
+            lookups.inc('database')
+            user = load()
+            if user is None:
+                return None
+            entry = _cache_entry(user)
+            cache.set(_user_key(user_id, version), entry, getattr(settings, 'AUTH_USER_CACHE_TTL', 300))
+        else:
+            lookups.inc('shared')
+        _local.set(user_id, (version, entry))
+    user, digest = entry
+    # Copie : les vues peuvent modifier request.user
+    return copy.copy(user), digest
+
+
+def check_revocation(validated_token):
+    """
+    Refuse un token révoqué par une déconnexion
+    """
+    if revocation.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+        raise InvalidToken(_("Token is blacklisted"))
+    return validated_token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans requête en base quand l'utilisateur est en cache
+    """
+    def get_validated_token(self, raw_token):
+        return check_revocation(super().get_validated_token(raw_token))
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        resolved = resolve_user(user_id, lambda: self.user_model.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).first())
+        if resolved is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user, password_digest = resolved
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
+
+
+class TokenClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authentification par les seules revendications du token (sans accès
+    à la base hors révocation) : request.user ne porte que l'identifiant.
+    Réservée aux vues de lecture qui n'ont besoin que de request.user.id ;
+    un compte désactivé garde l'accès jusqu'à l'expiration de son token.
+    """
+    def get_validated_token(self, raw_token):
+        return check_revocation(super().get_validated_token(raw_token))
@@ -0,0 +1,160 @@
+"""
+Traitement des photos de profil hors du cycle requête/réponse.
+
+La requête d'envoi ne fait qu'enregistrer le fichier reçu
+(profile_pictures/user_<id>/...) et ajouter une tâche à la file api.jobs.
+Le worker le décode, le recadre au carré et produit des variantes de SIZES
+pixels en WebP et JPEG, sans métadonnées (EXIF, GPS, profil ICC). Les
+variantes sont rangées sous l'empreinte SHA-256 du fichier d'origine
+(avatars/<empreinte>/<taille>.<format>) : deux envois identiques partagent
+les mêmes fichiers, et une photo déjà traitée n'est pas redécodée. Le
+fichier d'origine est ensuite supprimé et CustomUser.avatar_hash pointe vers
+les variantes. Les photos antérieures à ce traitement sont reprises par la
+commande process_avatars.
+"""
+import hashlib
+import io
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from api import jobs
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+AVATAR_DIR = 'avatars'
+SIZES = (64, 256, 512)
+# Extension -> (format Pillow, options d'encodage)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+class InvalidImage(Exception):
+    """
+    Fichier envoyé impossible à décoder (pas de nouvelle tentative)
+    """
+
+
+def variant_name(digest, size, ext):
+    return f'{AVATAR_DIR}/{digest[:2]}/{digest}/{size}.{ext}'
+
+
+def variant_url(digest, size, ext='jpeg', request=None):
+    """
+    URL d'une variante (absolue avec `request`), None sans photo traitée
+    """
+    if not digest:
+        return None
+    url = default_storage.url(variant_name(digest, size, ext))
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def variant_urls(digest, request=None):
+    """
+    URL de toutes les variantes : {'64': {'webp': ..., 'jpeg': ...}, ...}
+    """
+    if not digest:
+        return None
+    return {
+        str(size): {ext: variant_url(digest, size, ext, request) for ext in FORMATS}
+        for size in SIZES
+    }
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_variants(file):
+    """
+    Variantes encodées d'une image : {(taille, format): octets}
+    """
+    try:
+        with Image.open(file) as original:
+            # Orientation EXIF appliquée aux pixels, l'EXIF lui-même n'est pas recopié
+            image = ImageOps.exif_transpose(original)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                # Transparence aplatie sur fond blanc (JPEG n'a pas de canal alpha)
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        raise InvalidImage(str(e)) from e
+
+    variants = {}
+    for size in SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        for ext, (image_format, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, image_format, **options)
+            variants[(size, ext)] = buffer.getvalue()
+    return variants
+
+
+def store_variants(file):
+    """
+    Empreinte du fichier ; les variantes ne sont produites que si elles manquent
+    """
+    digest = content_hash(file)
+    names = {(size, ext): variant_name(digest, size, ext) for size in SIZES for ext in FORMATS}
+    if all(default_storage.exists(name) for name in names.values()):
+        return digest
+    file.seek(0)
+    for key, data in render_variants(file).items():
+        if not default_storage.exists(names[key]):
+            default_storage.save(names[key], ContentFile(data))
+    return digest
+
+
+def process(user_id):
+    """
+    Traite la photo en attente d'un utilisateur (sans effet s'il n'y en a pas)
+    """
+    user = User.objects.filter(pk=user_id).only('profile_picture').first()
+    if user is None or not user.profile_picture:
+        return
+    original = user.profile_picture.name
+    try:
+        with user.profile_picture.open('rb') as file:
+            digest = store_variants(file)
+    except FileNotFoundError:
+        logger.warning("Photo de profil introuvable pour l'utilisateur %s : %s", user_id, original)
+        digest = None
+    except InvalidImage:
+        logger.warning("Photo de profil illisible pour l'utilisateur %s : %s", user_id, original, exc_info=True)
+        digest = None
+
+    with transaction.atomic():
+        user = User.objects.select_for_update().get(pk=user_id)
+        if user.profile_picture.name != original:
+            # Nouvel envoi entre-temps : il sera traité à son tour
+            return
+        user.profile_picture = None
+        update_fields = ['profile_picture']
+        if digest is not None:
+            user.avatar_hash = digest
+            update_fields.append('avatar_hash')
+        # Signal post_save : caches de l'utilisateur et des réponses invalidés
+        user.save(update_fields=update_fields)
+    default_storage.delete(original)
+
+
+def schedule(user):
+    """
+    Traite la photo envoyée en arrière-plan (une tâche en attente par utilisateur)
+    """
+    jobs.enqueue('users.process_avatar', {'user_id': user.pk}, dedup_key=f'avatar:{user.pk}')
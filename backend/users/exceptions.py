@@ -2,7 +2,6 @@ from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +24,6 @@ def custom_exception_handler(exc, context):
     if hasattr(response, 'content_type'):
         response['Content-Type'] = 'application/json'
     
-    # S'assurer que les données sont sérialisables en JSON
-    if hasattr(response, 'data'):
-        try:
-            # Tester si les données sont déjà JSON-serialisables
-            json.dumps(response.data)
-        except (TypeError, ValueError) as e:
-            logger.error(f"Données non-JSON-serialisables: {response.data}, erreur: {e}")
-            response.data = {
-                'error': 'Erreur de format de réponse',
-                'detail': 'Les données ne peuvent pas être sérialisées en JSON'
-            }
-    
+    # La sérialisabilité des données est vérifiée au rendu, en un seul encodage
+    # (api.renderers.ORJSONRenderer remplace une réponse d'erreur non encodable)
     return response
@@ -0,0 +1,182 @@
+"""
+Hachage des mots de passe sur un pool de threads borné.
+
+PBKDF2 est volontairement coûteux : exécuté directement dans le worker, une
+rafale de connexions bloque tous les autres endpoints. Les calculs passent
+par un pool de PASSWORD_HASH_WORKERS threads précédé d'une file d'admission
+de PASSWORD_HASH_QUEUE_SIZE places ; au-delà, la requête échoue aussitôt
+en 503 au lieu de s'empiler. Les vues asynchrones attendent le résultat
+sans bloquer la boucle d'événements.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.metrics import COUNTER, GAUGE
+
+
+class HashingUnavailable(APIException):
+    """
+    File d'attente du hachage pleine
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Service d'authentification saturé, réessayez dans un instant."
+    default_code = 'hashing_unavailable'
+    # Repris par le gestionnaire d'exceptions DRF dans l'en-tête Retry-After
+    wait = 1
+
+
+class PasswordHashingPool:
+    """
+    Pool borné avec admission non bloquante et métriques (file, latence)
+    """
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def submit(self, func, *args):
+        """
+        Soumet un calcul ; lève HashingUnavailable si toutes les places sont prises
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise HashingUnavailable()
+        with self.lock:
+            self.in_flight += 1
+
+        def run():
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self.lock:
+                    self.in_flight -= 1
+                    self.completed += 1
+                    self.total_seconds += elapsed
+                    self.max_seconds = max(self.max_seconds, elapsed)
+                self.slots.release()
+
+        try:
+            return self.executor.submit(run)
+        except RuntimeError:
+            with self.lock:
+                self.in_flight -= 1
+            self.slots.release()
+            raise
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - self.workers),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_ms': round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                'max_ms': round(self.max_seconds * 1000, 2),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHashingPool(
+                getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 2,
+                getattr(settings, 'PASSWORD_HASH_QUEUE_SIZE', 16),
+            )
+        return _pool
+
+
+def set_pool(pool):
+    """
+    Remplace le pool (tests) ; None revient au pool configuré
+    """
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+def stats():
+    return get_pool().stats()
+
+
+def metric_samples():
+    """
+    Saturation du pool de hachage (in_flight proche de capacity : refus en 503)
+    """
+    pool = stats()
+    yield 'password_hashing_in_flight', GAUGE, "Hachages en cours ou en attente", {}, pool['in_flight']
+    yield 'password_hashing_capacity', GAUGE, "Hachages admis au plus (threads et file)", {}, pool['capacity']
+    yield 'password_hashing_completed_total', COUNTER, "Hachages terminés", {}, pool['completed']
+    yield 'password_hashing_rejected_total', COUNTER, "Hachages refusés (file pleine)", {}, pool['rejected']
+
+
+def _upgrade(user, raw_password):
+    # Même logique que AbstractBaseUser.check_password : hachage mis à niveau
+    # sans être considéré comme un changement de mot de passe
+    user.password = make_password(raw_password)
+    user.save(update_fields=['password'])
+
+
+def check_password(user, raw_password):
+    """
+    Équivalent de user.check_password() exécuté dans le pool
+    """
+    is_correct, must_update = get_pool().submit(hashers.verify_password, raw_password, user.password).result()
+    if is_correct and must_update:
+        _upgrade(user, raw_password)
+    return is_correct
+
+
+def make_password(raw_password):
+    """
+    Équivalent de django.contrib.auth.hashers.make_password exécuté dans le pool
+    """
+    return get_pool().submit(hashers.make_password, raw_password).result()
+
+
+def set_password(user, raw_password):
+    user.password = make_password(raw_password)
+    user._password = raw_password
+
+
+async def acheck_password(user, raw_password):
+    is_correct, must_update = await asyncio.wrap_future(
+        get_pool().submit(hashers.verify_password, raw_password, user.password)
+    )
+    if is_correct and must_update:
+        user.password = await amake_password(raw_password)
+        await user.asave(update_fields=['password'])
+    return is_correct
+
+
+async def amake_password(raw_password):
+    return await asyncio.wrap_future(get_pool().submit(hashers.make_password, raw_password))
+
+
+async def aset_password(user, raw_password):
+    user.password = await amake_password(raw_password)
+    user._password = raw_password
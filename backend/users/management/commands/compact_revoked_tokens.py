@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users import revocation
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les révocations de tokens expirés et republie le filtre "
+        "(exécuté toutes les heures par le worker run_jobs, tâche users.compact_revoked_tokens)"
+    )
+
+    def handle(self, *args, **options):
+        deleted = revocation.compact()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} révocations expirées supprimées"))
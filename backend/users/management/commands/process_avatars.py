@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from users import avatars
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Traite les photos de profil en attente (envois interrompus par un "
+        "redémarrage, photos antérieures aux variantes)"
+    )
+
+    def handle(self, *args, **options):
+        pending = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        count = 0
+        for user_id in pending.values_list('id', flat=True).iterator():
+            avatars.process(user_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} photos de profil traitées"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users import revocation
+from users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit le filtre de révocation des tokens et le publie dans le cache "
+        "partagé (à lancer au démarrage, avant les workers)"
+    )
+
+    def handle(self, *args, **options):
+        revocation.publish()
+        self.stdout.write(self.style.SUCCESS(
+            f"Filtre publié ({RevokedToken.objects.count()} tokens révoqués)"
+        ))
@@ -10,9 +10,27 @@ class CustomUser(AbstractUser):
     email = models.EmailField(unique=True) 
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to=user_profile_picture_path, blank=True, null=True)
+    # Empreinte SHA-256 de la photo traitée (variantes dans users.avatars)
+    avatar_hash = models.CharField(max_length=64, blank=True, default='')
     
     USERNAME_FIELD = 'email' 
     REQUIRED_FIELDS = ['username']
     
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """
+    Token JWT révoqué (déconnexion), conservé jusqu'à son expiration
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Token révoqué"
+        verbose_name_plural = "Tokens révoqués"
+
+    def __str__(self):
+        return self.jti
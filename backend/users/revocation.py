@@ -0,0 +1,200 @@
+"""
+Révocation des tokens JWT (déconnexion).
+
+Les identifiants (jti) révoqués sont enregistrés dans RevokedToken jusqu'à
+l'expiration du token. Chaque processus garde un filtre de Bloom en mémoire :
+un jti absent du filtre n'est pas révoqué (aucun accès à la base) ; un jti
+présent est confirmé en base (faux positifs possibles).
+
+Synchronisation entre processus via le cache partagé :
+- `generation` change à chaque révocation : les processus relisent alors les
+  révocations récentes ;
+- `epoch` change à chaque reconstruction (compaction, commande de démarrage) :
+  les processus rechargent l'instantané du filtre publié dans le cache.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+EPOCH_KEY = 'revocation:epoch'
+GENERATION_KEY = 'revocation:generation'
+SNAPSHOT_KEY = 'revocation:snapshot'
+
+# Marge de relecture : une révocation validée tardivement reste vue
+SYNC_MARGIN = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom (double hachage sur un condensat blake2b)
+    """
+    def __init__(self, size, hashes, bits=None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _new_filter(bits=None):
+    return BloomFilter(
+        getattr(settings, 'REVOCATION_FILTER_BITS', 1 << 22),
+        getattr(settings, 'REVOCATION_FILTER_HASHES', 7),
+        bits,
+    )
+
+
+def _build():
+    """
+    Filtre construit à partir des révocations non expirées
+    """
+    synced_at = timezone.now()
+    bloom = _new_filter()
+    jtis = RevokedToken.objects.filter(expires_at__gte=synced_at).values_list('jti', flat=True)
+    for jti in jtis.iterator(chunk_size=5000):
+        bloom.add(jti)
+    return bloom, synced_at
+
+
+def publish():
+    """
+    Reconstruit le filtre et publie son instantané dans le cache partagé
+    (nouvelle époque : tous les processus le rechargent)
+    """
+    generation = cache.get(GENERATION_KEY)
+    bloom, synced_at = _build()
+    epoch = uuid.uuid4().hex
+    cache.set(SNAPSHOT_KEY, (epoch, synced_at, bytes(bloom.bits)), timeout=None)
+    cache.set(EPOCH_KEY, epoch, timeout=None)
+    _local.install(bloom, epoch, synced_at, generation)
+    return epoch
+
+
+class _LocalFilter:
+    """
+    Filtre du processus, tenu à jour depuis le cache partagé au plus
+    toutes les REVOCATION_SYNC_INTERVAL secondes
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.epoch = None
+        self.generation = None
+        self.synced_at = None
+        self.checked_at = 0.0
+
+    def install(self, bloom, epoch, synced_at, generation):
+        with self.lock:
+            self.bloom, self.epoch, self.synced_at = bloom, epoch, synced_at
+            self.generation = generation
+            self.checked_at = time.monotonic()
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+            self.epoch = self.generation = self.synced_at = None
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.bloom is not None and now - self.checked_at < getattr(settings, 'REVOCATION_SYNC_INTERVAL', 1.0):
+            return
+        state = cache.get_many([EPOCH_KEY, GENERATION_KEY])
+        epoch, generation = state.get(EPOCH_KEY), state.get(GENERATION_KEY)
+        if epoch is None:
+            # Cache partagé vide (démarrage, éviction) : republier
+            publish()
+            epoch = cache.get(EPOCH_KEY)
+        with self.lock:
+            if self.bloom is None or epoch != self.epoch:
+                self._load(epoch)
+                self._sync()
+            elif generation != self.generation:
+                self._sync()
+            self.generation = generation
+            self.checked_at = now
+
+    def _load(self, epoch):
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is not None and snapshot[0] == epoch:
+            self.epoch, self.synced_at, bits = snapshot
+            self.bloom = _new_filter(bits)
+        else:
+            self.bloom, self.synced_at = _build()
+            self.epoch = epoch
+
+    def _sync(self):
+        synced_at = timezone.now()
+        recent = RevokedToken.objects.filter(revoked_at__gte=self.synced_at - SYNC_MARGIN)
+        for jti in recent.values_list('jti', flat=True):
+            self.bloom.add(jti)
+        self.synced_at = synced_at
+
+    def __contains__(self, jti):
+        self.refresh()
+        return jti in self.bloom
+
+
+_local = _LocalFilter()
+
+
+def _bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def revoke(token):
+    """
+    Révoque un token (RefreshToken ou AccessToken) jusqu'à son expiration
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    _local.add(jti)
+    # Les autres processus relisent les révocations une fois la ligne visible
+    transaction.on_commit(_bump_generation)
+
+
+def is_revoked(jti):
+    """
+    Un jti absent du filtre n'est pas révoqué (cas courant, sans accès à la base)
+    """
+    if jti is None or jti not in _local:
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def compact():
+    """
+    Supprime les révocations de tokens expirés puis republie le filtre
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    publish()
+    return deleted
@@ -4,6 +4,9 @@ from django.contrib.auth.password_validation import validate_password
 from django.urls import reverse
 from django.conf import settings
 
+from api.serializers import ValuesSerializer
+from . import avatars, hashing
+
 User = get_user_model()
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -28,26 +31,61 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        # Remove password2 from validated_data
-        validated_data.pop('password2')
-        
-        user = User.objects.create(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            bio=validated_data.get('bio', '')
+        # Mot de passe haché (pool borné) avant l'insertion : une seule écriture
+        return User.objects.create(
+            **self.user_fields(validated_data),
+            password=hashing.make_password(validated_data['password'])
         )
-        user.set_password(validated_data['password'])
-        user.save()
-        return user
+    
+    @staticmethod
+    def user_fields(validated_data):
+        """
+        Champs du nouvel utilisateur, hors mot de passe
+        """
+        return {
+            'username': User.normalize_username(validated_data['username']),
+            'email': User.objects.normalize_email(validated_data['email']),
+            'bio': validated_data.get('bio', ''),
+        }
+
+class AvatarField(serializers.Field):
+    """
+    URL d'une variante de la photo de profil (users.avatars), None sans photo
+    """
+    def __init__(self, size, ext='jpeg', **kwargs):
+        self.size = size
+        self.ext = ext
+        kwargs.setdefault('source', 'avatar_hash')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return avatars.variant_url(value, self.size, self.ext, self.context.get('request'))
+
+class AvatarVariantsField(serializers.Field):
+    """
+    URL de toutes les variantes (tailles et formats), pour srcset et <picture>
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'avatar_hash')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return avatars.variant_urls(value, self.context.get('request'))
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_picture = AvatarField(512)
+    avatar = AvatarVariantsField()
+    
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'bio', 'profile_picture', 'date_joined']
+        fields = ['id', 'username', 'email', 'bio', 'profile_picture', 'avatar', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
-    profile_picture = serializers.ImageField(required=False, allow_null=True)
+    # Photo d'origine, traitée en arrière-plan (users.avatars)
+    profile_picture = serializers.ImageField(required=False, allow_null=True, write_only=True)
     
     class Meta:
         model = User
@@ -59,22 +97,37 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Ce pseudo est déjà utilisé.")
         return value
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Forcer profile_picture à null pour éviter les erreurs 404
-        # Render.com ne conserve pas les fichiers uploadés
-        data['profile_picture'] = None
-        return data
+    def update(self, instance, validated_data):
+        if 'profile_picture' in validated_data and validated_data['profile_picture'] is None:
+            # Suppression de la photo
+            instance.avatar_hash = ''
+        instance = super().update(instance, validated_data)
+        if validated_data.get('profile_picture'):
+            avatars.schedule(instance)
+        return instance
 
 class UserListSerializer(serializers.ModelSerializer):
+    # Avatars affichés en 100 à 120 px (256 px pour les écrans haute densité)
+    profile_picture = AvatarField(256)
+    avatar = AvatarVariantsField()
     reviews_count = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ['id', 'username', 'bio', 'profile_picture', 'date_joined', 'reviews_count']
+        fields = ['id', 'username', 'bio', 'profile_picture', 'avatar', 'date_joined', 'reviews_count']
         read_only_fields = fields
     
     def get_reviews_count(self, obj):
-        # Compter le nombre de critiques de l'utilisateur
+        # Utiliser l'annotation du queryset (Count('reviews')) si présente
+        reviews_count = getattr(obj, 'reviews_count', None)
+        if reviews_count is not None:
+            return reviews_count
         from reviews.models import Review
-        return Review.objects.filter(author=obj).count()
\ No newline at end of file
+        return Review.objects.filter(author=obj).count()
+
+class UserListValuesSerializer(ValuesSerializer):
+    """
+    UserListSerializer sur des lignes values_list() annotées de reviews_count
+    """
+    serializer_class = UserListSerializer
+    method_fields = {'reviews_count': 'reviews_count'}
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api import response_cache
+
+from .authentication import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    Invalide l'utilisateur en cache (profil, mot de passe, admin...)
+    """
+    invalidate_user(instance.pk)
+    # Une requête concurrente a pu remettre en cache l'ancienne version avant la validation
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+    # Réponses en cache : fiche de l'utilisateur et, si son nom a pu changer,
+    # pages listant ses critiques (une connexion ne met à jour que last_login)
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('created') or (update_fields is not None and 'username' not in update_fields):
+        response_cache.bump(f'user:{instance.pk}')
+    else:
+        response_cache.bump(f'user:{instance.pk}', 'authors')
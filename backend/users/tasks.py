@@ -0,0 +1,18 @@
+"""
+Tâches d'arrière-plan des utilisateurs (file api.jobs)
+"""
+from datetime import timedelta
+
+from api import jobs
+
+from . import avatars, revocation
+
+
+@jobs.register('users.process_avatar', priority=10, max_attempts=3)
+def process_avatar(user_id):
+    avatars.process(user_id)
+
+
+@jobs.register('users.compact_revoked_tokens', priority=-10, every=timedelta(hours=1))
+def compact_revoked_tokens():
+    revocation.compact()
@@ -1,3 +1,455 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import pickle
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api import jobs, renderers
+from reviews.models import Movie, Review
+
+from . import async_views, authentication, avatars, hashing, revocation
+from .models import RevokedToken
+from .serializers import UserListSerializer, UserListValuesSerializer
+from .views import user_list_queryset
+
+User = get_user_model()
+
+
+class UserQueryCountTests(TestCase):
+    """
+    Le nombre de requêtes SQL par endpoint ne doit pas dépendre du nombre d'utilisateurs
+    """
+    sizes = (10, 100, 1000)
+
+    def setUp(self):
+        self.user = User.objects.create(username='moi', email='moi@example.com')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def grow_to(self, size):
+        start = User.objects.count()
+        users = User.objects.bulk_create(
+            User(username=f'user{start + i}', email=f'user{start + i}@example.com')
+            for i in range(size - start)
+        )
+        movie = Movie.objects.resolve('Inception')
+        Review.objects.bulk_create(
+            Review(title='Inception', movie=movie, content='Critique', rating=3, author=user)
+            for user in users
+        )
+
+    def test_user_list(self):
+        for size in self.sizes:
+            self.grow_to(size)
+            with self.subTest(size=size), self.assertNumQueries(1):
+                response = self.client.get('/api/users/', {'page_size': size})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(all(user['reviews_count'] == 1 for user in response.json()))
+
+    def test_user_detail(self):
+        for size in self.sizes:
+            self.grow_to(size)
+            other = User.objects.exclude(pk=self.user.pk).last()
+            with self.subTest(size=size), self.assertNumQueries(1):
+                response = self.client.get(f'/api/users/{other.pk}/')
+            self.assertEqual(response.json()['reviews_count'], 1)
+
+    def test_values_serializer_byte_identical(self):
+        self.grow_to(10)
+        User.objects.filter(username='user3').update(avatar_hash='ab' * 32)
+        context = {'request': RequestFactory(HTTP_HOST='localhost').get('/api/users/')}
+        queryset = user_list_queryset(self.user.id)
+        rows = UserListValuesSerializer(context)
+        self.assertEqual(
+            renderers.dumps(rows.serialize(rows.values(queryset))),
+            renderers.dumps(UserListSerializer(queryset, many=True, context=context).data),
+        )
+
+
+class UserPaginationTests(TestCase):
+    """
+    Pagination par curseur de la liste des utilisateurs (en-tête Link)
+    """
+    def setUp(self):
+        self.user = User.objects.create(username='moi', email='moi@example.com')
+        # Noms en double : l'ordre se départage par l'id
+        for i in range(5):
+            User.objects.create(username=f'membre{i % 2}-{i}', email=f'membre{i}@example.com')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+        self.factory = RequestFactory(HTTP_HOST='localhost')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def next_link(self, response):
+        link = response.get('Link')
+        return link[1:link.index('>')] if link else None
+
+    def test_pages_follow_stable_order(self):
+        ids = []
+        url = '/api/users/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json()), 2)
+            ids += [user['id'] for user in response.json()]
+            url = self.next_link(response)
+        expected = User.objects.exclude(pk=self.user.pk).order_by('username', 'id')
+        self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+
+    def test_cursor_is_opaque(self):
+        link = self.next_link(self.client.get('/api/users/', {'page_size': 2}))
+        cursor = link.split('cursor=')[1].split('&')[0]
+        self.assertNotIn('membre', cursor)
+        self.assertNotIn('username', cursor)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/users/', {'cursor': 'pas-un-curseur'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['detail'], 'Curseur invalide.')
+
+        request = self.factory.get('/api/users/', {'cursor': 'pas-un-curseur'}, **self.auth)
+        response = async_to_sync(async_views.user_list_view)(request)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(PAGINATION_PAGE_SIZE=2, PAGINATION_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.client.get('/api/users/').json()), 2)
+        self.assertEqual(len(self.client.get('/api/users/', {'page_size': 1000}).json()), 3)
+
+
+class CachedAuthenticationTests(TestCase):
+    """
+    L'utilisateur d'un token JWT est résolu depuis le cache, invalidé à chaque modification
+    """
+    def setUp(self):
+        authentication.clear()
+        # Filtre de révocation chargé, comme après rebuild_revocation_filter au démarrage
+        revocation.publish()
+        self.user = User.objects.create_user(username='moi', email='moi@example.com', password='secret-123')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_user_resolved_from_cache(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/profile/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/profile/')
+        self.assertEqual(response.json()['email'], 'moi@example.com')
+
+        # Cache local vidé : le cache partagé évite encore la base
+        authentication.clear()
+        with self.assertNumQueries(0):
+            self.client.get('/api/profile/')
+
+    def test_invalidated_on_change(self):
+        self.client.get('/api/profile/')
+        self.client.patch('/api/profile/', {'bio': 'Cinéphile'}, format='json')
+        self.assertEqual(self.client.get('/api/profile/').json()['bio'], 'Cinéphile')
+
+        User.objects.get(pk=self.user.pk).save()
+        with self.assertNumQueries(1):
+            self.client.get('/api/profile/')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+
+    def test_password_change_keeps_concurrent_updates(self):
+        cache.clear()
+        data = {'current_password': 'secret-123', 'new_password': 'nouveau-456'}
+        change = [
+            lambda: self.client.post('/api/profile/change-password/', data, format='json'),
+            lambda: async_to_sync(async_views.change_password_view)(RequestFactory(HTTP_HOST='localhost').post(
+                '/api/profile/change-password/', {'current_password': 'nouveau-456', 'new_password': 'secret-123'},
+                content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            )),
+        ]
+        for i, view in enumerate(change):
+            self.client.get('/api/profile/')
+            # Écriture sans signal pendant que l'utilisateur est en cache (ex. tâche des photos)
+            User.objects.filter(pk=self.user.pk).update(avatar_hash=str(i) * 64)
+            self.assertEqual(view().status_code, 200)
+            self.assertEqual(User.objects.get(pk=self.user.pk).avatar_hash, str(i) * 64)
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('secret-123'))
+
+    def test_password_hash_not_cached(self):
+        cache.clear()
+        self.client.get('/api/profile/')
+        version = authentication.current_version(str(self.user.pk))
+        user, digest = cache.get(authentication._user_key(str(self.user.pk), version))
+        self.assertNotIn('password', user.__dict__)
+        self.assertNotIn(self.user.password, pickle.dumps(user).decode('latin-1'))
+        self.assertEqual(digest, get_md5_hash_password(self.user.password))
+
+        # Modification du profil depuis l'utilisateur en cache : le mot de passe est conservé
+        self.assertEqual(self.client.patch('/api/profile/', {'bio': 'Cinéphile'}, format='json').status_code, 200)
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('secret-123'))
+
+    # override_settings remplace l'objet api_settings de simplejwt, déjà importé ailleurs
+    @patch.object(authentication.api_settings, 'CHECK_REVOKE_TOKEN', True)
+    def test_revoke_token_claim_checked_from_cache(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.get('/api/profile/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+
+        self.user.set_password('nouveau-456')
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+
+    def test_claims_only_views(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/reviews/my-reviews/')
+        self.assertEqual(response.status_code, 200)
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='moi', email='moi@example.com', password='secret-123')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.pool = hashing.PasswordHashingPool(workers=1, queue_size=0)
+        hashing.set_pool(self.pool)
+        self.addCleanup(hashing.set_pool, None)
+
+    def login(self):
+        return self.client.post('/api/login/', {'email': 'moi@example.com', 'password': 'secret-123'}, format='json')
+
+    def test_saturated_pool_fails_fast(self):
+        release = threading.Event()
+        busy = self.pool.submit(release.wait)
+        try:
+            response = self.login()
+        finally:
+            release.set()
+            busy.result()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+        self.assertEqual(self.login().status_code, 200)
+        stats = self.pool.stats()
+        self.assertEqual((stats['rejected'], stats['completed'], stats['in_flight']), (1, 2, 0))
+
+    def test_async_views(self):
+        factory = RequestFactory(HTTP_HOST='localhost')
+        request = factory.post('/api/login/', {'email': 'moi@example.com', 'password': 'secret-123'},
+                               content_type='application/json')
+        response = async_to_sync(async_views.login_view)(request)
+        self.assertEqual(response.status_code, 200)
+        access = json.loads(response.content)['tokens']['access']
+
+        request = factory.post('/api/profile/change-password/',
+                               {'current_password': 'secret-123', 'new_password': 'nouveau-456'},
+                               content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = async_to_sync(async_views.change_password_view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('nouveau-456'))
+
+    def test_stats_require_admin(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/auth/hashing-stats/').status_code, 403)
+        self.user.is_staff = True
+        self.assertEqual(self.client.get('/api/auth/hashing-stats/').json()['workers'], 1)
+
+
+@override_settings(AUTH_THROTTLE_RATES={
+    'login': {'ip': (2, 1), 'account': (2, 1)},
+    'register': {'ip': (1, 1)},
+    'change_password': {'ip': (5, 1), 'account': (1, 1)},
+})
+class AuthThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='moi', email='moi@example.com', password='secret-123')
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def login(self, email='moi@example.com', address='10.0.0.1'):
+        return self.client.post('/api/login/', {'email': email, 'password': 'faux'}, format='json',
+                                REMOTE_ADDR=address)
+
+    def test_login_buckets_per_account_and_address(self):
+        self.assertEqual(self.login().status_code, 400)
+        # Casse et espaces ignorés : même compte
+        self.assertEqual(self.login(' MOI@example.com', address='10.0.0.2').status_code, 400)
+        response = self.login(address='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+        self.assertEqual(self.login('autre@example.com').status_code, 400)
+        self.assertEqual(self.login('encore@example.com').status_code, 429)
+
+    def test_rejected_before_hashing_and_queries(self):
+        self.login()
+        self.login()
+        with patch.object(hashing, 'check_password') as check, self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        check.assert_not_called()
+
+        access = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        data = {'current_password': 'faux', 'new_password': 'nouveau-456'}
+        self.assertEqual(self.client.post('/api/profile/change-password/', data, format='json').status_code, 400)
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/profile/change-password/', data, format='json')
+        self.assertEqual(response.status_code, 429)
+
+    def test_async_views(self):
+        factory = RequestFactory(HTTP_HOST='localhost')
+        data = {'username': 'nouveau', 'email': 'nouveau@example.com', 'password': 'secret-123',
+                'password2': 'secret-123'}
+        request = factory.post('/api/register/', data, content_type='application/json')
+        self.assertEqual(async_to_sync(async_views.register_view)(request).status_code, 201)
+        with self.assertNumQueries(0):
+            response = async_to_sync(async_views.register_view)(request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+        self.login()
+        self.login()
+        request = factory.post('/api/login/', {'email': 'moi@example.com', 'password': 'secret-123'},
+                               content_type='application/json', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(async_to_sync(async_views.login_view)(request).status_code, 429)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        revocation.publish()
+        self.user = User.objects.create_user(username='moi', email='moi@example.com', password='secret-123')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def test_logout_revokes_tokens(self):
+        other = RefreshToken.for_user(self.user)
+        response = self.client.post('/api/logout/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 205)
+
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        # Les autres sessions restent valides ; le cas courant ne touche pas la base
+        client = APIClient(HTTP_HOST='localhost')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {other.access_token}')
+        client.get('/api/profile/')
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/profile/').status_code, 200)
+        response = client.post('/api/token/refresh/', {'refresh': str(other)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_compaction_purges_expired_entries(self):
+        revocation.revoke(self.refresh)
+        RevokedToken.objects.create(jti='ancien', expires_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(revocation.compact(), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), [self.refresh['jti']])
+        self.assertTrue(revocation.is_revoked(self.refresh['jti']))
+        self.assertFalse(revocation.is_revoked('ancien'))
+
+    def test_bloom_filter(self):
+        bloom = revocation.BloomFilter(size=1 << 16, hashes=7)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'autre-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 100)
+
+
+class AvatarTests(TestCase):
+    """
+    Photos de profil : variantes redimensionnées sans métadonnées, dédupliquées par empreinte
+    """
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(username='moi', email='moi@example.com')
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+        image = Image.new('RGB', (1200, 800), (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x010F] = 'Appareil'  # Make
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', exif=exif, quality=95)
+        self.photo = buffer.getvalue()
+
+    def upload(self, client):
+        response = client.patch('/api/profile/', {
+            'profile_picture': SimpleUploadedFile('photo.jpg', self.photo, content_type='image/jpeg'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        jobs.Worker().run(burst=True)
+        return response
+
+    def test_variants(self):
+        self.upload(self.client)
+        self.user.refresh_from_db()
+        digest = hashlib.sha256(self.photo).hexdigest()
+        self.assertEqual(self.user.avatar_hash, digest)
+        # Fichier d'origine supprimé après traitement
+        self.assertFalse(self.user.profile_picture)
+        self.assertEqual(default_storage.listdir('profile_pictures/user_%s' % self.user.pk)[1], [])
+
+        for size in avatars.SIZES:
+            for ext in avatars.FORMATS:
+                with default_storage.open(avatars.variant_name(digest, size, ext)) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.size, (size, size))
+                    self.assertFalse(image.getexif())
+        self.assertLess(default_storage.size(avatars.variant_name(digest, 256, 'webp')) * 10, len(self.photo))
+
+        data = self.client.get(f'/api/users/{self.user.pk}/').json()
+        self.assertEqual(data['profile_picture'], 'http://localhost' + avatars.variant_url(digest, 256))
+        self.assertTrue(data['avatar']['64']['webp'].endswith(f'{digest}/64.webp'))
+        self.assertTrue(self.client.get('/api/profile/').json()['profile_picture'].endswith('/512.jpeg'))
+
+    def test_duplicate_upload_shares_variants(self):
+        self.upload(self.client)
+        other = User.objects.create(username='autre', email='autre@example.com')
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(other)
+        with patch.object(avatars, 'render_variants') as render:
+            self.upload(client)
+        render.assert_not_called()
+        other.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(other.avatar_hash, self.user.avatar_hash)
+
+    def test_pending_and_removed(self):
+        User.objects.filter(pk=self.user.pk).update(profile_picture='profile_pictures/user_1/absent.jpg')
+        call_command('process_avatars', stdout=io.StringIO())
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_picture)
+        self.assertEqual(self.user.avatar_hash, '')
+
+        self.upload(self.client)
+        response = self.client.patch('/api/profile/', {'profile_picture': ''}, format='multipart')
+        self.assertIsNone(response.json()['profile_picture'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_hash, '')
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from . import async_views
 from .views import (
     RegisterView,
     LogoutView,
@@ -7,20 +9,41 @@ from .views import (
     CustomTokenObtainPairView,
     UserListView,
     UserDetailView,
-    ChangePasswordView
+    ChangePasswordView,
+    PasswordHashingStatsView
 )
 
+# Sous ASGI, les vues qui hachent des mots de passe attendent le pool de
+# hachage sans bloquer la boucle d'événements
+if settings.ASYNC_AUTH_VIEWS:
+    register_view = async_views.register_view
+    login_view = async_views.login_view
+    change_password_view = async_views.change_password_view
+else:
+    register_view = RegisterView.as_view()
+    login_view = CustomTokenObtainPairView.as_view()
+    change_password_view = ChangePasswordView.as_view()
+
+# Sous ASGI, les vues de lecture attendent la base sans occuper de thread
+if settings.ASYNC_READ_VIEWS:
+    user_list_view = async_views.user_list_view
+    user_detail_view = async_views.user_detail_view
+else:
+    user_list_view = UserListView.as_view()
+    user_detail_view = UserDetailView.as_view()
+
 urlpatterns = [
     # Authentification
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', CustomTokenObtainPairView.as_view(), name='login'),
+    path('register/', register_view, name='register'),
+    path('login/', login_view, name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('auth/hashing-stats/', PasswordHashingStatsView.as_view(), name='password-hashing-stats'),
     
     # Profil utilisateur
     path('profile/', UserProfileView.as_view(), name='profile'),
-    path('profile/change-password/', ChangePasswordView.as_view(), name='change-password'),
+    path('profile/change-password/', change_password_view, name='change-password'),
     
     # Gestion des utilisateurs
-    path('users/', UserListView.as_view(), name='user-list'),
-    path('users/<int:pk>/', UserDetailView.as_view(), name='user-detail'),
+    path('users/', user_list_view, name='user-list'),
+    path('users/<int:pk>/', user_detail_view, name='user-detail'),
 ]
\ No newline at end of file
@@ -1,42 +1,54 @@
+import logging
+
 from rest_framework import generics, permissions, status, serializers
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import get_user_model
-from .serializers import RegisterSerializer, UserSerializer, ProfileUpdateSerializer, UserListSerializer
+from django.db.models import Count
+from django.utils.decorators import method_decorator
+from api import tracing
+from api.conditional import conditional_get
+from api.pagination import UserCursorPagination
+from api.response_cache import cache_response
+from api.throttling import ThrottleBeforeAuthenticationMixin, client_ip, token_user_id
+from . import hashing, revocation
+from .authentication import TokenClaimsAuthentication
+from .hashing import HashingUnavailable
+from .serializers import (
+    RegisterSerializer, UserSerializer, ProfileUpdateSerializer, UserListSerializer, UserListValuesSerializer
+)
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(ThrottleBeforeAuthenticationMixin, generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
     
     def create(self, request, *args, **kwargs):
         try:
-            print(f"[DEBUG] Données d'inscription reçues: {request.data}")
-            print(f"[DEBUG] Content-Type: {request.content_type}")
+            tracing.trace('register.received', data=request.data, content_type=request.content_type)
             
             serializer = self.get_serializer(data=request.data)
-            print(f"[DEBUG] Serializer valide avant validation: {serializer.is_valid()}")
-            
             if not serializer.is_valid():
-                print(f"[DEBUG] Erreurs de validation: {serializer.errors}")
+                tracing.trace('register.invalid', errors=serializer.errors)
                 return Response({
                     'error': 'Validation failed',
                     'details': serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             user = serializer.save()
-            print(f"[DEBUG] Utilisateur créé avec ID: {user.id}")
-            print(f"[DEBUG] Email de l'utilisateur: {user.email}")
-            print(f"[DEBUG] Mot de passe défini: {'oui' if user.password else 'non'}")
+            tracing.trace('register.created', user_id=user.id)
             
             # Generate JWT tokens
             refresh = RefreshToken.for_user(user)
             
             response_data = {
-                'user': UserSerializer(user).data,
+                'user': UserSerializer(user, context={'request': request}).data,
                 'tokens': {
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -44,11 +56,12 @@ class RegisterView(generics.CreateAPIView):
                 'message': 'Inscription réussie !'
             }
             
-            print(f"[DEBUG] Réponse d'inscription: {response_data}")
             return Response(response_data, status=status.HTTP_201_CREATED)
             
+        except HashingUnavailable:
+            raise
         except Exception as e:
-            print(f"[DEBUG] Exception inattendue dans RegisterView: {str(e)}")
+            logger.exception("Exception inattendue dans RegisterView")
             return Response({
                 'error': 'Erreur interne du serveur',
                 'detail': str(e)
@@ -66,8 +79,11 @@ class LogoutView(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            # Révocation jusqu'à l'expiration : le token de rafraîchissement
+            # et le token d'accès de la requête
+            revocation.revoke(RefreshToken(refresh_token))
+            if request.auth is not None:
+                revocation.revoke(request.auth)
             
             return Response({
                 "message": "Déconnexion réussie."
@@ -78,6 +94,7 @@ class LogoutView(generics.GenericAPIView):
                 "error": "Token invalide ou expiré."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+@method_decorator(conditional_get(lambda request: [f'user:{request.user.id}']), name='get')
 class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -93,10 +110,10 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         try:
             instance = self.get_object()
             serializer = self.get_serializer(instance)
-            print(f"[DEBUG] Profil utilisateur récupéré: {serializer.data}")
+            tracing.trace('profile.retrieved', user_id=instance.id)
             return Response(serializer.data)
         except Exception as e:
-            print(f"[DEBUG] Erreur dans retrieve UserProfileView: {str(e)}")
+            logger.exception("Erreur dans retrieve UserProfileView")
             return Response({
                 'error': 'Erreur lors de la récupération du profil',
                 'detail': str(e)
@@ -120,7 +137,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         
-        return Response(UserSerializer(instance).data)
+        return Response(UserSerializer(instance, context=self.get_serializer_context()).data)
 
 class UserListView(generics.ListAPIView):
     """
@@ -128,11 +145,33 @@ class UserListView(generics.ListAPIView):
     Exclut l'utilisateur connecté de la liste
     """
     serializer_class = UserListSerializer
+    authentication_classes = [TokenClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserCursorPagination
+    query_budget = 1
     
     def get_queryset(self):
-        # Récupère tous les utilisateurs sauf l'utilisateur connecté
-        return User.objects.exclude(id=self.request.user.id).order_by('username')
+        return user_list_queryset(self.request.user.id)
+    
+    def list(self, request, *args, **kwargs):
+        # Lecture seule : lignes values_list() plutôt qu'un modèle par utilisateur
+        rows = UserListValuesSerializer(self.get_serializer_context())
+        page = self.paginate_queryset(rows.values(self.get_queryset()))
+        return self.get_paginated_response(rows.serialize(page))
+
+def user_list_queryset(user_id):
+    # Récupère tous les utilisateurs sauf l'utilisateur connecté
+    # Le nombre de critiques est calculé en une seule requête (annotation)
+    return User.objects.exclude(id=user_id).annotate(
+        reviews_count=Count('reviews')
+    ).order_by('username')
+
+def user_detail_queryset():
+    return User.objects.annotate(reviews_count=Count('reviews'))
+
+LOGIN_REQUIRED_MESSAGE = "L'email et le mot de passe sont obligatoires."
+LOGIN_INACTIVE_MESSAGE = "Ce compte est désactivé."
+LOGIN_INVALID_MESSAGE = "Identifiants invalides. Veuillez réessayer."
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def __init__(self, *args, **kwargs):
@@ -147,31 +186,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         email = attrs.get('email')
         password = attrs.get('password')
         
-        print(f"[DEBUG] Tentative de connexion avec email: '{email}' (type: {type(email)})")
-        print(f"[DEBUG] Password fourni: {'oui' if password else 'non'}")
-        print(f"[DEBUG] Email brut reçu: {repr(email)}")
-        
         if not email or not password:
-            print("[DEBUG] Email ou mot de passe manquant")
-            raise serializers.ValidationError({"detail": "L'email et le mot de passe sont obligatoires."})
+            tracing.trace('login.missing_credentials')
+            raise serializers.ValidationError({"detail": LOGIN_REQUIRED_MESSAGE})
         
         # Try to authenticate the user
         user = User.objects.filter(email=email).first()
         
-        print(f"[DEBUG] Utilisateur trouvé: {'oui' if user else 'non'}")
-        if user:
-            print(f"[DEBUG] ID utilisateur: {user.id}")
-            print(f"[DEBUG] Mot de passe valide: {'oui' if user.check_password(password) else 'non'}")
-            print(f"[DEBUG] Compte actif: {'oui' if user.is_active else 'non'}")
-        
-        if user and user.check_password(password):
+        # Un seul check_password par tentative (PBKDF2 est volontairement coûteux)
+        if user and hashing.check_password(user, password):
             if not user.is_active:
-                print("[DEBUG] Compte désactivé")
-                raise serializers.ValidationError({"detail": "Ce compte est désactivé."})
+                tracing.trace('login.inactive', user_id=user.id)
+                raise serializers.ValidationError({"detail": LOGIN_INACTIVE_MESSAGE})
             
             refresh = self.get_token(user)
-            
-            print(f"[DEBUG] Connexion réussie pour {user.email}")
+            tracing.trace('login.succeeded', user_id=user.id)
             
             # Retourner la structure attendue par le frontend
             return {
@@ -179,35 +208,59 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
                     'refresh': str(refresh),
                     'access': str(refresh.access_token)
                 },
-                'user': UserSerializer(user).data
+                'user': UserSerializer(user, context=self.context).data
             }
         
-        print("[DEBUG] Échec de l'authentification")
-        raise serializers.ValidationError({"detail": "Identifiants invalides. Veuillez réessayer."})
+        tracing.trace('login.failed', user_found=user is not None)
+        raise serializers.ValidationError({"detail": LOGIN_INVALID_MESSAGE})
+
+def login_account(email):
+    """
+    Compte visé par une tentative de connexion (seau par compte du throttling)
+    """
+    return email.strip().lower() if isinstance(email, str) else None
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(ThrottleBeforeAuthenticationMixin, TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = 'login'
+
+    def get_throttle_identities(self, request):
+        data = request.data
+        email = data.get('email') if hasattr(data, 'get') else None
+        return {'ip': client_ip(request), 'account': login_account(email)}
     
     def post(self, request, *args, **kwargs):
         try:
-            print(f"[DEBUG] Requête de connexion reçue: {request.data}")
+            tracing.trace('login.received', data=request.data)
             serializer = self.get_serializer(data=request.data)
-            print(f"[DEBUG] Serializer valide: {serializer.is_valid()}")
-            
             if not serializer.is_valid():
-                print(f"[DEBUG] Erreurs de validation: {serializer.errors}")
+                tracing.trace('login.invalid', errors=serializer.errors)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            print(f"[DEBUG] Validation réussie, données: {serializer.validated_data}")
             return Response(serializer.validated_data, status=status.HTTP_200_OK)
             
+        except HashingUnavailable:
+            raise
         except Exception as e:
-            print(f"[DEBUG] Erreur inattendue: {str(e)}")
+            logger.exception("Erreur inattendue dans CustomTokenObtainPairView")
             return Response({
                 "error": "Erreur interne du serveur",
                 "detail": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        # Un token de rafraîchissement révoqué par une déconnexion est refusé
+        refresh = self.token_class(attrs['refresh'])
+        if revocation.is_revoked(refresh.get('jti')):
+            raise InvalidToken("Le token a été révoqué.")
+        return super().validate(attrs)
+
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
+@method_decorator(conditional_get(lambda request, pk: [f'user:{pk}']), name='get')
+@method_decorator(cache_response(lambda request, pk: [f'user:{pk}']), name='get')
 class UserDetailView(generics.RetrieveAPIView):
     """
     Vue pour récupérer les détails d'un utilisateur spécifique
@@ -215,16 +268,21 @@ class UserDetailView(generics.RetrieveAPIView):
     """
     serializer_class = UserListSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 2
     
     def get_queryset(self):
-        return User.objects.all()
+        return user_detail_queryset()
 
 
-class ChangePasswordView(generics.GenericAPIView):
+class ChangePasswordView(ThrottleBeforeAuthenticationMixin, generics.GenericAPIView):
     """
     Vue pour changer le mot de passe de l'utilisateur connecté
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'change_password'
+
+    def get_throttle_identities(self, request):
+        return {'ip': client_ip(request), 'account': token_user_id(request)}
 
     def post(self, request):
         user = request.user
@@ -237,7 +295,7 @@ class ChangePasswordView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if not user.check_password(current_password):
+        if not hashing.check_password(user, current_password):
             return Response(
                 {'error': 'Le mot de passe actuel est incorrect.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -249,9 +307,20 @@ class ChangePasswordView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user.set_password(new_password)
-        user.save()
+        hashing.set_password(user, new_password)
+        # request.user vient du cache : les autres colonnes peuvent être périmées
+        user.save(update_fields=['password'])
         return Response(
             {'message': 'Mot de passe modifié avec succès.'},
             status=status.HTTP_200_OK
         )
+
+
+class PasswordHashingStatsView(generics.GenericAPIView):
+    """
+    Vue des métriques du pool de hachage (file d'attente, latence, rejets)
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(hashing.stats())
@@ -0,0 +1,28 @@
+// Photo de profil servie depuis les variantes du backend (64, 256 et 512 px,
+// WebP avec repli JPEG) : le navigateur choisit la plus petite suffisante.
+const Avatar = ({ variants, src, alt, displaySize, style }) => {
+  if (!variants) {
+    return <img src={src || null} alt={alt} style={style} />;
+  }
+
+  const srcSet = (format) => Object.entries(variants)
+    .map(([size, urls]) => `${urls[format]} ${size}w`)
+    .join(', ');
+  const sizes = `${displaySize}px`;
+
+  return (
+    <picture>
+      <source type="image/webp" srcSet={srcSet('webp')} sizes={sizes} />
+      <img
+        src={src}
+        srcSet={srcSet('jpeg')}
+        sizes={sizes}
+        alt={alt}
+        loading="lazy"
+        style={style}
+      />
+    </picture>
+  );
+};
+
+export default Avatar;
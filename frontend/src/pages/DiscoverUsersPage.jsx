@@ -3,6 +3,8 @@ import { Link, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import axios from 'axios';
 import { API_URL } from '../config/constants';
+import Avatar from '../components/Avatar';
+import { nextPageUrl } from '../services/pagination';
 
 const DiscoverUsersPage = () => {
   const [users, setUsers] = useState([]);
@@ -18,28 +20,35 @@ const DiscoverUsersPage = () => {
         setError('');
         
         const token = await getToken();
-        const response = await axios.get(`${API_URL}/users/`, {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
+        // Toutes les pages de la liste (en-tête Link rel="next")
+        const allUsers = [];
+        let url = `${API_URL}/users/`;
+        while (url) {
+          const response = await axios.get(url, {
+            headers: {
+              'Authorization': `Bearer ${token}`,
+              'Content-Type': 'application/json'
+            }
+          });
+          if (!Array.isArray(response.data)) {
+            throw new Error('Format de réponse inattendu');
           }
-        });
-        
-        if (response.data && Array.isArray(response.data)) {
-          // Formater les données pour correspondre à la structure attendue
-          const formattedUsers = response.data.map(user => ({
-            id: user.id.toString(),
-            username: user.username,
-            bio: user.bio || 'Aucune biographie disponible',
-            joinDate: user.date_joined,
-            reviewsCount: user.reviews_count || 0,
-            avatar: user.profile_picture || `https://ui-avatars.com/api/?name=${encodeURIComponent(user.username)}&background=random`
-          }));
-          
-          setUsers(formattedUsers);
-        } else {
-          throw new Error('Format de réponse inattendu');
+          allUsers.push(...response.data);
+          url = nextPageUrl(response.headers.link);
         }
+        
+        // Formater les données pour correspondre à la structure attendue
+        const formattedUsers = allUsers.map(user => ({
+          id: user.id.toString(),
+          username: user.username,
+          bio: user.bio || 'Aucune biographie disponible',
+          joinDate: user.date_joined,
+          reviewsCount: user.reviews_count || 0,
+          avatar: user.profile_picture || `https://ui-avatars.com/api/?name=${encodeURIComponent(user.username)}&background=random`,
+          avatarVariants: user.avatar
+        }));
+        
+        setUsers(formattedUsers);
       } catch (err) {
         console.error('Erreur lors de la récupération des utilisateurs:', err);
         
@@ -199,9 +208,11 @@ const DiscoverUsersPage = () => {
                 alignItems: 'center',
                 textAlign: 'center'
               }}>
-                <img 
+                <Avatar 
+                  variants={user.avatarVariants}
                   src={user.avatar} 
                   alt={user.username}
+                  displaySize={100}
                   style={{
                     width: '100px',
                     height: '100px',
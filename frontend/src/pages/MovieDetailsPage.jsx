@@ -118,19 +118,26 @@ const MovieDetailsPage = () => {
         setMovieData(movieInfo);
 
         // Récupérer les critiques du film depuis l'API
+        // (paginées : `next` donne l'URL de la page suivante, null sur la dernière)
         const token = localStorage.getItem('accessToken');
-        const response = await fetch(`${API_URL}/reviews/movie/${encodeURIComponent(decodedTitle)}/`, {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json',
+        const allReviews = [];
+        let url = `${API_URL}/reviews/movie/${encodeURIComponent(decodedTitle)}/`;
+        while (url) {
+          const response = await fetch(url, {
+            headers: {
+              'Authorization': `Bearer ${token}`,
+              'Content-Type': 'application/json',
+            }
+          });
+          const data = await response.json();
+
+          if (!response.ok) {
+            setError('Erreur lors du chargement des critiques');
+            break;
           }
-        });
-        const data = await response.json();
-        
-        if (response.ok) {
-          setReviews(data.reviews || []);
-        } else {
-          setError('Erreur lors du chargement des critiques');
+          allReviews.push(...(data.reviews || []));
+          setReviews([...allReviews]);
+          url = data.next;
         }
       } catch (err) {
         console.error('Erreur:', err);
@@ -4,6 +4,7 @@ import { useAuth } from '../contexts/AuthContext';
 import { API_URL } from '../config/constants';
 import { Star, Film, Calendar, Edit, Trash2, ArrowLeft } from 'lucide-react';
 import { getImageUrl } from '../services/apiService';
+import { nextPageUrl } from '../services/pagination';
 
 const MyReviewsPage = () => {
   const { user, getToken } = useAuth();
@@ -19,52 +20,45 @@ const MyReviewsPage = () => {
         setError(null);
         
         const token = await getToken();
-        const response = await fetch(`${API_URL}/reviews/my-reviews/`, {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
+        const headers = {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        };
+
+        // Toutes les pages de la liste, affichées au fur et à mesure
+        const allReviews = [];
+        let url = `${API_URL}/reviews/my-reviews/`;
+        while (url) {
+          const response = await fetch(url, { headers });
+          if (!response.ok) {
+            console.error('Erreur API:', response.status, response.statusText);
+            setError('Erreur lors de la récupération de vos critiques');
+            break;
           }
-        });
+          const data = await response.json();
 
-        console.log('Response status:', response.status);
+          // Informations des films de la page en une seule requête (cache TMDB du backend)
+          let moviesByTitle = {};
+          try {
+            const enrichResponse = await fetch(`${API_URL}/movies/enrich/`, {
+              method: 'POST',
+              headers,
+              body: JSON.stringify({ titles: data.map((review) => review.movie_title || review.title) })
+            });
+            if (enrichResponse.ok) {
+              moviesByTitle = (await enrichResponse.json()).results || {};
+            }
+          } catch (error) {
+            console.error('Erreur lors de la recherche des films:', error);
+          }
 
-        if (response.ok) {
-          const data = await response.json();
-          console.log('Structure complète des données critiques:', JSON.stringify(data, null, 2));
-          
-          // Pour chaque critique, récupérer les informations du film depuis TMDB
-          const reviewsWithMovieInfo = await Promise.all(
-            data.map(async (review) => {
-              try {
-                // Rechercher le film par titre dans TMDB
-                const movieResponse = await fetch(
-                  `https://api.themoviedb.org/3/search/movie?api_key=a293878960c1a25de72bc58b3f8f4160&language=fr-FR&query=${encodeURIComponent(review.movie_title || review.title)}&page=1`
-                );
-                
-                if (movieResponse.ok) {
-                  const movieData = await movieResponse.json();
-                  if (movieData.results && movieData.results.length > 0) {
-                    const movie = movieData.results[0];
-                    return {
-                      ...review,
-                      poster_path: movie.poster_path,
-                      movie_info: movie
-                    };
-                  }
-                }
-                return review;
-              } catch (error) {
-                console.error('Erreur lors de la recherche du film:', error);
-                return review;
-              }
-            })
-          );
-          
-          console.log('Critiques avec infos films:', reviewsWithMovieInfo);
-          setReviews(reviewsWithMovieInfo);
-        } else {
-          console.error('Erreur API:', response.status, response.statusText);
-          setError('Erreur lors de la récupération de vos critiques');
+          allReviews.push(...data.map((review) => {
+            const movie = moviesByTitle[review.movie_title || review.title];
+            return movie ? { ...review, poster_path: movie.poster_path, movie_info: movie } : review;
+          }));
+          setReviews([...allReviews]);
+          setLoading(false);
+          url = nextPageUrl(response.headers.get('Link'));
         }
       } catch (err) {
         console.error('Erreur fetchReviews:', err);
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { ArrowLeft, Calendar, User as UserIcon, Mail } from 'lucide-react';
 import { API_URL } from '../config/constants';
+import Avatar from '../components/Avatar';
 
 const PublicProfilePage = () => {
   const { userId } = useParams();
@@ -164,9 +165,11 @@ const PublicProfilePage = () => {
             border: '3px solid var(--accent)',
             flexShrink: 0
           }}>
-            <img 
-              src={user.profile_picture || null} 
+            <Avatar 
+              variants={user.avatar}
+              src={user.profile_picture} 
               alt={`Profil de ${user.username}`}
+              displaySize={120}
               style={{
                 width: '100%',
                 height: '100%',
@@ -0,0 +1,16 @@
+// Listes paginées par curseur côté API (critiques, utilisateurs) : le corps
+// ne contient qu'une page, l'URL de la suivante est dans l'en-tête Link.
+
+// URL de la page suivante d'après l'en-tête Link (rel="next"), null sur la dernière
+export const nextPageUrl = (linkHeader) => {
+  if (!linkHeader) {
+    return null;
+  }
+  for (const part of linkHeader.split(',')) {
+    const match = part.match(/<([^>]+)>\s*;\s*rel="next"/);
+    if (match) {
+      return match[1];
+    }
+  }
+  return null;
+};